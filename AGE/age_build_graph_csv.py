@@ -5,6 +5,10 @@ import kuzu
 import re
 from codetiming import Timer
 from common.logger import LoggingUtil
+from common.convert_utils import ConvertUtils
+from common.csv_schema import CSVHeaderSchema
+from common.part_files import PartFiles
+from common.csv_ranges import CSVRanges
 import pandas as pd
 
 """
@@ -22,6 +26,13 @@ logger = LoggingUtil.init_logging("age_build_graph_csv", level=log_level, line_f
 # the location of this file
 test_dir = os.path.dirname(os.path.abspath(__file__))
 
+# the ORION tab delimited header files that declare the column data types
+node_header_file_name = 'rk-nodes.tab-hdr.temp_csv'
+edge_header_file_name = 'rk-edges.tab-hdr.temp_csv'
+
+# low cardinality string columns that are read as categoricals
+category_cols = ['primary_knowledge_source', 'knowledge_level', 'agent_type']
+
 
 def create_age_tables(conn: kuzu.Connection, _data_dir, _node_file, _edge_file) -> None:
     """
@@ -152,17 +163,11 @@ def parse_data(conn: kuzu.Connection, _data_dir, _node_infile, _edge_infile) ->
     edge_count = 0
 
     try:
-        # specify the range of node/edge files to work
-        node_rng = range(1, 2)
-        edge_rng = range(1, 2)
-
         with Timer(name="nodes", text="DB nodes loaded in {:.2f}s"):
             logger.debug("Loading nodes into the database...")
 
-            for i in node_rng:
-                inf = os.path.join(_data_dir, _node_infile + str(i) + '.csv')
-                inf = str(inf).replace('\\', '/')
-
+            # load the node files found in the data directory
+            for inf in get_data_files(_data_dir, _node_infile):
                 logger.debug("Loading node file %s into the database...", inf)
 
                 conn.execute(f'COPY Node FROM "{inf}" (HEADER=true, DELIMITER=",", IGNORE_ERRORS=false);')
@@ -172,10 +177,8 @@ def parse_data(conn: kuzu.Connection, _data_dir, _node_infile, _edge_infile) ->
         with Timer(name="edges", text="DB edges loaded in {:.2f}s"):
             logger.debug("Loading edges into the database...")
 
-            for i in edge_rng:
-                inf = os.path.join(_data_dir, _edge_infile + str(i) + '.csv')
-                inf = str(inf).replace('\\', '/')
-
+            # load the edge files found in the data directory
+            for inf in get_data_files(_data_dir, _edge_infile):
                 logger.debug("Loading edge file %s into the database...", inf)
 
                 conn.execute(f'COPY Edge FROM "{inf}" (HEADER=true, DELIMITER=",", IGNORE_ERRORS=false);')
@@ -188,117 +191,221 @@ def parse_data(conn: kuzu.Connection, _data_dir, _node_infile, _edge_infile) ->
     logger.debug(f"Successfully loaded nodes and edges into the DB.")
 
 
-def convert_file(_data_dir, _infile, file_type):
+def get_data_files(_data_dir, _infile) -> list:
+    """
+    gets the paths of the numbered CSV files found in the data directory (e.g. rk-nodes-conv1.csv, rk-nodes-conv2.csv, ...) or the path
+    of the input file if it is a single file (e.g. rk-nodes.csv).
+
+    :param _data_dir:
+    :param _infile:
+    :return:
+    """
+    # so this works in both a windows and linux environment
+    if os.path.isfile(os.path.join(_data_dir, _infile)):
+        return [str(os.path.join(_data_dir, _infile)).replace('\\', '/')]
+
+    return [inf for _, inf in PartFiles.find(_data_dir, _infile, 'csv')]
+
+
+def convert_file(_data_dir, _infile, file_type, _chunk_size: int = None, _memory_budget: int = None, _range_size: int = None):
+    """
+    converts the node/edge csv files into the format used to load the DB.
+
+    if a chunk size (rows) or a memory budget (MB) is specified the files are streamed in chunks rather than loaded whole.
+
+    a single input file (e.g. rk-nodes.csv) is converted in byte ranges that end on record boundaries, each range into its
+    own numbered output file (e.g. rk-nodes-conv1.csv).
+
+    :param _data_dir:
+    :param _infile:
+    :param file_type:
+    :param _chunk_size:
+    :param _memory_budget:
+    :param _range_size: the size of a byte range in bytes
+    :return:
+    """
     with Timer(name="files", text="DB files converted in {:.2f}s"):
         logger.debug(f"Converting {file_type} files...")
 
-        # specify the range of files to work
-        if file_type == 'NODE':
-            rng = range(1, 2)
-        elif file_type == 'EDGE':
-            rng = range(1, 2)
+        # get the data types to read the data with and the ones to fall back to if the data does not match them
+        dtypes, fallback_dtypes = get_read_dtypes(_data_dir, file_type, bool(_chunk_size or _memory_budget))
 
-        # init the edge id counter
-        start_id: int = 1
+        # get the byte ranges of a single file or the files found in the data directory, and the output file name prefix
+        if os.path.isfile(os.path.join(_data_dir, _infile)):
+            in_files: list = [(csv_range.number, csv_range) for csv_range in CSVRanges.get_ranges(os.path.join(_data_dir, _infile), 1, _range_size)]
 
-        for i in rng:
-            inf = os.path.join(_data_dir, _infile + str(i) + '.csv')
+            out_prefix: str = os.path.splitext(_infile)[0] + '-conv'
+        else:
+            in_files: list = PartFiles.find(_data_dir, _infile, 'csv')
 
-            # so this works in both a windows and linux environment
-            inf = str(inf).replace('\\', '/')
+            out_prefix: str = _infile + 'conv'
 
-            out_file = os.path.join(_data_dir, _infile + 'conv' + str(i) + '.csv')
+        if not in_files:
+            logger.warning('No %s files named %s<file number>.csv found in %s.', file_type, _infile, _data_dir)
+
+        for i, inf in in_files:
+            out_file = os.path.join(_data_dir, out_prefix + str(i) + '.csv')
 
             # so this works in both a windows and linux environment
             out_file = str(out_file).replace('\\', '/')
 
-            # init the columns to rename
-            reformat_rename_cols: dict = {}
+            # get the number of rows to process at a time (if any)
+            chunk_size: int = _chunk_size or ConvertUtils.get_chunk_size(inf, _memory_budget)
 
-            # init the target array list columns
-            reformat_list_cols: list = []
+            logger.debug("Converting file %s into %s, chunk size: %s", inf, out_file, chunk_size)
 
-            # init the target int32 columns
-            reformat_int32_cols: list = []
+            try:
+                # convert the file
+                ConvertUtils.convert_csv_file(inf, out_file, convert_frame, file_type, chunk_size, dtypes)
+            except (ValueError, TypeError) as e:
+                # nothing else to try if these were already the fallback data types
+                if dtypes == fallback_dtypes:
+                    raise
 
-            # init the target columns to delete
-            reformat_del_cols: list = []
+                logger.warning("Data in %s does not match the header data types (%s), converting with inferred data types.", inf, e)
 
-            logger.debug("Converting file %s into %s", inf, out_file)
+                # convert the file again using the fallback data types
+                ConvertUtils.convert_csv_file(inf, out_file, convert_frame, file_type, chunk_size, fallback_dtypes)
 
-            # load the infile into a pandas object
-            df = pd.read_csv(inf, low_memory=False)
+            logger.debug(f"%s file %s converted and exported to %s.", file_type, inf, out_file)
 
-            # convert the list columns to be Kuzu compatible. e.g: "[]", [1,2,3,...], [1.2,2.3,3.4,...], [txt1,txt2, ...]
-            if file_type == 'NODE':
-                # define the cols that need renaming (same for RK and CTD data)
-                reformat_rename_cols = {'category': 'labels'}
 
-                # define the target array list columns
-                reformat_list_cols = ['labels', 'equivalent_identifiers', 'hgvs']
+def get_read_dtypes(_data_dir, file_type, _streaming: bool) -> (dict, dict):
+    """
+    gets the column data types used to read the input files from the ORION header file in the data directory.
 
-                # define the target int32 columns (None for CTD data)
-                reformat_int32_cols = ['lipinski', 'arom_c', 'sp3_c', 'sp2_c', 'sp_c', 'halogen', 'hetero_sp2_c', 'rotb', 'o_n', 'oh_nh', 'rgb',
-                                       'fda_labels']
+    the fallback data types are used for data that does not match the header. these only make the list columns
+    text when streaming so that the type inferred in one chunk does not differ from another.
 
-            elif file_type == 'EDGE':
-                # define the cols that need renaming (same for CTD and RK)
-                reformat_rename_cols = {'predicate': 'label'}
+    :param _data_dir:
+    :param file_type:
+    :param _streaming:
+    :return: the data types and the fallback data types
+    """
+    # get the columns that will be converted into lists
+    rename_cols, list_cols, _, _ = get_conversion_cols(file_type)
+
+    # init the fallback data types
+    fallback_dtypes: dict | None = None
 
-                # define the target array list columns
-                reformat_list_cols: list = ['p_value', 'supporting_affinities', 'slope', 'publications', 'hetio_source', 'tmkp_ids', 'expressed_in',
-                                            'pubchem_assay_ids', 'patent_ids', 'aggregator_knowledge_source', 'category', 'provided_by',
-                                            'complex_context', 'has_evidence', 'qualifiers', 'phosphorylation_sites', 'drugmechdb_path_id']
+    # when streaming read the list columns as text, using their names as they are in the input file
+    if _streaming:
+        fallback_dtypes = {{v: k for k, v in rename_cols.items()}.get(col, col): str for col in list_cols}
 
-                # define the target int32 columns (none for CTD data)
-                reformat_int32_cols: list = ['distance_to_feature']
+    # get the header file path
+    header_file: str = os.path.join(_data_dir, node_header_file_name if file_type == 'NODE' else edge_header_file_name)
 
-                # RK data testing only - define the columns to delete (none for CTD data)
-                # reformat_del_cols: list = ['agent_type','snpeff_effect','distance_to_feature','publications','p_value','ligand','protein',
-                #                            'affinity_parameter','supporting_affinities','affinity','object_aspect_qualifier','object_direction_qualifier',
-                #                            'qualified_predicate','Coexpression','Coexpression_transferred','Experiments','Experiments_transferred',
-                #                            'Database','Database_transferred','Textmining','Textmining_transferred','Cooccurance','Combined_score',
-                #                            'species_context_qualifier','hetio_source','tmkp_confidence_score','sentences','tmkp_ids','detection_method',
-                #                            'Homology','expressed_in','slope','pubchem_assay_ids','patent_ids','aggregator_knowledge_source','id',
-                #                            'original_subject','category','provided_by','disease_context_qualifier','frequency_qualifier','has_evidence',
-                #                            'negated','original_object','score','FAERS_llr','description','NCBITaxon','Fusion','has_count','has_percentage',
-                #                            'has_quotient','has_total','qualifiers','stage_qualifier','primaryTarget','endogenous','anatomical_context_qualifier',
-                #                            'phosphorylation_sites','onset_qualifier','object_specialization_qualifier','drugmechdb_path_id','complex_context',
-                #                            'sex_qualifier','object_part_qualifier','subject_part_qualifier']
+    # if there is no header file use the fallback types
+    if not os.path.exists(header_file):
+        logger.debug("Header file %s not found, %s data types will be inferred.", header_file, file_type)
 
-                # duplicate the subject and object columns into from and to columns.
-                # it is a Kuzu requirement that the first 2 columns be from and to.
-                df.insert(loc=0, column='to', value=df['object'])
-                df.insert(loc=0, column='from', value=df['subject'])
+        return fallback_dtypes, fallback_dtypes
 
-                # RK data - fill the id column
-                # df['id'] = range(start_id, start_id + df.shape[0])
+    # get the data types declared in the header
+    dtypes: dict = CSVHeaderSchema.from_file(header_file).get_read_dtypes(category_cols)
 
-                # RK data - increment the id to be the
-                # start_id += df.shape[0]
+    # the fallback types still apply to any list column the header does not declare
+    if fallback_dtypes:
+        dtypes = fallback_dtypes | dtypes
 
-            # rename any columns in the data
-            df.rename(columns=reformat_rename_cols, inplace=True)
+    return dtypes, fallback_dtypes
 
-            # apply the new formatting for lists
-            for col in reformat_list_cols:
-                # only do this if the column is there
-                if col in df:
-                    df[col] = df[col].apply(lambda x: [] if pd.isna(x) else '[' + ','.join(map(str, str(x).replace('\'', '`').split(';'))) + ']')
 
-            # apply the new formatting for INT32 data
-            for col in reformat_int32_cols:
-                # only do this if the column is there
-                if col in df:
-                    df[col] = df[col].apply(lambda x: x if pd.isna(x) else str(int(x)))
+def get_conversion_cols(file_type) -> (dict, list, list, list):
+    """
+    gets the columns to rename, convert to lists, convert to int32 and delete for the type of data file.
+
+    :param file_type:
+    :return:
+    """
+    # init the columns to rename
+    reformat_rename_cols: dict = {}
 
-            # remove specified columns
-            df.drop(columns=reformat_del_cols, inplace=True, axis=1)
+    # init the target array list columns
+    reformat_list_cols: list = []
 
-            # create the new file
-            df.to_csv(out_file, index=False)
+    # init the target int32 columns
+    reformat_int32_cols: list = []
 
-            logger.debug(f"%s file %s converted and exported to %s.", file_type, inf, out_file)
+    # init the target columns to delete
+    reformat_del_cols: list = []
+
+    # convert the list columns to be Kuzu compatible. e.g: "[]", [1,2,3,...], [1.2,2.3,3.4,...], [txt1,txt2, ...]
+    if file_type == 'NODE':
+        # define the cols that need renaming (same for RK and CTD data)
+        reformat_rename_cols = {'category': 'labels'}
+
+        # define the target array list columns
+        reformat_list_cols = ['labels', 'equivalent_identifiers', 'hgvs']
+
+        # define the target int32 columns (None for CTD data)
+        reformat_int32_cols = ['lipinski', 'arom_c', 'sp3_c', 'sp2_c', 'sp_c', 'halogen', 'hetero_sp2_c', 'rotb', 'o_n', 'oh_nh', 'rgb',
+                               'fda_labels']
+
+    elif file_type == 'EDGE':
+        # define the cols that need renaming (same for CTD and RK)
+        reformat_rename_cols = {'predicate': 'label'}
+
+        # define the target array list columns
+        reformat_list_cols: list = ['p_value', 'supporting_affinities', 'slope', 'publications', 'hetio_source', 'tmkp_ids', 'expressed_in',
+                                    'pubchem_assay_ids', 'patent_ids', 'aggregator_knowledge_source', 'category', 'provided_by',
+                                    'complex_context', 'has_evidence', 'qualifiers', 'phosphorylation_sites', 'drugmechdb_path_id']
+
+        # define the target int32 columns (none for CTD data)
+        reformat_int32_cols: list = ['distance_to_feature']
+
+        # RK data testing only - define the columns to delete (none for CTD data)
+        # reformat_del_cols: list = ['agent_type','snpeff_effect','distance_to_feature','publications','p_value','ligand','protein',
+        #                            'affinity_parameter','supporting_affinities','affinity','object_aspect_qualifier','object_direction_qualifier',
+        #                            'qualified_predicate','Coexpression','Coexpression_transferred','Experiments','Experiments_transferred',
+        #                            'Database','Database_transferred','Textmining','Textmining_transferred','Cooccurance','Combined_score',
+        #                            'species_context_qualifier','hetio_source','tmkp_confidence_score','sentences','tmkp_ids','detection_method',
+        #                            'Homology','expressed_in','slope','pubchem_assay_ids','patent_ids','aggregator_knowledge_source','id',
+        #                            'original_subject','category','provided_by','disease_context_qualifier','frequency_qualifier','has_evidence',
+        #                            'negated','original_object','score','FAERS_llr','description','NCBITaxon','Fusion','has_count','has_percentage',
+        #                            'has_quotient','has_total','qualifiers','stage_qualifier','primaryTarget','endogenous','anatomical_context_qualifier',
+        #                            'phosphorylation_sites','onset_qualifier','object_specialization_qualifier','drugmechdb_path_id','complex_context',
+        #                            'sex_qualifier','object_part_qualifier','subject_part_qualifier']
+
+    return reformat_rename_cols, reformat_list_cols, reformat_int32_cols, reformat_del_cols
+
+
+def convert_frame(df: pd.DataFrame, file_type) -> pd.DataFrame:
+    """
+    converts the data in a data frame (a whole file or a chunk of one).
+
+    :param df:
+    :param file_type:
+    :return:
+    """
+    # get the columns to work on
+    reformat_rename_cols, reformat_list_cols, reformat_int32_cols, reformat_del_cols = get_conversion_cols(file_type)
+
+    if file_type == 'EDGE':
+        # duplicate the subject and object columns into from and to columns.
+        # it is a Kuzu requirement that the first 2 columns be from and to.
+        df.insert(loc=0, column='to', value=df['object'])
+        df.insert(loc=0, column='from', value=df['subject'])
+
+    # rename any columns in the data
+    df.rename(columns=reformat_rename_cols, inplace=True)
+
+    # apply the new formatting for lists
+    for col in reformat_list_cols:
+        # only do this if the column is there
+        if col in df:
+            df[col] = ConvertUtils.format_list_column(df[col])
+
+    # apply the new formatting for INT32 data
+    for col in reformat_int32_cols:
+        # only do this if the column is there
+        if col in df:
+            df[col] = ConvertUtils.format_int_column(df[col])
+
+    # remove specified columns
+    df.drop(columns=reformat_del_cols, inplace=True, axis=1)
+
+    return df
 
 
 if __name__ == "__main__":
@@ -319,6 +426,11 @@ if __name__ == "__main__":
     parser.add_argument('--data-dir', dest='data_dir', type=str, help='Data directory')
     parser.add_argument('--outfile', dest='outfile', type=str, help='Output file')
     parser.add_argument('--type', dest='type', type=str, help='Data operation type (tables or data)')
+    parser.add_argument('--chunk-size', dest='chunk_size', type=int, default=None, help='Number of rows to convert at a time (streaming mode)')
+    parser.add_argument('--memory-budget', dest='memory_budget', type=int, default=None,
+                        help='Memory budget in MB used to size the conversion chunks (streaming mode)')
+    parser.add_argument('--range-size', dest='range_size', type=int, default=None,
+                        help='Size in MB of the byte ranges a single node/edge CSV input file (e.g. rk-edges.csv) is converted in')
 
     args = parser.parse_args()
 
@@ -350,8 +462,11 @@ if __name__ == "__main__":
             parse_data(connection, args.data_dir, args.node_infile, args.edge_infile)
 
         if run_type == "CONVERT":
-            convert_file(args.data_dir, args.node_infile, 'NODE')
-            convert_file(args.data_dir, args.edge_infile, 'EDGE')
+            # get the size of the byte ranges a single input file is converted in, in bytes
+            range_size: int | None = args.range_size * 1024 * 1024 if args.range_size else None
+
+            convert_file(args.data_dir, args.node_infile, 'NODE', args.chunk_size, args.memory_budget, range_size)
+            convert_file(args.data_dir, args.edge_infile, 'EDGE', args.chunk_size, args.memory_budget, range_size)
 
     except Exception as e:
         logger.exception(f'Exception parsing')
@@ -1,14 +1,39 @@
 import os
+import sys
+import time
 import shutil
 import argparse
 import kuzu
 import re
 from codetiming import Timer
 from common.logger import LoggingUtil
+from common.convert_utils import ConvertUtils
+from common.csv_schema import CSVHeaderSchema
+from common.node_class_index import NodeClassIndex
+from common.lookup_store import LookupStore
+from common.bin_file_pool import BinFilePool
+from common.bin_writer import BinWriter
+from common.bin_columns import BinColumns
+from common.reject_log import RejectLog
+from common.import_scheduler import ImportScheduler, ImportJob
+from common.import_manifest import ImportManifest
+from common.part_files import PartFiles
+from common.csv_ranges import CSVRange, CSVRanges
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import csv
+import glob
+import gzip
+import io
+import json
 import pickle
-from collections import defaultdict
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache, partial
+from itertools import islice
 
 """
 this code takes the node/edge csv files and parses them into a Kuzu DB
@@ -33,19 +58,56 @@ ordered_categories = ["biolink:GeneFamily", "biolink:Gene", "biolink:Protein", "
                       "biolink:Device", "biolink:OrganismAttribute", "biolink:ClinicalAttribute", "biolink:Activity",
                       "biolink:InformationContentEntity", "biolink:ChemicalEntity", "biolink:BiologicalEntity"]
 
-# define the file counter ranges used in the process.
-# all data file indexes ranges are nodes: 1-21, edges: 1-24
-# note node range 11-12, edge range 1-2 is a good set of data to test with
-# use 0 for the upper end of the range to bypass operations on that type of data
-node_rng = range(1, 21)
-edge_rng = range(1, 24)
+# the priority of each node category label, the lower the number the higher the priority
+category_priority: dict = {category: index for index, category in enumerate(ordered_categories)}
+
+# the maximum number of distinct category strings to remember the reordered result for
+reorder_cache_size: int = 65536
+
+# the ORION tab delimited header files that declare the column data types
+node_header_file_name = 'rk-nodes.tab-hdr.temp_csv'
+edge_header_file_name = 'rk-edges.tab-hdr.temp_csv'
+
+# the lookup store file and the pickle files the lookups can also be exported to
+lookup_store_file_name = 'rk-lookups.idx'
+node_pickle_file_name = 'serialized_node_classes.pkl'
+edge_pickle_file_name = 'serialized_edge_predicates.pkl'
+
+# the output file name prefixes for the binned data
+node_bin_file_prefix = 'rk-nodes-bin-'
+edge_bin_file_prefix = 'rk-edges-bin-'
+
+# the end of the file name of the import manifest, this is written next to the DB. e.g. rk-kuzu-db.import-manifest.jsonl
+import_manifest_suffix = '.import-manifest.jsonl'
+
+# the glob pattern of the end of the bin shard file names written when binning with workers. e.g. rk-edges-bin-<edge predicate>.shard<n>.csv
+bin_shard_suffix = '.shard*.csv'
+
+# the file the columns kept for each table are saved in when the bin files are projected
+table_columns_file_name = 'rk-table-columns.json'
+
+# the default number of rows read at a time and held in memory by the load step
+default_load_batch_size: int = 1000000
+
+# the node primary key column added to the node bin files when the nodes are keyed by their dense integer keys
+node_key_column = 'node_key'
+
+# the columns kept in every bin file when the bin files are projected. the node primary key and the rel table from/to
+required_bin_columns: dict = {'NODE': [node_key_column, 'id'], 'EDGE': ['from', 'to']}
+
+# low cardinality string columns that are read as categoricals
+category_cols = ['primary_knowledge_source', 'knowledge_level', 'agent_type']
+
+# the number of rows whose node classes are looked up at a time
+lookup_batch_size: int = 100000
 
 # init storage for node class and edge predicate lookup data
-node_class_lookups: dict = {}
+node_class_lookups: NodeClassIndex = NodeClassIndex()
 edge_predicate_lookups = defaultdict(set)
 
 
-def convert_data(_data_dir, _infile, _file_type) -> None:
+def convert_data(_data_dir, _infile, _file_type, _chunk_size: int = None, _memory_budget: int = None, _workers: int = 1,
+                 _data_format: str = 'csv', _range_size: int = None) -> list:
     """
     goes through each input file and converts columns to lists or int64 data types, reorder
     node class lists and add/deletes/rename certain columns.
@@ -53,344 +115,1785 @@ def convert_data(_data_dir, _infile, _file_type) -> None:
     input file names be of the form: rk-nodes-pt<file number>.csv or rk-edges-pt<file number>.csv
     output file names will be of the form: rk-nodes-conv<file number>.csv or rk-edges-conc<file number>.csv
 
+    if a chunk size (rows) or a memory budget (MB) is specified the files are streamed in chunks rather than loaded whole.
+
+    if more than one worker is specified the files are converted concurrently in a process pool, largest file first.
+
+    the input file may also be a single file (rk-nodes.csv or rk-edges.csv). it is divided into byte ranges that end on record
+    boundaries, at least one for each worker, and each range is converted into its own rk-nodes-conv<range number>.csv file.
+
+    if the data format is parquet the output files are rk-nodes-conv<file number>.parquet or rk-edges-conv<file number>.parquet
+    and the list and int columns are written as native list and integer types.
+
     :param _data_dir:
     :param _infile:
     :param _file_type:
-    :return:
+    :param _chunk_size:
+    :param _memory_budget:
+    :param _workers:
+    :param _data_format: csv or parquet
+    :param _range_size: the size in bytes of the byte ranges a single input file is divided into
+    :return: the list of input files that failed to convert
     """
+    # init the list of failed files
+    ret_val: list = []
+
     with Timer(name=_file_type, text="{name} DB files converted in {:.2f}s", logger=logger.debug):
-        # specify the range of files to work
-        if _file_type == 'NODE':
-            rng = node_rng
-        elif _file_type == 'EDGE':
-            rng = edge_rng
-        else:
+        # make sure this is a supported file type
+        if _file_type not in ('NODE', 'EDGE'):
             raise Exception('Unsupported file type.')
 
-        for i in rng:
-            # get the input file path
-            inf = os.path.join(_data_dir, _infile + str(i) + '.csv')
+        # get the data types to read the data with and the ones to fall back to if the data does not match them
+        dtypes, fallback_dtypes = get_read_dtypes(_data_dir, _file_type, bool(_chunk_size or _memory_budget))
 
-            # done so this works in both a windows and linux environment
-            inf = str(inf).replace('\\', '/')
+        # get the header schema for the list columns that hold numbers
+        schema: CSVHeaderSchema = get_header_schema(_data_dir, _file_type)
+
+        # get the method that converts the data. parquet output gets native lists, with float lists for numeric columns
+        convert_method = partial(convert_frame, _data_format=_data_format, _float_list_cols=schema.get_columns_by_type('float[]') if schema else [])
 
+        # init the output file of each input file or range
+        out_files: dict = {}
+
+        # get the output file name prefix
+        out_prefix: str = get_output_prefix(_data_dir, _infile, 'pt', 'conv')
+
+        # go through the part files found in the data directory or the byte ranges of a single file
+        for i, inf in get_data_parts(_data_dir, _infile, _file_type, _workers, _range_size):
             # get the output file path
-            out_file = os.path.join(_data_dir, _infile.replace('pt', 'conv') + str(i) + '.csv')
+            out_file = os.path.join(_data_dir, out_prefix + str(i) + '.' + _data_format)
 
             # done so this works in both a windows and linux environment
-            out_file = str(out_file).replace('\\', '/')
+            out_files[inf] = str(out_file).replace('\\', '/')
+
+        # remove the converted files of an earlier run with more parts, the later steps would otherwise read them too
+        for _, out_file in PartFiles.find(_data_dir, out_prefix, _data_format):
+            if out_file not in out_files.values():
+                os.remove(out_file)
+
+        # work the largest files first so that a big file started last does not hold up the stage
+        convert_files: list = [(inf, out_files[inf]) for inf in PartFiles.largest_first(list(out_files))]
+
+        # init the per-file results. file name: (rows, duration) or the error
+        results: dict = {}
+
+        # convert the files in a pool of processes if requested
+        if _workers and _workers > 1:
+            logger.debug("Converting %s %s files with %s workers.", len(convert_files), _file_type, _workers)
+
+            with ProcessPoolExecutor(max_workers=_workers) as executor:
+                # submit all the files to the pool
+                futures: dict = {executor.submit(convert_file, inf, out_file, _file_type, _chunk_size, _memory_budget, dtypes,
+                                                 fallback_dtypes, convert_method, _data_format): inf
+                                 for inf, out_file in convert_files}
+
+                # collect the results as they complete
+                for future in as_completed(futures):
+                    try:
+                        results[futures[future]] = future.result()
+                    except Exception as e:
+                        results[futures[future]] = e
+        else:
+            for inf, out_file in convert_files:
+                try:
+                    results[inf] = convert_file(inf, out_file, _file_type, _chunk_size, _memory_budget, dtypes, fallback_dtypes, convert_method,
+                                                _data_format)
+                except Exception as e:
+                    results[inf] = e
+
+        # report the results for each file
+        for inf, result in results.items():
+            if isinstance(result, Exception):
+                logger.error("Failed to convert %s file %s: %s", _file_type, inf, result)
+
+                # save the failure
+                ret_val.append(inf)
+            else:
+                logger.debug("%s file %s: %s rows converted in %.2fs.", _file_type, inf, result[0], result[1])
+
+        logger.debug("%s %s files converted, %s failed.", len(results) - len(ret_val), _file_type, len(ret_val))
+
+    # return the failed files
+    return ret_val
+
+
+def convert_file(inf: str | CSVRange, out_file: str, _file_type, _chunk_size: int = None, _memory_budget: int = None, dtypes: dict = None,
+                 fallback_dtypes: dict = None, convert_method=None, _data_format: str = 'csv') -> (int, float):
+    """
+    converts a single input file into the Kuzu compatible format.
+
+    this is run in the worker processes when the files are converted in parallel.
+
+    :param inf:
+    :param out_file:
+    :param _file_type:
+    :param _chunk_size:
+    :param _memory_budget:
+    :param dtypes:
+    :param fallback_dtypes:
+    :param convert_method:
+    :param _data_format:
+    :return: the number of rows converted and the duration
+    """
+    # get the start time
+    start_time: float = time.perf_counter()
+
+    # use the default conversion if none was passed
+    convert_method = convert_method or convert_frame
+
+    # get the number of rows to process at a time (if any)
+    chunk_size: int = _chunk_size or ConvertUtils.get_chunk_size(inf, _memory_budget)
+
+    logger.debug("Converting file %s into %s, chunk size: %s", inf, out_file, chunk_size)
+
+    try:
+        # convert the file
+        row_count: int = ConvertUtils.convert_csv_file(inf, out_file, convert_method, _file_type, chunk_size, dtypes, _data_format)
+    except (ValueError, TypeError) as e:
+        # nothing else to try if these were already the fallback data types
+        if dtypes == fallback_dtypes:
+            raise
+
+        logger.warning("Data in %s does not match the header data types (%s), converting with inferred data types.", inf, e)
+
+        # convert the file again using the fallback data types
+        row_count: int = ConvertUtils.convert_csv_file(inf, out_file, convert_method, _file_type, chunk_size, fallback_dtypes, _data_format)
+
+    logger.debug(f"%s file %s converted and exported to %s.", _file_type, inf, out_file)
+
+    # return the row count and duration
+    return row_count, time.perf_counter() - start_time
+
+
+def get_read_dtypes(_data_dir, _file_type, _streaming: bool) -> (dict, dict):
+    """
+    gets the column data types used to read the input files.
+
+    the types come from the ORION header file (rk-nodes.tab-hdr.temp_csv or rk-edges.tab-hdr.temp_csv) in the data directory.
+    explicitly typing the columns skips the pandas type inference and reduces the memory used for each column.
+
+    a set of fallback data types is also returned for data that does not match the header. these only make the list columns
+    text when streaming so that the type inferred in one chunk does not differ from another.
+
+    :param _data_dir:
+    :param _file_type:
+    :param _streaming:
+    :return: the data types and the fallback data types
+    """
+    # get the columns that will be converted into lists
+    rename_cols, list_cols, _, _ = get_conversion_cols(_file_type)
+
+    # init the fallback data types
+    fallback_dtypes: dict | None = None
+
+    # when streaming read the list columns as text, using their names as they are in the input file
+    if _streaming:
+        fallback_dtypes = {{v: k for k, v in rename_cols.items()}.get(col, col): str for col in list_cols}
+
+    # get the header schema
+    schema: CSVHeaderSchema = get_header_schema(_data_dir, _file_type)
+
+    # if there is no header file use the fallback types
+    if schema is None:
+        logger.debug("Header file not found, %s data types will be inferred.", _file_type)
+
+        return fallback_dtypes, fallback_dtypes
+
+    # get the data types declared in the header
+    dtypes: dict = schema.get_read_dtypes(category_cols)
+
+    # the fallback types still apply to any list column the header does not declare
+    if fallback_dtypes:
+        dtypes = fallback_dtypes | dtypes
+
+    # return to the caller
+    return dtypes, fallback_dtypes
+
+
+def get_header_schema(_data_dir, _file_type) -> CSVHeaderSchema | None:
+    """
+    gets the column names and data types from the ORION header file in the data directory.
+
+    :param _data_dir:
+    :param _file_type:
+    :return: the schema or None if there is no header file
+    """
+    # get the header file path
+    header_file: str = os.path.join(_data_dir, node_header_file_name if _file_type == 'NODE' else edge_header_file_name)
+
+    # return the schema if the file exists
+    return CSVHeaderSchema.from_file(header_file) if os.path.exists(header_file) else None
+
+
+def get_conversion_cols(_file_type) -> (dict, list, list, list):
+    """
+    gets the columns to rename, convert to lists, convert to int32 and delete for the type of data file.
+
+    :param _file_type:
+    :return:
+    """
+    # init the columns to rename in the data
+    reformat_rename_cols: dict = {}
+
+    # init the target array list conversion columns
+    reformat_list_cols: list = []
+
+    # init the target int32 conversion columns
+    reformat_int32_cols: list = []
+
+    # init the target columns to delete from the data
+    reformat_del_cols: list = []
+
+    # convert the list columns to be Kuzu compatible. e.g: "[]", [1,2,3,...], [1.2,2.3,3.4,...], [txt1,txt2, ...]
+    if _file_type == 'NODE':
+        # define the cols that need renaming (same for RK and CTD data)
+        reformat_rename_cols = {'category': 'labels'}
+
+        # define the target array list columns
+        reformat_list_cols = ['labels', 'equivalent_identifiers', 'hgvs']
+
+        # define the target int32 columns (None for CTD data)
+        reformat_int32_cols = ['lipinski', 'arom_c', 'sp3_c', 'sp2_c', 'sp_c', 'halogen', 'hetero_sp2_c', 'rotb', 'o_n', 'oh_nh', 'rgb',
+                               'fda_labels']
+
+    elif _file_type == 'EDGE':
+        # define the cols that need renaming (same for CTD and RK)
+        reformat_rename_cols = {'predicate': 'label'}
+
+        # define the target array list columns
+        reformat_list_cols: list = ['p_value', 'supporting_affinities', 'slope', 'publications', 'hetio_source', 'tmkp_ids', 'expressed_in',
+                                    'pubchem_assay_ids', 'patent_ids', 'aggregator_knowledge_source', 'category', 'provided_by',
+                                    'complex_context', 'has_evidence', 'qualifiers', 'phosphorylation_sites', 'drugmechdb_path_id']
+
+        # define the target int32 columns (none for CTD data)
+        reformat_int32_cols: list = ['distance_to_feature']
+
+    # return to the caller
+    return reformat_rename_cols, reformat_list_cols, reformat_int32_cols, reformat_del_cols
+
+
+def convert_frame(df: pd.DataFrame, _file_type, _data_format: str = 'csv', _float_list_cols: list = None) -> pd.DataFrame:
+    """
+    converts the data in a data frame (a whole file or a chunk of one) into the Kuzu compatible format.
+
+    for CSV output the lists are written as text (e.g. "[a,b,c]"), for parquet output they are native lists.
+
+    :param df:
+    :param _file_type:
+    :param _data_format: csv or parquet
+    :param _float_list_cols: the list columns that are converted into native float lists
+    :return:
+    """
+    # get the columns to work on
+    reformat_rename_cols, reformat_list_cols, reformat_int32_cols, reformat_del_cols = get_conversion_cols(_file_type)
+
+    if _file_type == 'EDGE':
+        # duplicate the subject and object columns into the from and to columns.
+        # it is a Kuzu requirement that the first 2 columns be from and to.
+        df.insert(loc=0, column='to', value=df['object'])
+        df.insert(loc=0, column='from', value=df['subject'])
+
+    # rename any specified columns in the data
+    df.rename(columns=reformat_rename_cols, inplace=True)
+
+    # get the node label classes in the right order. this is done once for each distinct label string
+    if 'labels' in df:
+        df['labels'] = df['labels'].map({x: reorder_node_classes(x) for x in df['labels'].dropna().unique()}).fillna('')
+
+    # apply the new formatting for lists
+    for col in reformat_list_cols:
+        # only do this if the column is there
+        if col in df:
+            # split the character seperated string into an array
+            if _data_format == 'parquet':
+                df[col] = ConvertUtils.to_list_array_column(df[col], numeric=col in (_float_list_cols or []))
+            else:
+                df[col] = ConvertUtils.format_list_column(df[col])
+
+    # apply the new formatting for INT32 data
+    for col in reformat_int32_cols:
+        # only do this if the column is there
+        if col in df:
+            # change the data type
+            if _data_format == 'parquet':
+                df[col] = ConvertUtils.to_int_column(df[col])
+            else:
+                df[col] = ConvertUtils.format_int_column(df[col])
+
+    # remove specified columns
+    df.drop(columns=reformat_del_cols, inplace=True, axis=1)
+
+    # return to the caller
+    return df
+
+
+@lru_cache(maxsize=reorder_cache_size)
+def reorder_node_classes(node_classes: str) -> str:
+    """
+    reorders the node labels array to put the highest priority in the front.
+
+    the remaining labels keep the order they were found in so the output is the same from run to run.
+    the results are cached as there are only a few thousand distinct category strings in the data.
+
+    :param node_classes:
+    :return:
+    """
+    # convert the string to a list of unique classes
+    class_list: list = list(dict.fromkeys(node_classes.split(';')))
+
+    # get the class with the highest priority
+    primary_class: str = min(class_list, key=lambda x: category_priority.get(x, len(category_priority)))
+
+    # move the item to the front of the list if it is a known class and not there already
+    if primary_class in category_priority and class_list[0] != primary_class:
+        class_list.remove(primary_class)
+        class_list.insert(0, primary_class)
+
+    # return the result in the original format
+    return ';'.join(class_list)
+
+
+def get_data_lookups(_data_dir, _infile, node_class_list, _file_type, _data_format: str = 'csv', _workers: int = 1,
+                     _bin_counts: Counter = None, _range_size: int = None):
+    """
+    this method bins data found in the "converted" files into node class/edge predicate files.
+
+    this method returns the node and edge columns for Kuzu DB tables.
+
+    if more than one worker is specified the edge files are scanned concurrently in a process pool and the per-file
+    results are merged.
+
+    :param _data_dir:
+    :param _infile:
+    :param node_class_list:
+    :param _file_type:
+    :param _data_format: csv or parquet
+    :param _workers:
+    :param _bin_counts: if passed, the number of edges for each (predicate, subject class, object class) is added to it
+    :param _range_size: the size in bytes of the byte ranges a single CSV input file is divided into
+    :return:
+    """
+
+    # make sure this is a supported file type
+    if _file_type not in ('NODE', 'EDGE'):
+        raise Exception('Unsupported file type.')
+
+    logger.debug(f"Getting {_file_type} data lookups...")
+
+    # save the node and its preferred class for the edge table relationships
+    with Timer(name=_file_type, text="The {name} lookup dict created in {:.2f}s", logger=logger.debug):
+        if _file_type == 'NODE':
+            # init the return value
+            ret_val: NodeClassIndex = NodeClassIndex()
+
+            # for each file to process
+            for inf in get_lookup_files(_data_dir, _infile, _file_type, _data_format, _workers, _range_size):
+                # get the node ids and classes in the file
+                rows = read_lookup_data(inf, _file_type)
+
+                # go through the node ids and classes a batch at a time
+                for batch in iter(lambda: list(islice(rows, lookup_batch_size)), []):
+                    # save the pairs to the index
+                    ret_val.update(*zip(*batch))
+
+        # save the source class/predicate/object class
+        elif _file_type == 'EDGE':
+            # init the return value
+            ret_val: defaultdict = defaultdict(set)
+
+            # init the number of edges for each predicate/subject class/object class
+            bin_counts: Counter = Counter()
+
+            # get the input file paths
+            edge_files: list = get_lookup_files(_data_dir, _infile, _file_type, _data_format, _workers, _range_size)
+
+            # scan the files in a pool of processes if requested
+            if _workers and _workers > 1:
+                logger.debug("Scanning %s %s files with %s workers.", len(edge_files), _file_type, _workers)
+
+                # the workers get the node class lookup once when they start
+                with ProcessPoolExecutor(max_workers=_workers, initializer=init_lookup_worker, initargs=(node_class_list,)) as executor:
+                    # submit the files to the pool, largest first
+                    futures: list = [executor.submit(get_edge_bin_counts, inf) for inf in PartFiles.largest_first(edge_files)]
+
+                    # merge the results as they complete
+                    for future in as_completed(futures):
+                        bin_counts.update(future.result())
+            else:
+                for inf in edge_files:
+                    bin_counts.update(get_edge_bin_counts(inf, node_class_list))
+
+            # save the subject class/object class sets for each predicate
+            for predicate, subject_class, object_class in bin_counts:
+                ret_val[predicate].add((subject_class, object_class))
+
+            # pass back the counts if requested
+            if _bin_counts is not None:
+                _bin_counts.update(bin_counts)
+
+    # inform the user something may be amiss
+    if len(ret_val) == 0:
+        logger.debug('Warning: No lookup data found for %s.', _file_type)
+
+    # return the index of node id/classes or the dict of n-e-n relationships
+    return ret_val
+
+
+def get_lookup_files(_data_dir, _infile, _file_type, _data_format: str = 'csv', _workers: int = 1, _range_size: int = None) -> list:
+    """
+    gets the converted files or, for a single CSV file, the byte ranges the lookup data is read from.
+
+    :param _data_dir:
+    :param _infile:
+    :param _file_type:
+    :param _data_format: csv or parquet
+    :param _workers:
+    :param _range_size: the size of a range in bytes
+    :return:
+    """
+    # parquet files are read whole
+    if _data_format == 'parquet':
+        return get_data_files(_data_dir, _infile, _file_type, _data_format)
+
+    return [inf for _, inf in get_data_parts(_data_dir, _infile, _file_type, _workers, _range_size)]
+
+
+def init_lookup_worker(node_class_lookup: NodeClassIndex) -> None:
+    """
+    saves the node class lookup in a worker process so that it is not sent with every task.
+
+    :param node_class_lookup:
+    :return:
+    """
+    global node_class_lookups
+
+    node_class_lookups = node_class_lookup
+
+
+def get_edge_bin_counts(inf: str | CSVRange, node_class_lookup: NodeClassIndex = None) -> Counter:
+    """
+    gets the number of edges for each predicate/subject class/object class in a converted edge file.
+
+    this is run in the worker processes when the files are scanned in parallel, the results of each file are merged by the caller.
+
+    :param inf:
+    :param node_class_lookup: the node class lookup, the one set by init_lookup_worker() is used if not passed
+    :return:
+    """
+    # use the worker's node class lookup if none was passed
+    node_class_lookup = node_class_lookup if node_class_lookup is not None else node_class_lookups
+
+    # init the return value
+    ret_val: Counter = Counter()
+
+    # get the edges in the file
+    rows = read_lookup_data(inf, 'EDGE')
 
-            # init the columns to rename in the data
-            reformat_rename_cols: dict = {}
+    # go through the edges a batch at a time
+    for batch in iter(lambda: list(islice(rows, lookup_batch_size)), []):
+        # get the subject ids, object ids and predicates
+        subject_ids, object_ids, predicates = zip(*batch)
 
-            # init the target array list conversion columns
-            reformat_list_cols: list = []
+        # get the class for the subjects and objects and count the edges where both vertices were found
+        ret_val.update((predicate, subject_class, object_class) for subject_class, object_class, predicate in
+                       zip(node_class_lookup.get_classes(subject_ids), node_class_lookup.get_classes(object_ids), predicates)
+                       if subject_class and object_class)
+
+    # return to the caller
+    return ret_val
 
-            # init the target int32 conversion columns
-            reformat_int32_cols: list = []
 
-            # init the target columns to delete from the data
-            reformat_del_cols: list = []
+def read_lookup_data(inf: str | CSVRange, _file_type):
+    """
+    reads the data needed for the lookups from a converted CSV or parquet file.
 
-            logger.debug("Converting file %s into %s", inf, out_file)
+    this yields the (node id, node class) for node files and (subject id, object id, predicate) for edge files.
+    the biolink prefix is removed from the class and predicate names.
 
-            # load the infile into a panda object
-            df = pd.read_csv(inf, low_memory=False)
+    :param inf:
+    :param _file_type:
+    :return:
+    """
+    if isinstance(inf, str) and inf.endswith('.parquet'):
+        # get the columns needed
+        columns: list = ['id', 'labels'] if _file_type == 'NODE' else ['from', 'to', 'label']
 
-            # convert the list columns to be Kuzu compatible. e.g: "[]", [1,2,3,...], [1.2,2.3,3.4,...], [txt1,txt2, ...]
+        # go through the file a batch at a time
+        for batch in pq.ParquetFile(inf).iter_batches(columns=columns):
             if _file_type == 'NODE':
-                # define the cols that need renaming (same for RK and CTD data)
-                reformat_rename_cols = {'category': 'labels'}
+                # the node class is the first item in the labels list
+                for node_id, labels in zip(batch.column(0).to_pylist(), batch.column(1).to_pylist()):
+                    yield node_id, labels[0].split(':')[1]
+            else:
+                for subject_id, object_id, predicate in zip(*[column.to_pylist() for column in batch.columns]):
+                    yield subject_id, object_id, predicate.split(':')[1]
+    else:
+        # open the input csv file or range
+        with CSVRanges.open(inf, 'r') as file:
+            # read the csv file
+            reader = csv.reader(file)
+
+            # Skip the header
+            next(reader)
+
+            # go through each line in the file
+            for row in reader:
+                if _file_type == 'NODE':
+                    # get the node id and class
+                    yield row[0], row[2].strip('[]').split(',')[0].split(':')[1]
+                else:
+                    # get the subject and object ids. note the predicate is in the 4th column in the CSV file
+                    yield row[0], row[1], row[3].split(':')[1]
+
+
+def bin_data(_data_dir, _infile, _file_type, node_class_lookup, _data_format: str = 'csv', _max_open_files: int = None,
+             _bin_buffer_size: int = None, _workers: int = 1, _shard_merge_size: int = None, _range_size: int = None,
+             _prune_columns: bool = False, _surrogate_keys: bool = False) -> list:
+    """
+    turns the converted files into files whose data is binned by node class and edge predicates.
+
+    only the fields needed to pick the bin (the node id and class or the from/to ids and predicate) are parsed, the original
+    lines are copied to the bin files unchanged. the lines are buffered for each bin and written out in large blocks.
+
+    if the columns are pruned the columns that hold data in each bin are also tracked, and once all the files are binned the
+    bin files are projected onto the columns used by their table, see prune_bin_columns().
+
+    if more than one worker is specified the CSV files are binned concurrently in a process pool, see bin_data_shards().
+
+    if the nodes are keyed by their dense integer keys, the key of each node is added as the first column of the node bin files
+    and the from/to columns of the edge bin files hold the keys of the subject and object.
+
+    input file names we be of the form: rk-nodes-conv<file number>.csv or rk-edges-conv<file number>.csv
+    output file names will be of the form: rk-nodes-bin-<node class>.csv or rk-edges-bin-<edge predicate>.csv
+
+    :param _data_dir:
+    :param _infile:
+    :param _file_type:
+    :param node_class_lookup:
+    :param _data_format: csv or parquet
+    :param _max_open_files: the maximum number of output files kept open at one time
+    :param _bin_buffer_size: the number of bytes buffered for a bin before it is written out
+    :param _workers:
+    :param _shard_merge_size: when binning with workers, the bins whose shards are larger than this (bytes) keep their shards
+    :param _range_size: the size in bytes of the byte ranges a single CSV input file is divided into
+    :param _prune_columns: leave the columns that are empty for a whole table out of its bin files
+    :param _surrogate_keys: key the nodes by their dense integer keys from the node class lookup
+    :return: the list of input files that failed
+    """
+    # the tables get all the columns unless the new bin files are projected
+    BinColumns.save(os.path.join(_data_dir, table_columns_file_name), _file_type)
+
+    # parquet files are binned a batch at a time
+    if _data_format == 'parquet':
+        if _surrogate_keys:
+            raise ValueError('The node keys are not supported for parquet bin files, use the load step or recreate the lookups without '
+                             '--surrogate-keys.')
+
+        if _prune_columns:
+            logger.warning('Column pruning is only supported for CSV bin files, the %s parquet bin files keep all the columns.', _file_type)
+
+        return bin_parquet_data(_data_dir, _infile, _file_type, node_class_lookup)
+
+    logger.debug('Binning %s data files.', _file_type)
+
+    # get the input file paths or the byte ranges of a single file
+    in_files: list = [inf for _, inf in get_data_parts(_data_dir, _infile, _file_type, _workers, _range_size)]
+
+    # get the output file name prefix. done so this works in both a windows and linux environment
+    out_prefix: str = str(os.path.join(_data_dir, get_output_prefix(_data_dir, _infile, 'conv', 'bin-'))).replace('\\', '/')
+
+    # get the path of the file the rows that cannot be binned are written to
+    rejects_file: str = str(os.path.join(_data_dir, get_output_prefix(_data_dir, _infile, 'conv', 'rejects') + '.csv')).replace('\\', '/')
+
+    # remove the bin shards and rejects of an earlier run
+    remove_stale_bin_files(out_prefix, rejects_file)
+
+    # bin the files in a pool of processes if requested
+    if _workers and _workers > 1:
+        bin_columns, failed_files = bin_data_shards(_data_dir, in_files, out_prefix, rejects_file, _file_type, node_class_lookup, _max_open_files,
+                                                    _bin_buffer_size, _workers, _shard_merge_size, _prune_columns, _surrogate_keys)
+    else:
+        bin_columns, failed_files = bin_data_files(in_files, out_prefix, rejects_file, _file_type, node_class_lookup, _max_open_files,
+                                                   _bin_buffer_size, _prune_columns, _surrogate_keys)
+
+    # project the bin files onto the columns used by their table
+    if bin_columns is not None:
+        prune_bin_columns(_data_dir, out_prefix, _file_type, bin_columns)
+
+    # return the failed files
+    return failed_files
+
+
+def remove_stale_bin_files(out_prefix: str, rejects_file: str) -> None:
+    """
+    removes the bin shard files and the rejects file left by an earlier bin step. the import step loads every shard file it finds
+    with the bin files, so the shards of an earlier sharded bin step would be loaded again with the new bins.
+
+    :param out_prefix: the output file path prefix of the bin files
+    :param rejects_file: the path of the file the rows that cannot be binned are written to
+    :return:
+    """
+    # remove the rejects, the file is only created if there are rejects
+    if os.path.exists(rejects_file):
+        os.remove(rejects_file)
+
+    # remove the bin shards
+    for shard_file in glob.glob(glob.escape(out_prefix) + '*' + bin_shard_suffix):
+        os.remove(shard_file)
+
+
+def bin_data_files(in_files: list, out_prefix: str, rejects_file: str, _file_type, node_class_lookup: NodeClassIndex, _max_open_files: int = None,
+                   _bin_buffer_size: int = None, _prune_columns: bool = False, _surrogate_keys: bool = False) -> (BinColumns | None, list):
+    """
+    bins the converted CSV files one after the other.
+
+    :param in_files:
+    :param out_prefix: the output file path prefix
+    :param rejects_file: the path of the file the rows that cannot be binned are written to
+    :param _file_type:
+    :param node_class_lookup:
+    :param _max_open_files: the maximum number of output files kept open at one time
+    :param _bin_buffer_size: the number of bytes buffered for a bin before it is written out
+    :param _prune_columns: track the columns that hold data in each bin
+    :param _surrogate_keys: key the nodes by their dense integer keys
+    :return: the columns that hold data in each bin (if they are tracked and all the files were binned) and the list of input
+    files that failed
+    """
+    # init the bin writer, the output file path is resolved once for each bin
+    bin_writer: BinWriter = BinWriter(lambda class_or_pred: out_prefix + class_or_pred + '.csv', _max_open_files, _bin_buffer_size)
+
+    # init the accounting of the rows that cannot be binned
+    reject_log: RejectLog = RejectLog(logger, rejects_file)
+
+    # init the tracking of the columns that hold data in each bin
+    bin_columns: BinColumns | None = BinColumns(required_bin_columns[_file_type]) if _prune_columns else None
+
+    # init the list of failed files
+    failed_files: list = []
+
+    try:
+        # loop through the converted files
+        for inf in in_files:
+            try:
+                bin_csv_file(inf, _file_type, node_class_lookup, bin_writer, reject_log, bin_columns, _surrogate_keys)
+            except Exception as e:
+                logger.error('Failed to bin %s file %s: %s', _file_type, inf, e)
+
+                # save the failure
+                failed_files.append(inf)
+
+                # the bin files are incomplete, they are not projected
+                bin_columns = None
+    finally:
+        # write out the buffered lines and close all the files that are open
+        bin_writer.close()
+        reject_log.close()
+
+        reject_log.log_summary(f'Binning {_file_type} data files')
+
+        logger.debug('Binning %s data files complete. Output: %s', _file_type, bin_writer.get_stats())
+
+    if failed_files:
+        logger.error('%s of %s %s files failed to bin.', len(failed_files), len(in_files), _file_type)
+
+    # return to the caller
+    return bin_columns, failed_files
+
+
+def bin_csv_file(inf: str | CSVRange, _file_type, node_class_lookup: NodeClassIndex, bin_writer: BinWriter, reject_log: RejectLog,
+                 bin_columns: BinColumns = None, surrogate_keys: bool = False) -> None:
+    """
+    copies the lines of a converted CSV file into their node class or edge predicate bins.
+
+    lines that cannot be binned are passed to the reject log.
+
+    if the nodes are keyed by their dense integer keys, the node key is added in front of each node line and the from/to ids
+    of each edge line are replaced by the subject and object keys. the rest of the line is copied unchanged.
+
+    :param inf:
+    :param _file_type:
+    :param node_class_lookup:
+    :param bin_writer:
+    :param reject_log:
+    :param bin_columns: the tracking of the columns that hold data in each bin, if they are tracked
+    :param surrogate_keys: key the nodes by their dense integer keys from the node class lookup
+    :return:
+    """
+    logger.debug('Binning %s file', inf)
+
+    # the number of leading fields needed to bin a row. nodes: id, name, labels. edges: from, to, subject, predicate
+    field_count: int = 3 if _file_type == 'NODE' else 4
+
+    # open the input csv file or range
+    with CSVRanges.open(inf) as file:
+        # read the csv records
+        records = BinWriter.read_records(file)
+
+        # save the header, it is written at the top of each new bin file and the rejects file
+        header: bytes = next(records)
+
+        reject_log.set_header(header)
+
+        # the node bin files start with the node key column
+        if surrogate_keys and _file_type == 'NODE':
+            header = node_key_column.encode('utf-8') + b',' + header
+
+        bin_writer.set_header(header)
+
+        if bin_columns is not None:
+            bin_columns.set_header(header)
+
+        # go through the records in the file a batch at a time
+        for batch in iter(lambda: list(islice(records, lookup_batch_size)), []):
+            # get the fields needed to bin each record
+            fields: list = [BinWriter.get_leading_fields(record, field_count) for record in batch]
+
+            # get the node keys or the from/to node classes (and keys) for the batch. the keys are formatted into the lines as ints
+            if _file_type == 'NODE':
+                if surrogate_keys:
+                    node_keys = node_class_lookup.get_keys([row[0] for row in fields]).tolist()
+            elif surrogate_keys:
+                subject_classes, subject_keys = node_class_lookup.get_classes_and_keys([row[0] for row in fields])
+                object_classes, object_keys = node_class_lookup.get_classes_and_keys([row[1] for row in fields])
+
+                subject_keys, object_keys = subject_keys.tolist(), object_keys.tolist()
+            else:
+                subject_classes = node_class_lookup.get_classes([row[0] for row in fields])
+                object_classes = node_class_lookup.get_classes([row[1] for row in fields])
+
+            # go through each record in the batch
+            for index, (record, row) in enumerate(zip(batch, fields)):
+                # get the class or predicate based on the type of file being processed
+                if _file_type == 'NODE':
+                    # get the node class
+                    class_or_pred = row[2].strip('[]').split(',')[0]
+
+                    # make sure there is a node class
+                    if ':' not in class_or_pred:
+                        reject_log.add('no_node_class', record, 'Could not get the node class for %s in %s.', row[0], inf)
+                        continue
+
+                    class_or_pred = class_or_pred.split(':')[1]
+
+                    # put the node key in front of the line. the node must be in the lookup the keys come from
+                    if surrogate_keys:
+                        if node_keys[index] < 0:
+                            reject_log.add('no_node_key', record, 'Could not get the node key for %s in %s.', row[0], inf)
+                            continue
+
+                        record = b'%d,' % node_keys[index] + record
+                else:
+                    # get the from/to node classes
+                    subject_class = subject_classes[index]
+                    object_class = object_classes[index]
+
+                    # make sure we get the target node classes
+                    if subject_class and object_class:
+                        # get the predicate with node classes for the file name
+                        class_or_pred = row[3].split(':')[1] + '_' + subject_class + '_' + object_class
+                    else:
+                        # get the reason the edge cannot be binned
+                        if subject_class:
+                            reason = 'unknown_object'
+                        elif object_class:
+                            reason = 'unknown_subject'
+                        else:
+                            reason = 'unknown_subject_and_object'
+
+                        reject_log.add(reason, record, 'Could not get the subject or object class for %s or %s in %s.', row[0], row[1], inf)
+                        continue
+
+                    # replace the from/to ids with the node keys
+                    if surrogate_keys:
+                        record = b'%d,%d,' % (subject_keys[index], object_keys[index]) + record[BinWriter.get_field_offset(record, 2):]
+
+                # note the columns of the line that hold data
+                if bin_columns is not None:
+                    bin_columns.add(class_or_pred, record)
+
+                # copy the line to its bin
+                bin_writer.write(class_or_pred, record)
+
+
+def bin_data_shards(_data_dir, in_files: list, out_prefix: str, rejects_file: str, _file_type, node_class_lookup: NodeClassIndex,
+                    _max_open_files: int = None, _bin_buffer_size: int = None, _workers: int = 2, _shard_merge_size: int = None,
+                    _prune_columns: bool = False, _surrogate_keys: bool = False) -> (BinColumns | None, list):
+    """
+    bins the converted CSV files concurrently in a process pool.
+
+    each worker bins a whole file into its own shard of every bin (rk-edges-bin-<edge predicate>.shard<n>.csv). once all
+    the files are done the shards of each bin are concatenated into the bin file and removed. the rejected rows are
+    sharded and merged the same way.
+
+    if a shard merge size is specified only the bins whose shards add up to that size or less are concatenated. the shards
+    of the larger bins are kept and loaded together by the import step, which saves copying the bulk of the data again.
+
+    the workers memory map the node class index from the lookup store file so that it is shared through the page cache
+    rather than copied into every process. if there is no lookup store the index is sent to each worker once when it starts.
+
+    :param _data_dir:
+    :param in_files:
+    :param out_prefix: the output file path prefix
+    :param rejects_file: the path of the file the rows that cannot be binned are written to
+    :param _file_type:
+    :param node_class_lookup:
+    :param _max_open_files: the maximum number of output files kept open at one time, this is split between the workers
+    :param _bin_buffer_size: the number of bytes buffered for a bin before it is written out
+    :param _workers:
+    :param _shard_merge_size: the size (bytes) of the largest bin whose shards are concatenated, all are if not specified
+    :param _prune_columns: track the columns that hold data in each bin
+    :param _surrogate_keys: key the nodes by their dense integer keys
+    :return: the columns that hold data in each bin (if they are tracked and all the files were binned) and the list of input
+    files that failed
+    """
+    # get the way the workers get the node class lookup. the node data only needs it for the node keys
+    store_file: str = os.path.join(_data_dir, lookup_store_file_name)
+
+    if _file_type == 'NODE' and not _surrogate_keys:
+        initializer, init_args = None, ()
+    elif os.path.exists(store_file):
+        initializer, init_args = init_store_worker, (store_file,)
+    else:
+        logger.debug('Lookup store %s not found, the node class lookup is copied to each worker.', store_file)
+
+        initializer, init_args = init_lookup_worker, (node_class_lookup,)
+
+    # each worker gets a share of the open file limit
+    max_open_files: int = max(1, (_max_open_files or BinFilePool.default_max_open_files) // _workers)
+
+    # init the shard files of each bin. bin key: [shard file paths]
+    shards: defaultdict = defaultdict(list)
+
+    # init the combined usage counters
+    stats: Counter = Counter()
+
+    # init the combined reject counts, the rejected rows are in the worker's shard files
+    reject_log: RejectLog = RejectLog(logger, rejects_file)
+
+    # init the rejects shard files
+    reject_shards: list = []
+
+    # init the combined tracking of the columns that hold data in each bin
+    bin_columns: BinColumns | None = BinColumns(required_bin_columns[_file_type]) if _prune_columns else None
+
+    # init the list of failed files
+    failed_files: list = []
+
+    logger.debug('Binning %s %s files with %s workers.', len(in_files), _file_type, _workers)
+
+    with ProcessPoolExecutor(max_workers=_workers, initializer=initializer, initargs=init_args) as executor:
+        # submit the files to the pool, largest first. the shard number is the position of the file in the list
+        futures: dict = {executor.submit(bin_csv_file_shard, inf, _file_type, out_prefix, rejects_file, shard, max_open_files, _bin_buffer_size,
+                                         _prune_columns, _surrogate_keys): inf
+                         for shard, inf in enumerate(PartFiles.largest_first(in_files))}
+
+        # collect the results as they complete
+        for future in as_completed(futures):
+            try:
+                shard_paths, shard_stats, reject_counts, reject_shard, shard_columns = future.result()
+            except Exception as e:
+                logger.error('Failed to bin %s file %s: %s', _file_type, futures[future], e)
+
+                # save the failure
+                failed_files.append(futures[future])
+
+                # the bin files are incomplete, they are not projected
+                bin_columns = None
+
+                continue
+
+            # save the shard files of each bin
+            for class_or_pred, shard_path in shard_paths.items():
+                shards[class_or_pred].append(shard_path)
+
+            stats.update(shard_stats)
+
+            # save the reject counts and file
+            reject_log.update(reject_counts)
+
+            if reject_shard:
+                reject_shards.append(reject_shard)
+
+            # combine the columns that hold data in each bin
+            if bin_columns is not None:
+                bin_columns.update(shard_columns)
+
+    # init the number of bins whose shards were kept
+    kept_count: int = 0
+
+    with Timer(name=_file_type, text="{name} bin shards merged in {:.2f}s", logger=logger.debug):
+        # concatenate the shards of each bin into the bin file
+        for class_or_pred, shard_paths in shards.items():
+            # get the bin file path
+            out_file: str = out_prefix + class_or_pred + '.csv'
+
+            # keep the shards of the large bins, the bin file of an earlier run is removed so that it is not imported with them
+            if _shard_merge_size is not None and sum(os.path.getsize(shard_path) for shard_path in shard_paths) > _shard_merge_size:
+                if os.path.exists(out_file):
+                    os.remove(out_file)
+
+                kept_count += 1
+            else:
+                BinWriter.merge_files(out_file, sorted(shard_paths))
+
+        # concatenate the rejected rows
+        if reject_shards:
+            BinWriter.merge_files(rejects_file, sorted(reject_shards))
+
+    reject_log.log_summary(f'Binning {_file_type} data files')
+
+    logger.debug('Binning %s data files complete. %s bins from %s shards, %s kept as shards. Output: %s', _file_type, len(shards),
+                 sum(len(shard_paths) for shard_paths in shards.values()), kept_count, dict(stats))
+
+    if failed_files:
+        logger.error('%s of %s %s files failed to bin.', len(failed_files), len(in_files), _file_type)
+
+    # return to the caller
+    return bin_columns, failed_files
+
+
+def init_store_worker(store_file: str) -> None:
+    """
+    memory maps the node class lookup from the lookup store file in a worker process.
+
+    :param store_file:
+    :return:
+    """
+    global node_class_lookups
+
+    node_class_lookups, _ = LookupStore.load(store_file)
+
+
+def bin_csv_file_shard(inf: str | CSVRange, _file_type, out_prefix: str, rejects_file: str, shard: int, _max_open_files: int = None,
+                       _bin_buffer_size: int = None, _prune_columns: bool = False, _surrogate_keys: bool = False) -> (dict, dict, Counter, str, BinColumns):
+    """
+    bins a converted CSV file into its own shard of each bin.
+
+    this is run in the worker processes, the node class lookup is the one set by the pool initializer.
+
+    :param inf:
+    :param _file_type:
+    :param out_prefix: the output file path prefix
+    :param rejects_file: the path of the file the rows that cannot be binned are written to
+    :param shard: the shard number
+    :param _max_open_files: the maximum number of output files kept open at one time
+    :param _bin_buffer_size: the number of bytes buffered for a bin before it is written out
+    :param _prune_columns: track the columns that hold data in each bin
+    :param _surrogate_keys: key the nodes by their dense integer keys
+    :return: the shard file path of each bin, the usage counters, the reject counts, the rejects shard file (if any) and the columns
+    that hold data in each bin (if they are tracked)
+    """
+    # init the bin writer for the shard files
+    bin_writer: BinWriter = BinWriter(lambda class_or_pred: out_prefix + class_or_pred + f'.shard{shard}.csv', _max_open_files, _bin_buffer_size)
+
+    # init the accounting of the rows that cannot be binned
+    reject_log: RejectLog = RejectLog(logger, rejects_file.removesuffix('.csv') + f'.shard{shard}.csv')
+
+    # init the tracking of the columns that hold data in each bin
+    bin_columns: BinColumns | None = BinColumns(required_bin_columns[_file_type]) if _prune_columns else None
+
+    try:
+        # bin the file
+        bin_csv_file(inf, _file_type, node_class_lookups, bin_writer, reject_log, bin_columns, _surrogate_keys)
+    finally:
+        # write out the buffered lines and close all the files that are open
+        bin_writer.close()
+        reject_log.close()
+
+    # return the shard files and the counters
+    return (bin_writer.paths, bin_writer.get_stats(), reject_log.counts,
+            reject_log.out_file if reject_log.counts and os.path.exists(reject_log.out_file) else None, bin_columns)
+
+
+def prune_bin_columns(_data_dir, out_prefix: str, _file_type, bin_columns: BinColumns) -> None:
+    """
+    projects the bin files onto the columns used by their table and saves the columns kept for each table.
+
+    a node class bin is loaded into a table of its own. the edge bins are named <predicate>_<subject class>_<object class>
+    (node classes have no underscores) and all the bins of a predicate are loaded into its rel table, so these keep the columns
+    that hold data in any of them.
+
+    :param _data_dir:
+    :param out_prefix: the output file path prefix
+    :param _file_type:
+    :param bin_columns: the columns that hold data in each bin
+    :return:
+    """
+    # get the bins of each table
+    tables: defaultdict = defaultdict(list)
+
+    for class_or_pred in bin_columns.empty:
+        tables[class_or_pred if _file_type == 'NODE' else class_or_pred.rsplit('_', 2)[0]].append(class_or_pred)
+
+    # init the columns kept for each table
+    table_columns: dict = {}
+
+    with Timer(name=_file_type, text="{name} bin files projected in {:.2f}s", logger=logger.debug):
+        for table, bin_keys in sorted(tables.items()):
+            # get the columns that hold data in the table
+            table_columns[table] = bin_columns.get_columns(bin_keys)
+
+            # the bin files with all the columns are left as they are
+            if len(table_columns[table]) == len(bin_columns.header):
+                continue
+
+            for class_or_pred in bin_keys:
+                for bin_file in get_bin_files(out_prefix + class_or_pred + '.csv'):
+                    BinColumns.project_file(bin_file, table_columns[table])
+
+    # save the columns kept for each table, the table definitions are created with them
+    BinColumns.save(os.path.join(_data_dir, table_columns_file_name), _file_type, bin_columns.header, table_columns)
+
+    logger.debug('%s bin files projected onto the columns used by their table. %s of %s table columns kept in %s tables.', _file_type,
+                 sum(len(columns) for columns in table_columns.values()), len(table_columns) * len(bin_columns.header), len(table_columns))
+
+
+def bin_parquet_data(_data_dir, _infile, _file_type, node_class_lookup) -> list:
+    """
+    turns the converted parquet files into parquet files whose data is binned by node class and edge predicates.
+
+    input file names we be of the form: rk-nodes-conv<file number>.parquet or rk-edges-conv<file number>.parquet
+    output file names will be of the form: rk-nodes-bin-<node class>.parquet or rk-edges-bin-<edge predicate>.parquet
+
+    rows that cannot be binned are passed to the reject log, they are written to the rejects file as CSV records.
+
+    :param _data_dir:
+    :param _infile:
+    :param _file_type:
+    :param node_class_lookup:
+    :return: the list of input files that failed
+    """
+    logger.debug('Binning %s parquet data files.', _file_type)
+
+    # init the list of parquet file writers
+    open_files: dict = {}
+
+    # init the list of failed files
+    failed_files: list = []
+
+    # get the input file paths
+    in_files: list = get_data_files(_data_dir, _infile, _file_type, 'parquet')
+
+    # get the path of the file the rows that cannot be binned are written to
+    rejects_file: str = str(os.path.join(_data_dir, get_output_prefix(_data_dir, _infile, 'conv', 'rejects') + '.csv')).replace('\\', '/')
+
+    # remove the rejects of an earlier run, the file is only created if there are rejects
+    if os.path.exists(rejects_file):
+        os.remove(rejects_file)
+
+    # init the accounting of the rows that cannot be binned
+    reject_log: RejectLog = RejectLog(logger, rejects_file)
+
+    try:
+        # loop through the converted files
+        for inf in in_files:
+            try:
+                logger.debug('Binning %s file', inf)
+
+                # go through the file a batch at a time
+                for batch in pq.ParquetFile(inf).iter_batches():
+                    # init the reason each row that cannot be binned is rejected. row index: reason
+                    reasons: dict = {}
+
+                    # get the class or predicate for each row based on the type of file being processed
+                    if _file_type == 'NODE':
+                        # get the node class from the first item in the labels list
+                        bin_keys = pc.list_element(pc.split_pattern(pc.list_element(batch.column('labels'), 0), ':'), 1).to_pylist()
+
+                        # make sure there is a node class
+                        reasons = {index: 'no_node_class' for index, bin_key in enumerate(bin_keys) if not bin_key}
+                    else:
+                        # init the list of bin keys
+                        bin_keys = []
+
+                        # get the from/to node classes
+                        subject_classes = node_class_lookup.get_classes(batch.column('from').to_pylist())
+                        object_classes = node_class_lookup.get_classes(batch.column('to').to_pylist())
+
+                        # get the predicate with node classes for the file name
+                        for index, (subject_class, object_class, predicate) in enumerate(zip(subject_classes, object_classes,
+                                                                                             batch.column('label').to_pylist())):
+                            # make sure we get the target node classes
+                            if subject_class and object_class:
+                                bin_keys.append(predicate.split(':')[1] + '_' + subject_class + '_' + object_class)
+                            else:
+                                bin_keys.append(None)
+
+                                # get the reason the edge cannot be binned
+                                if subject_class:
+                                    reasons[index] = 'unknown_object'
+                                elif object_class:
+                                    reasons[index] = 'unknown_subject'
+                                else:
+                                    reasons[index] = 'unknown_subject_and_object'
+
+                    # pass the rows that cannot be binned to the reject log
+                    if reasons:
+                        reject_parquet_rows(reject_log, batch, reasons, _file_type, inf)
+
+                    # get the bin for each row, dropping the rows that could not be binned
+                    bin_keys: pd.Series = pd.Series(bin_keys, dtype=object).dropna()
+
+                    # get the row indexes for each bin in this batch
+                    for class_or_pred, indexes in bin_keys.groupby(bin_keys).groups.items():
+                        # get the output file path
+                        out_file = os.path.join(_data_dir, _infile.replace('conv', 'bin-') + class_or_pred + '.parquet')
+
+                        # done so this works in both a windows and linux environment
+                        out_file = str(out_file).replace('\\', '/')
+
+                        # check to see if this file has already been created
+                        if open_files.get(out_file, None) is None:
+                            # create the file
+                            open_files.update({out_file: pq.ParquetWriter(out_file, batch.schema)})
+
+                        # copy the rows to the new destination
+                        open_files[out_file].write_batch(batch.take(indexes.to_numpy()))
+
+            except Exception as e:
+                logger.error('Failed to bin %s file %s: %s', _file_type, inf, e)
+
+                # save the failure
+                failed_files.append(inf)
+    finally:
+        # close all the files that were opened
+        [v.close() for k, v in open_files.items()]
+
+        reject_log.close()
+
+        reject_log.log_summary(f'Binning {_file_type} parquet data files')
+
+        logger.debug('Binning %s data files complete.', _file_type)
+
+    if failed_files:
+        logger.error('%s of %s %s files failed to bin.', len(failed_files), len(in_files), _file_type)
+
+    # return to the caller
+    return failed_files
+
+
+def reject_parquet_rows(reject_log: RejectLog, batch, reasons: dict, _file_type, inf: str) -> None:
+    """
+    passes the rows of a parquet batch that cannot be binned to the reject log. the rows are formatted as CSV records, list
+    values are written the way they are in the converted CSV files.
+
+    :param reject_log:
+    :param batch: the parquet record batch
+    :param reasons: the reason each row is rejected. row index: reason
+    :param _file_type:
+    :param inf:
+    :return:
+    """
+    # the header of the rejected rows
+    reject_log.set_header(','.join(batch.schema.names).encode('utf-8') + b'\n')
+
+    # get the rejected rows
+    rows: list = batch.take(pa.array(list(reasons), type=pa.int64())).to_pylist()
+
+    # format each row as a CSV record
+    out_buffer: io.StringIO = io.StringIO()
+
+    writer = csv.writer(out_buffer, lineterminator='\n')
+
+    for reason, row in zip(reasons.values(), rows):
+        writer.writerow(['[' + ','.join(map(str, value)) + ']' if isinstance(value, list) else value for value in row.values()])
+
+        record: bytes = out_buffer.getvalue().encode('utf-8')
+
+        out_buffer.seek(0)
+        out_buffer.truncate()
+
+        if _file_type == 'NODE':
+            reject_log.add(reason, record, 'Could not get the node class for %s in %s.', row.get('id'), inf)
+        else:
+            reject_log.add(reason, record, 'Could not get the subject or object class for %s or %s in %s.', row.get('from'), row.get('to'), inf)
+
+
+def fuse_data(_data_dir, _infile, _file_type, node_class_lookup, _chunk_size: int = None, _memory_budget: int = None,
+              _data_format: str = 'csv', _bin_counts: Counter = None, _max_open_files: int = None, _range_size: int = None) -> (dict, list):
+    """
+    converts the split files, gets the lookup data and bins the converted data in a single streaming pass.
+
+    this does the convert, create lookups and bin steps without writing or re-reading the intermediate converted files.
+    the node files must be fused first as the node class lookup is needed to bin the edge data.
+
+    input file names will be of the form: rk-nodes-pt<file number>.csv or rk-edges-pt<file number>.csv
+    output file names will be of the form: rk-nodes-bin-<node class>.csv or rk-edges-bin-<edge predicate>.csv
+
+    :param _data_dir:
+    :param _infile:
+    :param _file_type:
+    :param node_class_lookup:
+    :param _chunk_size:
+    :param _memory_budget:
+    :param _data_format: csv or parquet
+    :param _bin_counts: if passed, the number of edges for each (predicate, subject class, object class) is added to it
+    :param _max_open_files: the maximum number of CSV output files kept open at one time
+    :param _range_size: the size in bytes of the byte ranges a single CSV input file is divided into
+    :return: the index of node id/classes or the dict of n-e-n relationships and the list of input files that failed
+    """
+    logger.debug('Fusing %s data files.', _file_type)
+
+    # init the lookup data
+    if _file_type == 'NODE':
+        ret_val: NodeClassIndex = NodeClassIndex()
+    elif _file_type == 'EDGE':
+        ret_val: defaultdict = defaultdict(set)
+    else:
+        raise Exception('Unsupported file type.')
+
+    # init the list of failed files
+    failed_files: list = []
+
+    # init the list of parquet file writers. these stay open as parquet files cannot be appended to
+    open_files: dict = {}
+
+    # init the pool of CSV output file handles
+    bin_files: BinFilePool = BinFilePool(_max_open_files)
+
+    # init the parquet schema all the binned files are written with
+    schema = None
+
+    # get the data types to read the data with and the ones to fall back to if the data does not match them
+    dtypes, fallback_dtypes = get_read_dtypes(_data_dir, _file_type, bool(_chunk_size or _memory_budget))
+
+    # get the header schema for the list columns that hold numbers
+    header_schema: CSVHeaderSchema = get_header_schema(_data_dir, _file_type)
+
+    # get the method that converts the data
+    convert_method = partial(convert_frame, _data_format=_data_format,
+                             _float_list_cols=header_schema.get_columns_by_type('float[]') if header_schema else [])
+
+    # get the output file name prefix
+    out_prefix: str = get_output_prefix(_data_dir, _infile, 'pt', 'bin-')
+
+    # remove the bin shards and rejects of an earlier bin step so that they are not imported with the new bins
+    remove_stale_bin_files(str(os.path.join(_data_dir, out_prefix)).replace('\\', '/'),
+                           str(os.path.join(_data_dir, get_output_prefix(_data_dir, _infile, 'pt', 'rejects') + '.csv')).replace('\\', '/'))
+
+    # init the counters of the rows read and the rows that could not be binned in the current file
+    row_count: int = 0
+    skipped_count: int = 0
+
+    def fuse_file(inf: str | CSVRange, chunk_size: int, read_dtypes: dict) -> None:
+        """
+        converts and bins the data in a file a chunk at a time.
+        """
+        nonlocal schema, row_count, skipped_count
+
+        with ConvertUtils.read_csv_chunks(inf, chunk_size, read_dtypes) as chunks:
+            for chunk in chunks:
+                # get the class or predicate for each row based on the type of file being processed
+                if _file_type == 'NODE':
+                    # get the node class from the highest priority label
+                    bin_keys: pd.Series = chunk['category'].astype(object).map(
+                        {x: reorder_node_classes(x).split(';')[0].split(':')[1] for x in chunk['category'].dropna().unique()})
+
+                    # save the node ids and classes
+                    ret_val.update(chunk['id'][bin_keys.notna()], bin_keys.dropna())
+                else:
+                    # get the predicate and the from/to node classes
+                    predicates: pd.Series = chunk['predicate'].astype(object).map({x: x.split(':')[1] for x in chunk['predicate'].dropna().unique()})
+                    subject_classes: pd.Series = pd.Series(node_class_lookup.get_classes(chunk['subject']), index=chunk.index)
+                    object_classes: pd.Series = pd.Series(node_class_lookup.get_classes(chunk['object']), index=chunk.index)
+
+                    # get the predicate with node classes for the file name. this is empty if either class was not found
+                    bin_keys: pd.Series = predicates + '_' + subject_classes + '_' + object_classes
+
+                    # get the number of edges for each predicate/subject class/object class
+                    chunk_counts: pd.Series = pd.concat([predicates, subject_classes, object_classes], axis=1)[bin_keys.notna()].value_counts()
+
+                    # save the subject class/predicate/object class sets
+                    for (predicate, subject_class, object_class), count in chunk_counts.items():
+                        ret_val[predicate].add((subject_class, object_class))
+
+                        if _bin_counts is not None:
+                            _bin_counts[(predicate, subject_class, object_class)] += int(count)
+
+                # convert the chunk
+                df: pd.DataFrame = convert_method(chunk, _file_type)
+
+                # add to the row counters
+                row_count += len(df)
+                skipped_count += int(bin_keys.isna().sum())
+
+                # get the data in an arrow table, the binned files all have the schema of the first one
+                if _data_format == 'parquet':
+                    table = ConvertUtils.to_arrow_table(df)
+
+                    if schema is None:
+                        schema = table.schema
+                    else:
+                        table = table.cast(schema)
+                else:
+                    # get the CSV file header
+                    csv_hdr: str = df.head(0).to_csv(index=False, lineterminator='\n')
+
+                    # write the chunk as CSV text once rather than once for each bin
+                    lines = np.array(df.to_csv(index=False, lineterminator='\n').split('\n')[1:-1], dtype=object)
+
+                    # the lines can only be used if there was no data with line breaks in it
+                    if len(lines) != len(df):
+                        lines = None
+
+                # get the row positions for each bin in this chunk
+                for class_or_pred, indexes in bin_keys.groupby(bin_keys, sort=False).indices.items():
+                    # get the output file path
+                    out_file = os.path.join(_data_dir, out_prefix + class_or_pred + '.' + _data_format)
+
+                    # done so this works in both a windows and linux environment
+                    out_file = str(out_file).replace('\\', '/')
+
+                    if _data_format == 'parquet':
+                        # check to see if this file has already been created
+                        if open_files.get(out_file, None) is None:
+                            open_files.update({out_file: pq.ParquetWriter(out_file, schema)})
+
+                        # copy the rows to the new destination
+                        open_files[out_file].write_table(table.take(indexes))
+                    else:
+                        # get the file handle, the file is created or reopened if needed
+                        file_handle, is_new = bin_files.get(out_file)
+
+                        # copy the rows to the new destination, the header is written when the file is created
+                        if lines is not None:
+                            file_handle.write((csv_hdr if is_new else '') + '\n'.join(lines[indexes]) + '\n')
+                        else:
+                            df.iloc[indexes].to_csv(file_handle, index=False, header=is_new, lineterminator='\n')
+
+    with Timer(name=_file_type, text="{name} DB files fused in {:.2f}s", logger=logger.debug):
+        try:
+            for _, inf in get_data_parts(_data_dir, _infile, _file_type, 1, _range_size):
+                # reset the row counters
+                row_count = 0
+                skipped_count = 0
+
+                try:
+                    # get the number of rows to process at a time (if any)
+                    chunk_size: int = _chunk_size or ConvertUtils.get_chunk_size(inf, _memory_budget)
+
+                    logger.debug('Fusing %s file %s, chunk size: %s', _file_type, inf, chunk_size)
+
+                    try:
+                        # fuse the file
+                        fuse_file(inf, chunk_size, dtypes)
+                    except (ValueError, TypeError) as e:
+                        # nothing else to try if these were already the fallback data types or some of the data has been binned
+                        if dtypes == fallback_dtypes or row_count:
+                            raise
+
+                        logger.warning("Data in %s does not match the header data types (%s), fusing with inferred data types.", inf, e)
+
+                        # fuse the file again using the fallback data types
+                        fuse_file(inf, chunk_size, fallback_dtypes)
+                except Exception as e:
+                    logger.error("Failed to fuse %s file %s: %s", _file_type, inf, e)
+
+                    # save the failure
+                    failed_files.append(inf)
+
+                    continue
+
+                if skipped_count:
+                    logger.warning('Warning: Could not get the classes for %s rows in %s. Continuing...', skipped_count, inf)
+
+                logger.debug('%s file %s: %s rows fused.', _file_type, inf, row_count)
+        finally:
+            # close all the files that were opened
+            [v.close() for k, v in open_files.items()]
+
+            bin_files.close()
+
+            logger.debug('Fusing %s data files complete. Output file handles: %s', _file_type, bin_files.get_stats())
+
+    # return the lookup data and the failed files
+    return ret_val, failed_files
+
+
+def bin_jsonl_data(_data_dir, _infile, _file_type, node_class_lookup, _bin_counts: Counter = None, _max_open_files: int = None):
+    """
+    reads an ORION KGX jsonl file (nodes.jsonl or edges.jsonl) and writes the converted data straight into the binned files.
+
+    this does the convert, create lookups and bin steps in a single pass without the intermediate split or converted files.
+    the columns are written in the order of the ORION header file (rk-nodes.tab-hdr.temp_csv or rk-edges.tab-hdr.temp_csv)
+    so that the files match the tables made in the create_tables step.
+
+    input file names will be of the form: nodes.jsonl or edges.jsonl, optionally gzipped (.gz)
+    output file names will be of the form: rk-nodes-bin-<node class>.csv or rk-edges-bin-<edge predicate>.csv
+
+    :param _data_dir:
+    :param _infile:
+    :param _file_type:
+    :param node_class_lookup:
+    :param _bin_counts: if passed, the number of edges for each (predicate, subject class, object class) is added to it
+    :param _max_open_files: the maximum number of output files kept open at one time
+    :return: the index of node id/classes or the dict of n-e-n relationships
+    """
+    logger.debug('Binning %s jsonl data file %s.', _file_type, _infile)
+
+    # init the pool of output file handles
+    bin_files: BinFilePool = BinFilePool(_max_open_files, partial(csv.writer, lineterminator='\n'))
+
+    # init the row counters
+    row_count: int = 0
+    skipped_count: int = 0
+
+    # get the header schema, this defines the output columns
+    schema: CSVHeaderSchema = get_header_schema(_data_dir, _file_type)
+
+    if schema is None:
+        raise Exception(f'The {_file_type} header file is required to bin jsonl data.')
+
+    # get the columns to work on
+    rename_cols, list_cols, int32_cols, _ = get_conversion_cols(_file_type)
+
+    # get the output column names and the output file name prefix
+    if _file_type == 'NODE':
+        # init the return value
+        ret_val: NodeClassIndex = NodeClassIndex()
+
+        csv_hdr: list = [rename_cols.get(name, name) for name, _ in schema.columns]
+
+        bin_prefix: str = node_bin_file_prefix
+    elif _file_type == 'EDGE':
+        # init the return value
+        ret_val: defaultdict = defaultdict(set)
+
+        # it is a Kuzu requirement that the first 2 columns be from and to
+        csv_hdr: list = ['from', 'to'] + [rename_cols.get(name, name) for name, _ in schema.columns]
+
+        bin_prefix: str = edge_bin_file_prefix
+    else:
+        raise Exception('Unsupported file type.')
+
+    # remove the bin shards and rejects of an earlier bin step so that they are not imported with the new bins
+    remove_stale_bin_files(str(os.path.join(_data_dir, bin_prefix)).replace('\\', '/'),
+                           str(os.path.join(_data_dir, bin_prefix.replace('bin-', 'rejects') + '.csv')).replace('\\', '/'))
+
+    # get the input file path
+    inf = os.path.join(_data_dir, _infile)
+
+    # done so this works in both a windows and linux environment
+    inf = str(inf).replace('\\', '/')
+
+    # init the node ids and classes waiting to be saved to the index
+    node_ids: list = []
+    node_classes: list = []
+
+    try:
+        # open the input jsonl file
+        with gzip.open(inf, 'rt', encoding='utf-8') if inf.endswith('.gz') else open(inf, 'r', encoding='utf-8') as file:
+            # go through each line in the file
+            for line in file:
+                # skip blank lines
+                if not line.strip():
+                    continue
+
+                # get the record
+                record: dict = json.loads(line)
+
+                row_count += 1
+
+                # get the class or predicate based on the type of file being processed
+                if _file_type == 'NODE':
+                    # get the node classes in the right order
+                    categories = record.get('category')
+
+                    # nodes without a class cannot be binned
+                    if not categories:
+                        skipped_count += 1
+                        continue
+
+                    record['category'] = reorder_node_classes(categories if isinstance(categories, str) else ';'.join(categories))
+
+                    # get the node class
+                    class_or_pred = record['category'].split(';')[0].split(':')[1]
+
+                    # save the node id and class, these are added to the index a batch at a time
+                    node_ids.append(record['id'])
+                    node_classes.append(class_or_pred)
+
+                    if len(node_ids) >= lookup_batch_size:
+                        ret_val.update(node_ids, node_classes)
+
+                        node_ids, node_classes = [], []
+
+                    # get the output row
+                    row: list = [format_json_value(record.get(name), rename_cols.get(name, name), data_type, list_cols, int32_cols)
+                                 for name, data_type in schema.columns]
+                else:
+                    # get the from/to node classes
+                    subject_class = node_class_lookup.get(record.get('subject'), None)
+                    object_class = node_class_lookup.get(record.get('object'), None)
+
+                    # make sure we get the target node classes
+                    if not (subject_class and object_class):
+                        skipped_count += 1
+                        continue
 
-                # define the target array list columns
-                reformat_list_cols = ['labels', 'equivalent_identifiers', 'hgvs']
+                    # get the predicate
+                    predicate: str = record['predicate'].split(':')[1]
 
-                # define the target int32 columns (None for CTD data)
-                reformat_int32_cols = ['lipinski', 'arom_c', 'sp3_c', 'sp2_c', 'sp_c', 'halogen', 'hetero_sp2_c', 'rotb', 'o_n', 'oh_nh', 'rgb',
-                                       'fda_labels']
+                    # save the subject class/predicate/object class
+                    ret_val[predicate].add((subject_class, object_class))
 
-            elif _file_type == 'EDGE':
-                # define the cols that need renaming (same for CTD and RK)
-                reformat_rename_cols = {'predicate': 'label'}
+                    if _bin_counts is not None:
+                        _bin_counts[(predicate, subject_class, object_class)] += 1
 
-                # define the target array list columns
-                reformat_list_cols: list = ['p_value', 'supporting_affinities', 'slope', 'publications', 'hetio_source', 'tmkp_ids', 'expressed_in',
-                                            'pubchem_assay_ids', 'patent_ids', 'aggregator_knowledge_source', 'category', 'provided_by',
-                                            'complex_context', 'has_evidence', 'qualifiers', 'phosphorylation_sites', 'drugmechdb_path_id']
+                    # get the predicate with node classes for the file name
+                    class_or_pred = predicate + '_' + subject_class + '_' + object_class
 
-                # define the target int32 columns (none for CTD data)
-                reformat_int32_cols: list = ['distance_to_feature']
+                    # get the output row, the from/to columns are copies of the subject and object
+                    row: list = [record['subject'], record['object']] + [
+                        format_json_value(record.get(name), rename_cols.get(name, name), data_type, list_cols, int32_cols)
+                        for name, data_type in schema.columns]
 
-                # duplicate the subject and object columns into the from and to columns.
-                # it is a Kuzu requirement that the first 2 columns be from and to.
-                df.insert(loc=0, column='to', value=df['object'])
-                df.insert(loc=0, column='from', value=df['subject'])
+                # get the output file path
+                out_file = os.path.join(_data_dir, bin_prefix + class_or_pred + '.csv')
 
-            # rename any specified columns in the data
-            df.rename(columns=reformat_rename_cols, inplace=True)
+                # done so this works in both a windows and linux environment
+                out_file = str(out_file).replace('\\', '/')
 
-            # get the node label classes in the right order
-            if 'labels' in df:
-                df['labels'] = df['labels'].apply(lambda x: '' if pd.isna(x) else reorder_node_classes(x))
+                # get the file's writer, the file is created or reopened if needed
+                csv_writer, is_new = bin_files.get(out_file)
 
-            # apply the new formatting for lists
-            for col in reformat_list_cols:
-                # only do this if the column is there
-                if col in df:
-                    # split the character seperated string into an array
-                    df[col] = df[col].apply(lambda x: [] if pd.isna(x) else '[' + ','.join(map(str, str(x).replace('\'', '`').split(';'))) + ']')
+                # write out the csv file header if the file was just created
+                if is_new:
+                    csv_writer.writerow(csv_hdr)
 
-            # apply the new formatting for INT32 data
-            for col in reformat_int32_cols:
-                # only do this if the column is there
-                if col in df:
-                    # change the data type
-                    df[col] = df[col].apply(lambda x: x if pd.isna(x) else str(int(x)))
+                # copy the line to the new destination
+                csv_writer.writerow(row)
 
-            # remove specified columns
-            df.drop(columns=reformat_del_cols, inplace=True, axis=1)
+        # save the remaining node ids and classes
+        if node_ids:
+            ret_val.update(node_ids, node_classes)
+    finally:
+        # close all the files that are open
+        bin_files.close()
 
-            # create the new file
-            df.to_csv(out_file, index=False)
+        logger.debug('Binning %s jsonl data complete. %s rows read, %s skipped. Output file handles: %s', _file_type, row_count, skipped_count,
+                     bin_files.get_stats())
 
-            logger.debug(f"%s file %s converted and exported to %s.", _file_type, inf, out_file)
+    # return the lookup data
+    return ret_val
 
 
-def reorder_node_classes(node_classes: str) -> str:
+def format_json_value(value, col_name: str, data_type: str, list_cols: list, int32_cols: list) -> str:
     """
-    reorders the node labels array to put the highest priority in the front.
+    formats a jsonl record value the same way the convert step formats the CSV data.
 
-    :param node_classes:
+    :param value:
+    :param col_name: the output column name
+    :param data_type: the ORION data type of the column
+    :param list_cols: the columns that are output as Kuzu lists
+    :param int32_cols: the columns that are output as integers
     :return:
     """
-    # convert the string to a list
-    class_list: list = list(set(node_classes.split(';')))
+    # list columns are turned into Kuzu lists. e.g: ['a', 'b'] or "a;b" -> "[a,b]". empty values are empty lists
+    if col_name in list_cols:
+        if value is None or value == '':
+            return '[]'
 
-    # for each item in the ordered class list
-    for oc in ordered_categories:
-        # if the class is in the node classes
-        if oc in class_list:
-            # move the item to the front if it is not there already
-            if class_list.index(oc) != 0:
-                # move the item to the fron of the list
-                class_list.insert(0, class_list.pop(class_list.index(oc)))
+        # get the list items
+        items: list = value if isinstance(value, list) else str(value).split(';')
 
-            # stop looking when a primary class is found
-            break
+        return '[' + ','.join(str(item).replace('\'', '`') for item in items) + ']'
 
-    # return the result in the original format
-    return ';'.join(class_list)
+    # empty values are written as empty cells
+    if value is None:
+        return ''
 
+    # any other list is character separated like the original CSV data
+    if isinstance(value, list):
+        return ';'.join(map(str, value))
 
-def get_data_lookups(_data_dir, _infile, node_class_list, _file_type):
+    # integer data
+    if col_name in int32_cols or data_type == 'int':
+        return str(int(value))
+
+    # float data
+    if data_type == 'float':
+        return str(float(value))
+
+    # everything else as text
+    return str(value)
+
+
+def get_data_files(_data_dir, _infile, _file_type, _extension: str = 'csv') -> list:
     """
-    this method bins data found in the "converted" files into node class/edge predicate files.
+    gets the paths of the numbered data files of a type found in the data directory. e.g. rk-nodes-pt1.csv, rk-nodes-pt2.csv, ...
 
-    this method returns the node and edge columns for Kuzu DB tables.
+    if the input file is a single file (e.g. rk-nodes.csv) its path is returned.
 
     :param _data_dir:
     :param _infile:
-    :param node_class_list:
     :param _file_type:
-    :return:
+    :param _extension:
+    :return: the file paths in file number order
     """
-
-    # specify the range of converted files to process
-    if _file_type == 'NODE':
-        rng = node_rng
-    elif _file_type == 'EDGE':
-        rng = edge_rng
-    else:
+    # make sure this is a supported file type
+    if _file_type not in ('NODE', 'EDGE'):
         raise Exception('Unsupported file type.')
 
-    logger.debug(f"Getting {_file_type} data lookups...")
+    # the input may be a single file. done so this works in both a windows and linux environment
+    if os.path.isfile(os.path.join(_data_dir, _infile)):
+        return [str(os.path.join(_data_dir, _infile)).replace('\\', '/')]
 
-    # save the node and its preferred class for the edge table relationships
-    with Timer(name=_file_type, text="The {name} lookup dict created in {:.2f}s", logger=logger.debug):
-        if _file_type == 'NODE':
-            # init the return value
-            ret_val: dict = {}
+    # find the files
+    ret_val: list = [inf for _, inf in PartFiles.find(_data_dir, _infile, _extension)]
 
-            # for each file to process
-            for i in rng:
-                # get the input file path
-                inf = os.path.join(_data_dir, _infile + str(i) + '.csv')
+    if not ret_val:
+        logger.warning('No %s files named %s<file number>.%s found in %s.', _file_type, _infile, _extension, _data_dir)
 
-                # done so this works in both a windows and linux environment
-                inf = str(inf).replace('\\', '/')
+    # return the file paths
+    return ret_val
 
-                # open the input csv file
-                with open(inf, 'r') as file:
-                    # read the csv file
-                    reader = csv.reader(file)
 
-                    # Skip the header
-                    next(reader)
+def get_data_parts(_data_dir, _infile, _file_type, _workers: int = 1, _range_size: int = None) -> list:
+    """
+    gets the parts of the CSV data of a type that are processed independently.
 
-                    # go through each line in the file
-                    for row in reader:
-                        # get the node class
-                        node_id: str = row[0]
+    these are the numbered data files (e.g. rk-nodes-pt1.csv, rk-nodes-pt2.csv, ...) or, if the input file is a single CSV file
+    (e.g. rk-nodes.csv), the byte ranges it is divided into. a range ends on a record boundary and is read with the header
+    line of the file. there are enough ranges to keep each range within the range size and to give every worker one.
 
-                        # get the node class
-                        node_class: str = row[2].split(',')[0][1:]
+    :param _data_dir:
+    :param _infile:
+    :param _file_type:
+    :param _workers:
+    :param _range_size: the size of a range in bytes
+    :return: the (part number, file path or range) of each part in part number order
+    """
+    # get the files
+    in_files: list = get_data_files(_data_dir, _infile, _file_type, 'csv')
 
-                        # save this pair to the return list
-                        ret_val.update({node_id: node_class.split(':')[1]})
+    # divide a single file into ranges
+    if len(in_files) == 1 and os.path.isfile(os.path.join(_data_dir, _infile)):
+        with Timer(name=_file_type, text="{name} file divided into byte ranges in {:.2f}s", logger=logger.debug):
+            ret_val: list = [(csv_range.number, csv_range) for csv_range in CSVRanges.get_ranges(in_files[0], _workers, _range_size)]
 
-        # save the source class/predicate/object class
-        elif _file_type == 'EDGE':
-            # init the return value
-            ret_val: defaultdict = defaultdict(set)
+        logger.debug('%s file %s divided into %s byte ranges.', _file_type, in_files[0], len(ret_val))
 
-            # for each file to process
-            for i in rng:
-                # get the input file path
-                inf = os.path.join(_data_dir, _infile + str(i) + '.csv')
+        return ret_val
 
-                # done so this works in both a windows and linux environment
-                inf = str(inf).replace('\\', '/')
+    # return the numbered files
+    return PartFiles.find(_data_dir, _infile, 'csv')
 
-                # open the input csv file
-                with open(inf, 'r') as file:
-                    # read the csv file
-                    reader = csv.reader(file)
 
-                    # Skip the header
-                    next(reader)
+def get_output_prefix(_data_dir, _infile, _from: str, _to: str) -> str:
+    """
+    gets the name prefix of the files created from the input files. e.g. rk-nodes-pt -> rk-nodes-conv, rk-nodes-conv -> rk-nodes-bin-
 
-                    # go through each line in the file
-                    for row in reader:
-                        # get the class for the subject and object
-                        subject_class = node_class_list.get(row[0], None)
-                        object_class = node_class_list.get(row[1], None)
+    a single input file is named without its extension, e.g. rk-nodes.csv -> rk-nodes-conv, rk-nodes-conv.csv -> rk-nodes-bin-
 
-                        # if we found both vertices complete/save the tuple
-                        if subject_class and object_class:
-                            # save this set. note the predicate is in the 4th column in the CSV file
-                            ret_val[row[3].split(':')[1]].add((subject_class, object_class))
+    :param _data_dir:
+    :param _infile:
+    :param _from: the part of the input name replaced
+    :param _to: the part of the output name it is replaced with
+    :return:
+    """
+    if os.path.isfile(os.path.join(_data_dir, _infile)):
+        # get the name without the extension
+        name: str = os.path.splitext(_infile)[0]
 
-    # inform the user something may be amiss
-    if len(ret_val) == 0:
-        logger.debug('Warning: No lookup data found for %s.', _file_type)
+        return name.replace(_from, _to) if _from in name else name + '-' + _to
 
-    # return the dict of node id/classes or n-e-n relationships
-    return ret_val
+    return _infile.replace(_from, _to)
 
 
-def bin_data(_data_dir, _infile, _file_type, node_class_lookup) -> None:
+def save_lookups(_data_dir, node_class_lookup: NodeClassIndex, edge_predicate_lookup: dict, _input_files: list,
+                 _export_pickle: bool = False, _edge_bin_counts: Counter = None, _surrogate_keys: bool = False) -> None:
     """
-    turns the converted files into files whose data is binned by node class and edge predicates.
+    saves the node class and edge predicate lookups to the lookup store file, and optionally the pickle files.
 
-    input file names we be of the form: rk-nodes-conv<file number>.csv or rk-edges-conv<file number>.csv
-    output file names will be of the form: rk-nodes-bin-<node class>.csv or rk-edges-bin-<edge predicate>.csv
+    the store records whether the later steps key the nodes by their dense integer keys, the position of each node in the
+    node class index. the keys only exist for the node class index the store holds, so the mode is set when it is created.
 
     :param _data_dir:
-    :param _infile:
-    :param _file_type:
     :param node_class_lookup:
+    :param edge_predicate_lookup:
+    :param _input_files: the paths of the files the lookups were built from
+    :param _export_pickle:
+    :param _edge_bin_counts: the number of edges for each (predicate, subject class, object class)
+    :param _surrogate_keys: key the nodes by their dense integer keys
     :return:
     """
-    logger.debug('Binning %s data files.', _file_type)
-
-    # init the list of file handles
-    open_files: dict = {}
-
-    # set the range for the number of files to process
-    if _file_type == 'NODE':
-        rng = node_rng
-    elif _file_type == 'EDGE':
-        rng = edge_rng
-    else:
-        raise Exception('Unsupported file type.')
-
-    try:
-        # loop through the converted files
-        for i in rng:
-            # get the input file path
-            inf = os.path.join(_data_dir, _infile + str(i) + '.csv')
-
-            # done so this works in both a windows and linux environment
-            inf = str(inf).replace('\\', '/')
+    with Timer(name="save lookups", text="Lookups saved in {:.2f}s", logger=logger.debug):
+        # save the lookup store
+        LookupStore.save(os.path.join(_data_dir, lookup_store_file_name), node_class_lookup, edge_predicate_lookup, _input_files, _edge_bin_counts,
+                         _surrogate_keys)
 
-            logger.debug('Binning %s file', inf)
+        if _export_pickle:
+            # serialize the lookup data into pickle files
+            with open(os.path.join(_data_dir, node_pickle_file_name), "wb") as node_pkl_file:
+                # noinspection PyTypeChecker
+                pickle.dump(node_class_lookup, node_pkl_file)
 
-            # open the input csv file
-            with open(inf, 'r') as file:
-                # read the csv file
-                reader = csv.reader(file)
+            with open(os.path.join(_data_dir, edge_pickle_file_name), "wb") as edge_pkl_file:
+                # noinspection PyTypeChecker
+                pickle.dump(edge_predicate_lookup, edge_pkl_file)
 
-                # save the header
-                csv_hdr = next(reader)
 
-                # init the from/to target storage
-                from_to: str = ''
+def load_lookups(_data_dir) -> (NodeClassIndex, dict):
+    """
+    loads the node class and edge predicate lookups.
 
-                # go through each line in the file
-                for row in reader:
-                    # get the class or predicate based on the type of file being processed
-                    if _file_type == 'NODE':
-                        # get the node class
-                        class_or_pred = row[2].split(',')[0][1:]
-                        class_or_pred = class_or_pred.split(':')[1]
-                    else:
-                        # get the from/to node classes
-                        subject_class = node_class_lookup.get(row[0], None)
-                        object_class = node_class_lookup.get(row[1], None)
+    the lookup store is memory mapped if it exists, otherwise the lookups are unpickled from the pickle files.
 
-                        # make sure we get the target node classes
-                        if subject_class and object_class:
-                            # get the predicate with node classes for the file name
-                            class_or_pred = row[3].split(':')[1] + '_' + subject_class + '_' + object_class
-                        else:
-                            logger.warning('Warning: Could not get subject or object classes for %s or %s. Continuing...', row[4], row[6])
-                            continue
+    :param _data_dir:
+    :return: the node class index and the edge predicate lookups
+    """
+    with Timer(name="load lookups", text="Lookups loaded in {:.2f}s", logger=logger.debug):
+        # get the lookup store path
+        store_file: str = os.path.join(_data_dir, lookup_store_file_name)
 
-                    # get the output file path
-                    out_file = os.path.join(_data_dir, _infile.replace('conv', 'bin-') + class_or_pred + '.csv')
+        if os.path.exists(store_file):
+            logger.debug("Loading the lookups from %s.", store_file)
 
-                    # done so this works in both a windows and linux environment
-                    out_file = str(out_file).replace('\\', '/')
+            # memory map the lookup store
+            return LookupStore.load(store_file)
 
-                    # check to see if this file has already been created
-                    if open_files.get(out_file, None) is None:
-                        # create the file
-                        file_handle = open(out_file, mode='w', newline='', encoding='utf-8')
+        logger.debug("Lookup store %s not found, loading the lookups from the pickle files.", store_file)
 
-                        # create the file
-                        csv_writer = csv.writer(file_handle)
+        # deserialize the node lookup data from the pickle file
+        with open(os.path.join(_data_dir, node_pickle_file_name), "rb") as node_pkl_file:
+            node_class_lookup = pickle.load(node_pkl_file)
 
-                        # write out the csv file header
-                        csv_writer.writerow(csv_hdr)
+        # deserialize the edge lookup data from the pickle file
+        with open(os.path.join(_data_dir, edge_pickle_file_name), "rb") as edge_pkl_file:
+            edge_predicate_lookup = pickle.load(edge_pkl_file)
 
-                        # copy the line to the new destination
-                        csv_writer.writerow(row)
+    # pickle files from before the node class index was used hold a dict
+    if isinstance(node_class_lookup, dict):
+        node_class_lookup = NodeClassIndex.from_dict(node_class_lookup)
 
-                        # put the file handle in the list
-                        open_files.update({out_file: [file_handle, csv_writer]})
-                    else:
-                        # use the existing file's handle
-                        csv_writer = open_files[out_file][1]
+    # return the lookups
+    return node_class_lookup, edge_predicate_lookup
 
-                        # copy the line to the new destination
-                        csv_writer.writerow(row)
 
-    except Exception as e:
-        logger.exception(f"Error binning {_file_type} files.", e)
-    finally:
-        # close all the files that were opened
-        [v[0].close() for k, v in open_files.items()]
+def uses_surrogate_keys(_data_dir) -> bool:
+    """
+    checks to see if the nodes are keyed by the dense integer keys of the node class lookup. this is recorded in the lookup
+    store, the nodes are keyed by their ids if there is no store.
 
-        # clear the list
-        open_files = {}
+    :param _data_dir:
+    :return:
+    """
+    # get the lookup store path
+    store_file: str = os.path.join(_data_dir, lookup_store_file_name)
 
-        logger.debug('Binning %s data files complete.', _file_type)
+    # return to the caller
+    return os.path.exists(store_file) and LookupStore.uses_surrogate_keys(store_file)
 
 
 def create_kuzu_tables(conn: kuzu.Connection, _data_dir, _node_file, _edge_file) -> None:
     """
     creates the node and edge tables in kuzu
 
+    if the nodes are keyed by their dense integer keys the node tables get an INT64 node key primary key and the node id is
+    an ordinary property. the rel tables connect the node tables by their primary keys, so the from/to columns of the edge
+    bin files hold the keys.
+
     :param _edge_file:
     :param _node_file:
     :param _data_dir:
@@ -398,20 +1901,24 @@ def create_kuzu_tables(conn: kuzu.Connection, _data_dir, _node_file, _edge_file)
     :return:
     """
 
-    node_header_file_name = 'rk-nodes.tab-hdr.temp_csv'
-    edge_header_file_name = 'rk-edges.tab-hdr.temp_csv'
-
     try:
+        # get the columns kept for each table if the bin files were projected
+        table_columns: dict = BinColumns.load(os.path.join(_data_dir, table_columns_file_name))
+
         # get the list of node columns
         n_cols: str = process_csv_header(_data_dir, node_header_file_name, 'NODE')
 
+        # get the node key column and the primary key of the node tables
+        key_col, primary_key = (f'{node_key_column} INT64, ', node_key_column) if uses_surrogate_keys(_data_dir) else ('', 'id')
+
         # get the set of the node classes
-        node_classes: list = sorted(set(node_class_lookups.values()))
+        node_classes: list = sorted(node_class_lookups.classes)
 
         # create a table for each node label class
         for node_class in node_classes:
             # create the tables
-            conn.execute(f'CREATE NODE TABLE `biolink:{node_class}`({n_cols}, PRIMARY KEY (id))')
+            conn.execute(f'CREATE NODE TABLE `biolink:{node_class}`({key_col}{get_table_columns(n_cols, table_columns, node_class, "NODE")}, '
+                         f'PRIMARY KEY ({primary_key}))')
             # logger.debug(f'CREATE NODE TABLE {node_class}({n_cols}, PRIMARY KEY (id))')
 
         # get the list of edge columns. the table header file must match the number of columns in the data
@@ -432,7 +1939,7 @@ def create_kuzu_tables(conn: kuzu.Connection, _data_dir, _node_file, _edge_file)
             from_to_clause = ','.join([f'FROM `biolink:{x[0]}` TO `biolink:{x[1]}`' for x in node_classes_by_predicate])
 
             # table name may have multiple to/from node tables
-            conn.execute(f'CREATE REL TABLE `biolink:{predicate_type}`({from_to_clause}, {e_cols})')
+            conn.execute(f'CREATE REL TABLE `biolink:{predicate_type}`({from_to_clause}, {get_table_columns(e_cols, table_columns, predicate_type, "EDGE")})')
             # logger.debug(f"CREATE REL TABLE {predicate_type}({from_to_clause}, {e_cols})")
 
     except Exception as e:
@@ -495,6 +2002,38 @@ def process_csv_header(_data_dir, _infile, _file_type) -> str:
         return ret_val
 
 
+def get_table_columns(cols: str, table_columns: dict, table: str, _file_type) -> str:
+    """
+    gets the column definitions of a table. if the bin files were projected only the columns kept in the table's bin files
+    are defined.
+
+    :param cols: the column definitions from the table header file
+    :param table_columns: the columns kept for each table, see BinColumns.load()
+    :param table: the node class or predicate
+    :param _file_type:
+    :return:
+    """
+    # get the columns kept for the tables of this file type
+    columns: dict = table_columns.get(_file_type, {})
+
+    # the tables of unprojected bin files get all the columns
+    if table not in columns.get('tables', {}):
+        return cols
+
+    # split the column definitions, these have no commas in them
+    col_defs: list = cols.split(',')
+
+    # the edge bin files start with the from/to columns, these are the rel table connections and not in the table header file.
+    # the node bin files start with the node key column if the nodes are keyed by it, this is defined with the table
+    offset: int = len(required_bin_columns['EDGE']) if _file_type == 'EDGE' else int(columns['header'][:1] == [node_key_column])
+
+    if len(columns['header']) - offset != len(col_defs):
+        logger.warning('The %s table header file has %s columns but the bin files have %s.', _file_type, len(col_defs), len(columns['header']) - offset)
+
+    # return the definitions of the columns kept
+    return ','.join(col_defs[index - offset] for index in columns['tables'][table] if 0 <= index - offset < len(col_defs))
+
+
 def get_kuzu_data_conversion(column_name: str, array_split_char: str) -> str:
     """
     Note that the input data is from the original ORION column header.
@@ -535,87 +2074,434 @@ def get_kuzu_data_conversion(column_name: str, array_split_char: str) -> str:
     return ret_val + ','
 
 
-def import_data(conn: kuzu.Connection, _data_dir, _node_infile, _edge_infile) -> None:
+def import_data(db: kuzu.Database, _data_dir, _node_infile, _edge_infile, _data_format: str = 'csv', _workers: int = 1,
+                _copy_max_size: int = None, _manifest: ImportManifest = None) -> list:
     """
     parses/loads the node/edge data into a Kuzu DB.
     data is coming in as dat files binned by the node classification (preferred label) while the edge predicate relationships
     will be defined by node class vertexes.
 
+    the COPY statements are run by an import scheduler over a number of connections. the node tables are loaded first and each
+    edge file is loaded once the node tables of its subject and object classes are loaded. Kuzu only allows one write
+    transaction at a time, the scheduler retries a COPY that is rejected for that reason.
+
+    a bin may be held in a bin file and/or the shard files kept by a parallel bin step. the files of a node bin are loaded with
+    a single COPY of the file list, or with as few as possible of at most the copy max size each. Kuzu (0.10) misparses the
+    quoted fields of a rel table COPY from a file list, and the edge COPY skips the rows it cannot parse, so each file of an
+    edge bin is loaded with its own COPY.
+
+    if a manifest is passed each completed COPY is recorded in it, and the COPY statements it records as having loaded the same
+    files are skipped. a COPY is a single transaction, so a restarted import continues from the first COPY that did not complete.
+
     input files will be of the form: rk-nodes-bin-<node class>.csv or rk-edges-bin-<edge predicate>.csv
 
-    :param conn:
+    :param db:
     :param _data_dir:
     :param _node_infile:
     :param _edge_infile:
+    :param _data_format: csv or parquet
+    :param _workers: the number of connections the COPY statements are run on
+    :param _copy_max_size: the maximum size (bytes) of the files loaded by a single COPY, unlimited if not specified
+    :param _manifest: the record of the completed COPY statements
+    :return: the import jobs with their status, rows loaded and duration
+    """
+    # get the COPY options for the file format. parquet files have no header or delimiter
+    csv_options: str = ', HEADER=true, DELIMITER=","' if _data_format == 'csv' else ''
+
+    # init the import scheduler, each of its worker threads gets its own connection
+    scheduler: ImportScheduler = ImportScheduler(lambda: kuzu.Connection(db), _workers, logger,
+                                                 (lambda x: _manifest.add(x.name, x.table, x.stage, x.in_files, x.rows, x.duration)) if _manifest else None)
+
+    # init the names of the jobs that load each node class
+    node_jobs: dict = {}
+
+    # get the sorted set of the node classes
+    node_classes: list = sorted(node_class_lookups.classes)
+
+    for node_class in node_classes:
+        # create the name of the file
+        inf = os.path.join(_data_dir, _node_infile + node_class + '.' + _data_format)
+
+        # fix path for windows
+        inf = str(inf).replace('\\', '/')
+
+        # get the files that hold the bin
+        bin_files: list = get_bin_files(inf)
+
+        # check to see if the files exist
+        if bin_files:
+            # add the data file imports
+            for index, copy_files in enumerate(get_copy_batches(bin_files, _copy_max_size)):
+                job: ImportJob = ImportJob(f'node:{node_class}' + (f'#{index + 1}' if index else ''),
+                                           f'COPY `biolink:{node_class}` FROM {get_copy_source(copy_files)} (IGNORE_ERRORS=false{csv_options});',
+                                           None, sum(os.path.getsize(x) for x in copy_files), copy_files, 'nodes', f'biolink:{node_class}')
+
+                scheduler.add(job)
+
+                node_jobs.setdefault(node_class, []).append(job.name)
+        else:
+            logger.debug("Node file %s does not exist, skipping...", inf)
+
+    # get the set of predicates
+    predicate_types = sorted(list(edge_predicate_lookups.keys()))
+
+    # for each predicate type
+    for predicate_type in predicate_types:
+        # get all the relationships for this predicate
+        node_classes_by_predicate = edge_predicate_lookups[predicate_type]
+
+        # sort the node class predicates
+        node_classes_by_predicate = sorted(node_classes_by_predicate, key=lambda x: x[0])
+
+        # for each node subject/object class pair
+        for node_class_set in node_classes_by_predicate:
+            # get the node classes
+            subject_class = node_class_set[0]
+            object_class = node_class_set[1]
+
+            # create the name of the file
+            inf = os.path.join(_data_dir, _edge_infile + predicate_type + '_' + subject_class + '_' + object_class + '.' + _data_format)
+
+            # fix path for windows
+            inf = str(inf).replace('\\', '/')
+
+            # get the files that hold the bin
+            bin_files: list = get_bin_files(inf)
+
+            # check to see if the files exist
+            if bin_files:
+                # the edges are loaded after the node tables they connect. node classes without a file have nothing to wait for
+                depends_on: list = list(dict.fromkeys(node_jobs.get(subject_class, []) + node_jobs.get(object_class, [])))
+
+                # add the data file imports, a COPY for each file
+                for index, copy_files in enumerate(get_copy_batches(bin_files, _copy_max_size, False)):
+                    scheduler.add(ImportJob(f'edge:{predicate_type}_{subject_class}_{object_class}' + (f'#{index + 1}' if index else ''),
+                                            f"COPY `biolink:{predicate_type}` FROM {get_copy_source(copy_files)} (from='biolink:{subject_class}', "
+                                            f"to='biolink:{object_class}', IGNORE_ERRORS=true{csv_options});", depends_on,
+                                            sum(os.path.getsize(x) for x in copy_files), copy_files, 'edges', f'biolink:{predicate_type}'))
+            else:
+                logger.debug("Edge file %s does not exist, skipping...", inf)
+
+    # skip the COPY statements that completed in an earlier run
+    if _manifest:
+        for job in scheduler.jobs.values():
+            # check the manifest for the job
+            loaded, reason = _manifest.is_loaded(job.name, job.in_files)
+
+            if loaded:
+                job.status = 'done'
+                job.resumed = True
+                job.rows = _manifest.entries[job.name]['rows']
+            elif job.name in _manifest.entries:
+                logger.warning("%s was loaded by an earlier run but %s, it will be loaded again. this may duplicate its data.", job.name, reason)
+
+        logger.debug("%s COPY statements were completed by an earlier run.", sum(job.resumed for job in scheduler.jobs.values()))
+
+    logger.debug("Loading %s files with %s COPY statements into the database with %s connection(s)...",
+                 sum(len(job.in_files) for job in scheduler.jobs.values() if not job.resumed), sum(not job.resumed for job in scheduler.jobs.values()),
+                 scheduler.concurrency)
+
+    with Timer(name="import", text="DB nodes and edges loaded in {:.2f}s", logger=logger.debug):
+        # run the COPY statements
+        ret_val: list = scheduler.run()
+
+    # log the time and rows loaded for each file
+    scheduler.log_summary('Import results')
+
+    # get the jobs that did not complete
+    failed: list = [job for job in ret_val if job.status != 'done']
+
+    # get the jobs that skipped rows, the rows are not in the DB
+    skipped: list = [job for job in ret_val if job.warnings]
+
+    if failed:
+        logger.error("%s of %s COPY statements did not load into the DB: %s", len(failed), len(ret_val), ', '.join(job.name for job in failed))
+
+    if skipped:
+        logger.error("%s COPY statements skipped %s rows with warnings: %s", len(skipped), sum(job.warnings for job in skipped),
+                     ', '.join(job.name for job in skipped))
+
+    if not failed and not skipped:
+        logger.debug(f"Successfully loaded nodes and edges into the DB.")
+
+    # return the import jobs
+    return ret_val
+
+
+def get_bin_files(bin_file: str) -> list:
+    """
+    gets the files that hold the data of a bin. this is the bin file and/or the shard files kept by a parallel bin step.
+
+    :param bin_file:
     :return:
     """
-    try:
-        with Timer(name="nodes", text="DB nodes loaded in {:.2f}s", logger=logger.debug):
-            logger.debug("Loading nodes into the database...")
+    # get the bin file if it exists
+    ret_val: list = [bin_file] if os.path.exists(bin_file) else []
 
-            # get the sorted set of the node classes
-            node_classes: list = sorted(set(node_class_lookups.values()))
+    # get any shard files of a CSV bin. e.g. rk-edges-bin-<edge predicate>.shard<n>.csv
+    if bin_file.endswith('.csv'):
+        ret_val += sorted(glob.glob(glob.escape(bin_file.removesuffix('.csv')) + bin_shard_suffix))
 
-            for node_class in node_classes:
-                # create the name of the file
-                inf = os.path.join(_data_dir, _node_infile + node_class + '.csv')
+    # return to the caller
+    return ret_val
 
-                # fix path for windows
-                inf = str(inf).replace('\\', '/')
 
-                # check to see if the file exists
-                if os.path.exists(inf):
-                    logger.debug("Loading node file %s into the database...", inf)
+def get_copy_batches(in_files: list, _copy_max_size: int = None, _file_list: bool = True) -> list:
+    """
+    splits a list of files into the lists loaded by each COPY statement, each list is at most the max size unless it is a single file.
 
-                    # import the data file
-                    conn.execute(f'COPY `biolink:{node_class}` FROM "{inf}" (HEADER=true, DELIMITER=",", IGNORE_ERRORS=false);')
-                else:
-                    logger.debug("Node file %s does not exist, skipping...", inf)
+    :param in_files:
+    :param _copy_max_size: the maximum size (bytes) of the files loaded by a single COPY, unlimited if not specified
+    :param _file_list: if false each file is loaded by its own COPY
+    :return:
+    """
+    # each file goes in its own COPY if a file list cannot be used
+    if not _file_list:
+        return [[in_file] for in_file in in_files]
+
+    # everything goes in a single COPY if there is no limit
+    if not _copy_max_size:
+        return [in_files]
+
+    # init the return value
+    ret_val: list = []
+
+    # init the current list and its size
+    batch: list = []
+    batch_size: int = 0
+
+    for in_file in in_files:
+        # get the size of the file
+        file_size: int = os.path.getsize(in_file)
+
+        # start a new list if this file would take the current one over the limit
+        if batch and batch_size + file_size > _copy_max_size:
+            ret_val.append(batch)
+
+            batch, batch_size = [], 0
+
+        batch.append(in_file)
+        batch_size += file_size
+
+    # save the last list
+    if batch:
+        ret_val.append(batch)
 
-        with Timer(name="edges", text="DB edges loaded in {:.2f}s", logger=logger.debug):
-            logger.debug("Loading edges into the database...")
+    # return to the caller
+    return ret_val
+
+
+def get_copy_source(in_files: list) -> str:
+    """
+    gets the source of a COPY statement, a single file or a list of files.
+
+    :param in_files:
+    :return:
+    """
+    if len(in_files) == 1:
+        return f'"{in_files[0]}"'
+
+    return '[' + ', '.join(f'"{in_file}"' for in_file in in_files) + ']'
+
+
+def load_data(conn: kuzu.Connection, _data_dir, _infile, _file_type, node_class_lookup: NodeClassIndex, _batch_size: int = None,
+              _surrogate_keys: bool = False, _table_columns: dict = None) -> list:
+    """
+    loads the converted parquet files straight into the Kuzu tables, without writing the bin files for Kuzu to read back.
+
+    the files are read as arrow record batches of at most the batch size rows. the rows of each batch are grouped by node class
+    or edge predicate and subject/object class, and the groups of each bin are held in memory until they are loaded with a COPY
+    from the in-memory arrow table. once the rows held reach the batch size the largest bins are loaded until half of that is
+    left, so at most about twice the batch size rows are in memory. the remaining bins are loaded once all the files are read.
+
+    the node files must be loaded first as the edges are loaded into rel tables between the node tables. if the nodes are keyed
+    by their dense integer keys they are added as the node key column of the nodes and the from/to columns of the edges. if the
+    tables were created with the columns kept for them by a pruned bin step, only those columns are loaded.
+
+    input file names will be of the form: rk-nodes-conv<file number>.parquet or rk-edges-conv<file number>.parquet
+
+    :param conn:
+    :param _data_dir:
+    :param _infile:
+    :param _file_type:
+    :param node_class_lookup:
+    :param _batch_size: the number of rows read at a time and held in memory before the largest bins are loaded
+    :param _surrogate_keys: key the nodes by their dense integer keys from the node class lookup
+    :param _table_columns: the columns kept for each table, see BinColumns.load()
+    :return: the list of input files that failed
+    """
+    logger.debug('Loading %s parquet data files.', _file_type)
+
+    # get the number of rows read at a time
+    batch_size: int = _batch_size or default_load_batch_size
+
+    # get the columns kept for the tables of this file type
+    table_columns: dict = (_table_columns or {}).get(_file_type, {}).get('tables', {})
+
+    # init the list of failed files
+    failed_files: list = []
 
-            # get the set of predicates
-            predicate_types = sorted(list(edge_predicate_lookups.keys()))
+    # init the arrow tables held for each bin and the number of rows they hold
+    bins: defaultdict = defaultdict(list)
+    bin_rows: Counter = Counter()
 
-            # for each predicate type
-            for predicate_type in predicate_types:
-                # get all the relationships for this predicate
-                node_classes_by_predicate = edge_predicate_lookups[predicate_type]
+    # init the schema all the arrow tables are loaded with and the rows loaded into each table
+    schema = None
+    table_rows: Counter = Counter()
 
-                # sort the node class predicates
-                node_classes_by_predicate = sorted(node_classes_by_predicate, key=lambda x: x[0])
+    def copy_bin(class_or_pred: str) -> None:
+        """
+        loads the rows held for a bin into its table.
+        """
+        # get the rows of the bin in a single arrow table. the COPY reads it from this local variable by name
+        arrow_table: pa.Table = pa.concat_tables(bins.pop(class_or_pred))
 
-                # for each node subject/object class pair
-                for node_class_set in node_classes_by_predicate:
-                    # get the node classes
-                    subject_class = node_class_set[0]
-                    object_class = node_class_set[1]
+        bin_rows.pop(class_or_pred)
 
-                    # create the name of the file
-                    inf = os.path.join(_data_dir, _edge_infile + predicate_type + '_' + subject_class + '_' + object_class + '.csv')
+        # get the table, a node class bin has a table of its own. edge bins are named <predicate>_<subject class>_<object class>
+        table: str = class_or_pred if _file_type == 'NODE' else class_or_pred.rsplit('_', 2)[0]
 
-                    # fix path for windows
-                    inf = str(inf).replace('\\', '/')
+        # load only the columns of a pruned table
+        if table in table_columns:
+            arrow_table = arrow_table.select(table_columns[table])
 
-                    # check to see if the file exists
-                    if os.path.exists(inf):
-                        logger.debug("Loading edge file %s into the database...", inf)
+        if _file_type == 'NODE':
+            conn.execute(f'COPY `biolink:{table}` FROM arrow_table')
+        else:
+            _, subject_class, object_class = class_or_pred.rsplit('_', 2)
+
+            conn.execute(f"COPY `biolink:{table}` FROM arrow_table (from='biolink:{subject_class}', to='biolink:{object_class}')")
+
+        table_rows[table] += arrow_table.num_rows
 
-                        try:
-                            # import the data file
-                            conn.execute(f"COPY `biolink:{predicate_type}` FROM '{inf}' (from='biolink:{subject_class}', to='biolink:{object_class}', HEADER=true, DELIMITER=',', IGNORE_ERRORS=true);")
-                        except Exception as e:
-                            logger.exception(
-                                f"Edge import exception detected: Failed to load {predicate_type} {subject_class} to {object_class} edge file {inf}:")
+    with Timer(name=_file_type, text="{name} data files loaded in {:.2f}s", logger=logger.debug):
+        for inf in get_data_files(_data_dir, _infile, _file_type, 'parquet'):
+            logger.debug('Loading %s file %s', _file_type, inf)
 
+            # init the count of rows that could not be binned
+            skipped_count: int = 0
+
+            try:
+                # go through the file a batch at a time
+                for batch in pq.ParquetFile(inf).iter_batches(batch_size=batch_size):
+                    # get the batch as a table with the schema of the first one
+                    batch_table: pa.Table = pa.Table.from_batches([batch])
+
+                    if schema is None:
+                        schema = batch_table.schema
                     else:
-                        logger.debug("Edge file %s does not exist, skipping...", inf)
+                        batch_table = batch_table.cast(schema)
 
-    except Exception as e:
-        logger.exception('Exception detected:', e)
+                    # get the class or predicate for each row based on the type of file being processed
+                    if _file_type == 'NODE':
+                        # get the node class from the first item in the labels list
+                        bin_keys = pc.list_element(pc.split_pattern(pc.list_element(batch_table.column('labels'), 0), ':'), 1).to_pylist()
 
-    logger.debug(f"Successfully loaded nodes and edges into the DB.")
+                        # put the node key in front of the node. the node must be in the lookup the keys come from
+                        if _surrogate_keys:
+                            node_keys = node_class_lookup.get_keys(batch_table.column('id').to_pylist())
+
+                            bin_keys = [bin_key if key >= 0 else None for bin_key, key in zip(bin_keys, node_keys)]
+
+                            batch_table = batch_table.add_column(0, node_key_column, pa.array(node_keys, type=pa.int64()))
+                    else:
+                        # get the from/to node classes (and keys)
+                        if _surrogate_keys:
+                            subject_classes, subject_keys = node_class_lookup.get_classes_and_keys(batch_table.column('from').to_pylist())
+                            object_classes, object_keys = node_class_lookup.get_classes_and_keys(batch_table.column('to').to_pylist())
+
+                            # replace the from/to ids with the node keys
+                            batch_table = batch_table.set_column(0, 'from', pa.array(subject_keys, type=pa.int64()))
+                            batch_table = batch_table.set_column(1, 'to', pa.array(object_keys, type=pa.int64()))
+                        else:
+                            subject_classes = node_class_lookup.get_classes(batch_table.column('from').to_pylist())
+                            object_classes = node_class_lookup.get_classes(batch_table.column('to').to_pylist())
+
+                        # get the predicate with node classes, if the target node classes were found
+                        bin_keys = [predicate.split(':')[1] + '_' + subject_class + '_' + object_class if subject_class and object_class else None
+                                    for subject_class, object_class, predicate in zip(subject_classes, object_classes, batch_table.column('label').to_pylist())]
+
+                    # get the bin for each row. the rows that could not be binned are left out of the groups
+                    bin_keys: pd.Series = pd.Series(bin_keys, dtype=object)
+
+                    skipped_count += int(bin_keys.isna().sum())
+
+                    # hold the rows of each bin in this batch
+                    for class_or_pred, indexes in bin_keys.groupby(bin_keys, sort=False).indices.items():
+                        bins[class_or_pred].append(batch_table.take(indexes))
+                        bin_rows[class_or_pred] += len(indexes)
+
+                    # load the largest bins if too many rows are held
+                    if bin_rows.total() >= batch_size:
+                        for class_or_pred, _ in bin_rows.most_common():
+                            copy_bin(class_or_pred)
+
+                            if bin_rows.total() <= batch_size // 2:
+                                break
+            except Exception as e:
+                logger.error("Failed to load %s file %s: %s", _file_type, inf, e)
+
+                # save the failure
+                failed_files.append(inf)
+
+                continue
+
+            if skipped_count:
+                logger.warning('Warning: Could not get the classes for %s rows in %s. Continuing...', skipped_count, inf)
+
+        # load the rest of the bins
+        for class_or_pred in list(bins):
+            try:
+                copy_bin(class_or_pred)
+            except Exception as e:
+                logger.error("Failed to load %s bin %s: %s", _file_type, class_or_pred, e)
+
+                failed_files.append(class_or_pred)
+
+    logger.debug('Loading %s data files complete. %s rows loaded into %s tables.', _file_type, f'{table_rows.total():,}', len(table_rows))
+
+    # return the failed files
+    return failed_files
+
+
+def verify_import(db: kuzu.Database, _manifest: ImportManifest) -> list:
+    """
+    compares the rows the import manifest records for each table with the number of rows in the table.
+
+    :param db:
+    :param _manifest:
+    :return: the tables whose counts do not match. (table, rows in the manifest, rows in the table)
+    """
+    # init the return value
+    ret_val: list = []
+
+    # get a DB connection
+    conn: kuzu.Connection = kuzu.Connection(db)
+
+    try:
+        with Timer(name="verify", text="DB import verified in {:.2f}s", logger=logger.debug):
+            for (stage, table), rows in sorted(_manifest.get_table_rows().items()):
+                # get the number of rows in the table
+                if stage == 'nodes':
+                    result = conn.execute(f'MATCH (n:`{table}`) RETURN count(*);')
+                else:
+                    result = conn.execute(f'MATCH ()-[r:`{table}`]->() RETURN count(*);')
+
+                table_rows: int = result.get_next()[0]
+
+                if table_rows != rows:
+                    logger.error("Table %s has %s rows, the import manifest records %s.", table, table_rows, rows)
+
+                    ret_val.append((table, rows, table_rows))
+                else:
+                    logger.debug("Table %s has the %s rows the import manifest records.", table, rows)
+    finally:
+        conn.close()
+
+    logger.debug("%s of %s tables verified.", len(_manifest.get_table_rows()) - len(ret_val), len(_manifest.get_table_rows()))
+
+    # return the mismatches
+    return ret_val
 
 
 if __name__ == "__main__":
@@ -638,6 +2524,32 @@ if __name__ == "__main__":
     parser.add_argument('--data-dir', dest='data_dir', type=str, help='Data directory')
     parser.add_argument('--outfile', dest='outfile', type=str, help='Output file')
     parser.add_argument('--type', dest='type', type=str, help='Data operation type (tables or data)')
+    parser.add_argument('--chunk-size', dest='chunk_size', type=int, default=None, help='Number of rows to convert at a time (streaming mode)')
+    parser.add_argument('--memory-budget', dest='memory_budget', type=int, default=None,
+                        help='Memory budget in MB used to size the conversion chunks (streaming mode)')
+    parser.add_argument('--workers', dest='workers', type=int, default=1, help='Number of processes used to convert, scan or bin the files, or DB connections used to import them')
+    parser.add_argument('--max-open-files', dest='max_open_files', type=int, default=BinFilePool.default_max_open_files,
+                        help='Maximum number of binned CSV output files kept open at one time')
+    parser.add_argument('--bin-buffer-size', dest='bin_buffer_size', type=int, default=None,
+                        help='Number of KB buffered for each bin before it is written out (bin step)')
+    parser.add_argument('--shard-merge-size', dest='shard_merge_size', type=int, default=None,
+                        help='Size in MB above which a bin keeps its worker shard files rather than merging them (bin step with workers)')
+    parser.add_argument('--copy-max-size', dest='copy_max_size', type=int, default=None,
+                        help='Maximum size in MB of the files loaded by a single COPY statement (import step)')
+    parser.add_argument('--verify', dest='verify', action='store_true',
+                        help='After the import, compare the rows in each table with the rows recorded in the import manifest')
+    parser.add_argument('--pickle', dest='pickle', action='store_true',
+                        help='Also export the lookups to the serialized_node_classes.pkl/serialized_edge_predicates.pkl files')
+    parser.add_argument('--prune-columns', dest='prune_columns', action='store_true',
+                        help='Leave the columns that are empty for a whole node class or predicate out of its bin files and table (bin step)')
+    parser.add_argument('--surrogate-keys', dest='surrogate_keys', action='store_true',
+                        help='Key the node tables by dense integer node keys rather than the node ids (create_lus step)')
+    parser.add_argument('--load-batch-size', dest='load_batch_size', type=int, default=None,
+                        help=f'Number of rows read at a time and held in memory before they are loaded (load step, default {default_load_batch_size})')
+    parser.add_argument('--range-size', dest='range_size', type=int, default=None,
+                        help='Size in MB of the byte ranges a single node/edge CSV input file (e.g. rk-edges.csv) is divided into')
+    parser.add_argument('--format', dest='data_format', type=str, default='csv', choices=ConvertUtils.output_formats,
+                        help='Format of the converted and binned data files')
 
     args = parser.parse_args()
 
@@ -646,66 +2558,134 @@ if __name__ == "__main__":
     # get the path to the DB
     db_dir: str = os.path.join(args.data_dir, str(args.outfile))
 
+    # get the path to the record of the completed COPY statements
+    manifest_file: str = db_dir + import_manifest_suffix
+
     # init the DB connection
     connection = None
 
+    # init the list of data files that failed processing
+    failed_files: list = []
+
+    # init the process exit code
+    exit_code: int = 0
+
+    # init the number of edges for each predicate/subject class/object class
+    edge_bin_counts: Counter = Counter()
+
+    # get the number of bytes buffered for each bin
+    bin_buffer_size: int | None = args.bin_buffer_size * 1024 if args.bin_buffer_size else None
+
+    # get the size of the largest bin whose shards are merged and the largest set of files loaded by a COPY, in bytes
+    shard_merge_size: int | None = args.shard_merge_size * 1024 * 1024 if args.shard_merge_size is not None else None
+    copy_max_size: int | None = args.copy_max_size * 1024 * 1024 if args.copy_max_size else None
+
+    # get the size of the byte ranges a single input file is divided into, in bytes
+    range_size: int | None = args.range_size * 1024 * 1024 if args.range_size else None
+
     try:
+        # the fused and jsonl bin files have all the columns, the tables get all of them
+        if run_type in ("FUSED", "JSONL"):
+            for file_type in ('NODE', 'EDGE'):
+                BinColumns.save(os.path.join(args.data_dir, table_columns_file_name), file_type)
+
+            # the node keys are not known until all the nodes are read, by then these steps have binned them
+            if args.surrogate_keys:
+                logger.warning('The node keys are not supported by the %s step, the nodes are keyed by their ids.', args.type)
+
         # converts the data into something kuzu can use
         if run_type == "CONVERT":
             with Timer(name="Convert data", text="Node and edge data converted in {:.2f}s", logger=logger.debug):
                 with Timer(name="convert nodes", text="Node data converted in {:.2f}s", logger=logger.debug):
                     # perform node file operations
-                    convert_data(args.data_dir, args.node_infile, 'NODE')
+                    failed_files += convert_data(args.data_dir, args.node_infile, 'NODE', args.chunk_size, args.memory_budget, args.workers,
+                                                   args.data_format, range_size)
 
                 with Timer(name="convert edges", text="Edge data converted in {:.2f}s", logger=logger.debug):
                     # perform edge file operations
-                    convert_data(args.data_dir, args.edge_infile, 'EDGE')
+                    failed_files += convert_data(args.data_dir, args.edge_infile, 'EDGE', args.chunk_size, args.memory_budget, args.workers,
+                                                   args.data_format, range_size)
 
         # create data lookup dicts
         if run_type == "CREATE_LUS":
             with Timer(name="Create lookups", text="Node and edge lookups created in {:.2f}s", logger=logger.debug):
                 #  get the set of node ids and their class tuples
-                node_class_lookups = get_data_lookups(args.data_dir, args.node_infile, None, 'NODE')
-
-                # get the set of subject class - edge predicate - object class tuples
-                edge_predicate_lookups = get_data_lookups(args.data_dir, args.edge_infile, node_class_lookups, 'EDGE')
-
-                # serialize the lookup data into pickle files
-                with open(os.path.join(args.data_dir, "serialized_node_classes.pkl"), "wb") as node_pkl_file:
-                    # noinspection PyTypeChecker
-                    pickle.dump(node_class_lookups, node_pkl_file)
-
-                with open(os.path.join(args.data_dir, "serialized_edge_predicates.pkl"), "wb") as edge_pkl_file:
-                    # noinspection PyTypeChecker
-                    pickle.dump(edge_predicate_lookups, edge_pkl_file)
+                node_class_lookups = get_data_lookups(args.data_dir, args.node_infile, None, 'NODE', args.data_format, _range_size=range_size)
+
+                # get the set of subject class - edge predicate - object class tuples and the number of edges for each
+                edge_predicate_lookups = get_data_lookups(args.data_dir, args.edge_infile, node_class_lookups, 'EDGE', args.data_format, args.workers,
+                                                          edge_bin_counts, range_size)
+
+                # save the lookup data
+                save_lookups(args.data_dir, node_class_lookups, edge_predicate_lookups,
+                             get_data_files(args.data_dir, args.node_infile, 'NODE', args.data_format) +
+                             get_data_files(args.data_dir, args.edge_infile, 'EDGE', args.data_format), args.pickle, edge_bin_counts,
+                             args.surrogate_keys)
+
+        # convert, create the lookups and bin the split data files in a single pass
+        if run_type == "FUSED":
+            with Timer(name="Fuse data", text="Node and edge data converted and binned in {:.2f}s", logger=logger.debug):
+                # convert and bin the node data and get the node ids and their classes
+                node_class_lookups, node_failed_files = fuse_data(args.data_dir, args.node_infile, 'NODE', None, args.chunk_size,
+                                                                  args.memory_budget, args.data_format, None, args.max_open_files, range_size)
+
+                # convert and bin the edge data and get the set of subject class - edge predicate - object class tuples
+                edge_predicate_lookups, edge_failed_files = fuse_data(args.data_dir, args.edge_infile, 'EDGE', node_class_lookups, args.chunk_size,
+                                                                      args.memory_budget, args.data_format, edge_bin_counts, args.max_open_files,
+                                                                      range_size)
+
+                failed_files += node_failed_files + edge_failed_files
+
+                # save the lookup data
+                save_lookups(args.data_dir, node_class_lookups, edge_predicate_lookups,
+                             get_data_files(args.data_dir, args.node_infile, 'NODE', 'csv') +
+                             get_data_files(args.data_dir, args.edge_infile, 'EDGE', 'csv'), args.pickle, edge_bin_counts)
+
+        # convert, create the lookups and bin the ORION jsonl data in a single pass
+        if run_type == "JSONL":
+            with Timer(name="Bin jsonl data", text="Node and edge jsonl data binned in {:.2f}s", logger=logger.debug):
+                # bin the node data and get the node ids and their classes
+                node_class_lookups = bin_jsonl_data(args.data_dir, args.node_infile, 'NODE', None, None, args.max_open_files)
+
+                # bin the edge data and get the set of subject class - edge predicate - object class tuples
+                edge_predicate_lookups = bin_jsonl_data(args.data_dir, args.edge_infile, 'EDGE', node_class_lookups, edge_bin_counts,
+                                                        args.max_open_files)
+
+                # save the lookup data
+                save_lookups(args.data_dir, node_class_lookups, edge_predicate_lookups,
+                             [os.path.join(args.data_dir, args.node_infile), os.path.join(args.data_dir, args.edge_infile)], args.pickle,
+                             edge_bin_counts)
 
         # create the tables if requested
         if run_type == "BIN":
             with Timer(name="Bin data", text="Node and edge data binned in {:.2f}s", logger=logger.debug):
-                # perform node file operations
-                bin_data(args.data_dir, args.node_infile, 'NODE', None)
+                # load the node lookup data
+                node_class_lookups, _ = load_lookups(args.data_dir)
 
-                # deserialize the node lookup data from the pickle file
-                with open(os.path.join(args.data_dir, "serialized_node_classes.pkl"), "rb") as node_pkl_file:
-                    node_class_lookups = pickle.load(node_pkl_file)
+                # get whether the nodes are keyed by the dense integer keys of the node class lookup
+                surrogate_keys: bool = uses_surrogate_keys(args.data_dir)
+
+                # perform node file operations. the node data only needs the lookup for the node keys
+                failed_files += bin_data(args.data_dir, args.node_infile, 'NODE', node_class_lookups if surrogate_keys else None, args.data_format,
+                                         args.max_open_files, bin_buffer_size, args.workers, shard_merge_size, range_size, args.prune_columns,
+                                         surrogate_keys)
 
                 # perform edge file operations
-                bin_data(args.data_dir, args.edge_infile, 'EDGE', node_class_lookups)
+                failed_files += bin_data(args.data_dir, args.edge_infile, 'EDGE', node_class_lookups, args.data_format, args.max_open_files,
+                                         bin_buffer_size, args.workers, shard_merge_size, range_size, args.prune_columns, surrogate_keys)
 
         # create the tables if requested
         if run_type == "CREATE_TABLES":
             with Timer(name="Create tables", text="Table definitions created in {:.2f}s", logger=logger.debug):
-                # deserialize the node lookup data from the pickle file
-                with open(os.path.join(args.data_dir, "serialized_node_classes.pkl"), "rb") as node_pkl_file:
-                    node_class_lookups = pickle.load(node_pkl_file)
-
-                # deserialize the edge lookup data from the pickle file
-                with open(os.path.join(args.data_dir, "serialized_edge_predicates.pkl"), "rb") as edge_pkl_file:
-                    edge_predicate_lookups = pickle.load(edge_pkl_file)
+                # load the node and edge lookup data
+                node_class_lookups, edge_predicate_lookups = load_lookups(args.data_dir)
 
                 # wipe the DB if we are creating new tables
                 shutil.rmtree(db_dir, ignore_errors=True)
 
+                # nothing has been imported into the new DB
+                ImportManifest(manifest_file).remove()
+
                 # Create the database
                 db = kuzu.Database(db_dir, max_db_size=274877906944)
 
@@ -722,13 +2702,35 @@ if __name__ == "__main__":
         # parse the data if requested
         if run_type == "IMPORT":
             with Timer(name="Import data", text="Data imported in {:.2f}s", logger=logger.debug):
-                # serialize the node lookup data from the pickle file
-                with open(os.path.join(args.data_dir, "serialized_node_classes.pkl"), "rb") as node_pkl_file:
-                    node_class_lookups = pickle.load(node_pkl_file)
+                # load the node and edge lookup data
+                node_class_lookups, edge_predicate_lookups = load_lookups(args.data_dir)
+
+                # Create the database
+                db = kuzu.Database(db_dir, max_db_size=274877906944)
+
+                # get the record of the COPY statements completed by an earlier run
+                import_manifest: ImportManifest = ImportManifest(manifest_file)
+
+                # parse the data, the import opens its own DB connections
+                import_jobs: list = import_data(db, args.data_dir, args.node_infile, args.edge_infile, args.data_format, args.workers, copy_max_size,
+                                                import_manifest)
+
+                # save the files that were not loaded
+                failed_files += [in_file for job in import_jobs if job.status != 'done' or job.warnings for in_file in job.in_files]
+
+                # compare the table row counts with the manifest if requested
+                if args.verify and verify_import(db, import_manifest):
+                    exit_code = 1
 
-                # deserialize the edge lookup data from the pickle file
-                with open(os.path.join(args.data_dir, "serialized_edge_predicates.pkl"), "rb") as edge_pkl_file:
-                    edge_predicate_lookups = pickle.load(edge_pkl_file)
+        # load the converted data straight into the DB tables if requested. this does the bin and import steps without the bin files
+        if run_type == "LOAD":
+            with Timer(name="Load data", text="Data loaded in {:.2f}s", logger=logger.debug):
+                # the converted data is loaded as arrow tables, the CSV list columns are text that would need parsing again
+                if args.data_format != 'parquet':
+                    raise ValueError('The load step reads the converted parquet files, convert the data with --format=parquet.')
+
+                # load the node lookup data
+                node_class_lookups, _ = load_lookups(args.data_dir)
 
                 # Create the database
                 db = kuzu.Database(db_dir, max_db_size=274877906944)
@@ -736,18 +2738,31 @@ if __name__ == "__main__":
                 # get a DB connection
                 connection = kuzu.Connection(db)
 
-                # parse the data
-                import_data(connection, args.data_dir, args.node_infile, args.edge_infile)
+                # get how the tables were created
+                surrogate_keys: bool = uses_surrogate_keys(args.data_dir)
+                table_columns: dict = BinColumns.load(os.path.join(args.data_dir, table_columns_file_name))
 
-                # close the DB connection
-                connection.close()
-                connection = None
+                # load the nodes first, the edges are loaded into rel tables between the node tables
+                for infile, file_type in ((args.node_infile, 'NODE'), (args.edge_infile, 'EDGE')):
+                    failed_files += load_data(connection, args.data_dir, infile, file_type, node_class_lookups, args.load_batch_size, surrogate_keys,
+                                              table_columns)
 
     except Exception as e:
         logger.exception(f'Exception parsing')
+
+        # set the failure exit code
+        exit_code = 1
     finally:
         # close the DB connection if it is open
         if connection:
             connection.close()
 
+    # set the failure exit code if any of the data files failed
+    if failed_files:
+        logger.error('%s data file(s) failed processing: %s', len(failed_files), ', '.join(map(str, failed_files)))
+
+        exit_code = 1
+
     logger.debug('Processing complete.')
+
+    sys.exit(exit_code)
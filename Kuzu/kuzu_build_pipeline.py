@@ -0,0 +1,222 @@
+import os
+import sys
+import glob
+import argparse
+import subprocess
+from common.logger import LoggingUtil
+from common.part_files import PartFiles
+from common.pipeline_runner import PipelineRunner, PipelineStage
+from kuzu_build_graph_csv import (get_data_files, get_output_prefix, node_header_file_name, edge_header_file_name, lookup_store_file_name,
+                                  node_pickle_file_name, edge_pickle_file_name, import_manifest_suffix, table_columns_file_name)
+
+"""
+this code runs the Kuzu DB build steps (convert, create_lus, bin, create_tables and import) of kuzu_build_graph_csv.py in
+dependency order. a step is only run if its inputs, options or the code have changed since it last completed, or its
+outputs were removed. the completed steps are recorded in <outfile>.pipeline-state.json next to the DB.
+
+the load step can be run in place of the bin and import steps with --steps=convert,create_lus,tables,load.
+
+each step is run as its own kuzu_build_graph_csv.py process, so its memory is released before the next step starts.
+"""
+
+# get the log level and directory from the environment.
+log_level, log_path = LoggingUtil.prep_for_logging()
+
+# create a logger
+logger = LoggingUtil.init_logging("kuzu_build_pipeline", level=log_level, line_format='medium', log_file_path=log_path)
+
+# the location of this file and the repo
+this_dir: str = os.path.dirname(os.path.abspath(__file__))
+repo_dir: str = os.path.dirname(this_dir)
+
+# the build script the steps are run with
+build_script: str = os.path.join(this_dir, 'kuzu_build_graph_csv.py')
+
+# the suffix of the file the completed steps are recorded in, this is appended to the DB path
+pipeline_state_suffix = '.pipeline-state.json'
+
+# the build step names and their --type values, in the order they are run
+step_types: dict = {'convert': 'convert', 'create_lus': 'create_lus', 'bin': 'bin', 'tables': 'create_tables', 'import': 'import', 'load': 'load'}
+
+# the steps run if the steps are not specified. the load step replaces the bin and import steps so it is only run if requested
+default_steps: list = ['convert', 'create_lus', 'bin', 'tables', 'import']
+
+# the build options that change the outputs of each step. the options not listed here are passed to every step but do not
+# cause a step to run again
+step_options: dict = {'convert': ['chunk-size', 'memory-budget', 'workers', 'format', 'range-size'],
+                      'create_lus': ['format', 'pickle', 'range-size', 'surrogate-keys'],
+                      'bin': ['format', 'max-open-files', 'workers', 'shard-merge-size', 'range-size', 'prune-columns'],
+                      'tables': [],
+                      'import': ['format', 'copy-max-size'],
+                      'load': ['format', 'load-batch-size']}
+
+
+def get_build_options(build_args: list) -> dict:
+    """
+    gets the build options passed on to the steps. e.g. ['--workers=8', '--pickle'] -> {'workers': '8', 'pickle': True}
+
+    :param build_args:
+    :return:
+    """
+    # init the return value
+    ret_val: dict = {}
+
+    for index, arg in enumerate(build_args):
+        # skip the option values given as their own argument
+        if not arg.startswith('--'):
+            continue
+
+        if '=' in arg:
+            name, value = arg[2:].split('=', 1)
+        elif index + 1 < len(build_args) and not build_args[index + 1].startswith('--'):
+            name, value = arg[2:], build_args[index + 1]
+        else:
+            name, value = arg[2:], True
+
+        ret_val[name] = value
+
+    # return to the caller
+    return ret_val
+
+
+def run_step(_data_dir, _outfile, _node_infile, _edge_infile, _step: str, _build_args: list) -> bool:
+    """
+    runs a build step in its own process.
+
+    :param _data_dir:
+    :param _outfile:
+    :param _node_infile:
+    :param _edge_infile:
+    :param _step:
+    :param _build_args: the build options passed on to the step
+    :return: True if the step succeeded
+    """
+    # get the command line of the step
+    command: list = [sys.executable, build_script, f'--node-infile={_node_infile}', f'--edge-infile={_edge_infile}', f'--data-dir={_data_dir}',
+                     f'--outfile={_outfile}', f'--type={step_types[_step]}'] + _build_args
+
+    # make sure the step can import the common modules
+    env: dict = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [repo_dir, os.environ.get('PYTHONPATH')])))
+
+    logger.debug('Running: %s', ' '.join(command))
+
+    # return whether the step succeeded
+    return subprocess.run(command, env=env).returncode == 0
+
+
+def get_pipeline(_data_dir, _outfile, _node_infile, _edge_infile, _build_args: list, _steps: list = None) -> PipelineRunner:
+    """
+    gets the pipeline of build steps.
+
+    :param _data_dir:
+    :param _outfile:
+    :param _node_infile: the node part file prefix or single file. e.g. rk-nodes-pt or rk-nodes.csv
+    :param _edge_infile: the edge part file prefix or single file. e.g. rk-edges-pt or rk-edges.csv
+    :param _build_args: the build options passed on to the steps
+    :param _steps: the steps to run, the default steps if not specified
+    :return:
+    """
+    # get the steps to run
+    _steps = _steps or default_steps
+
+    # get the build options and the format of the converted and binned files
+    build_options: dict = get_build_options(_build_args)
+
+    data_format: str = build_options.get('format', 'csv')
+
+    # get the input file name prefixes of each step
+    node_conv: str = get_output_prefix(_data_dir, _node_infile, 'pt', 'conv')
+    edge_conv: str = get_output_prefix(_data_dir, _edge_infile, 'pt', 'conv')
+    node_bin: str = node_conv.replace('conv', 'bin-')
+    edge_bin: str = edge_conv.replace('conv', 'bin-')
+
+    # get the paths of the header files, the lookup store, the columns kept for each table and the DB
+    header_files: list = [os.path.join(_data_dir, node_header_file_name), os.path.join(_data_dir, edge_header_file_name)]
+    store_file: str = os.path.join(_data_dir, lookup_store_file_name)
+    columns_file: str = os.path.join(_data_dir, table_columns_file_name)
+    db_dir: str = os.path.join(_data_dir, str(_outfile))
+
+    def get_conv_files() -> list:
+        return [inf for prefix in (node_conv, edge_conv) for _, inf in PartFiles.find(_data_dir, prefix, data_format)]
+
+    def get_bin_files() -> list:
+        return [inf for prefix in (node_bin, edge_bin) for inf in glob.glob(glob.escape(os.path.join(_data_dir, prefix)) + '*.' + data_format)]
+
+    def get_lookup_files() -> list:
+        pickle_files: list = [os.path.join(_data_dir, node_pickle_file_name), os.path.join(_data_dir, edge_pickle_file_name)]
+
+        return [store_file] + (pickle_files if build_options.get('pickle') else [])
+
+    # get the inputs and outputs of each step. step: (node infile, edge infile, inputs method, outputs method, depends on).
+    # the tables step runs after the bin step, a change to the columns kept for each table by the bin step creates the tables again
+    steps: dict = {
+        'convert': (_node_infile, _edge_infile,
+                    lambda: get_data_files(_data_dir, _node_infile, 'NODE') + get_data_files(_data_dir, _edge_infile, 'EDGE') + header_files,
+                    get_conv_files, []),
+        'create_lus': (node_conv, edge_conv, get_conv_files, get_lookup_files, ['convert']),
+        'bin': (node_conv, edge_conv, lambda: get_conv_files() + [store_file], get_bin_files, ['create_lus']),
+        'tables': (node_header_file_name, edge_header_file_name, lambda: [store_file, columns_file] + header_files, lambda: [db_dir], ['create_lus']),
+        'import': (node_bin, edge_bin, get_bin_files, lambda: [db_dir + import_manifest_suffix], ['bin', 'tables']),
+        'load': (node_conv, edge_conv, lambda: get_conv_files() + [store_file], lambda: [db_dir], ['create_lus', 'tables'])}
+
+    # init the pipeline, any change to the build code runs all the steps again
+    ret_val: PipelineRunner = PipelineRunner(db_dir + pipeline_state_suffix,
+                                             PipelineRunner.get_code_version([build_script] + glob.glob(os.path.join(repo_dir, 'common', '*.py'))),
+                                             logger)
+
+    for step, (node_infile, edge_infile, get_inputs, get_outputs, depends_on) in steps.items():
+        # leave out the steps not requested, a step that depends on one of them uses its last completed run
+        if step not in _steps:
+            continue
+
+        ret_val.add(PipelineStage(step, lambda s=step, n=node_infile, e=edge_infile: run_step(_data_dir, _outfile, n, e, s, _build_args),
+                                  get_inputs, get_outputs, [name for name in depends_on if name in _steps],
+                                  {name: build_options.get(name) for name in step_options[step]}))
+
+    # return to the caller
+    return ret_val
+
+
+if __name__ == "__main__":
+    """
+    command line:
+
+    python kuzu_build_pipeline.py --node-infile=rk-nodes-pt --edge-infile=rk-edges-pt --data-dir=/database/graph-eval --outfile=rk-kuzu-db
+    --workers=8
+
+    any other options (e.g. --workers, --format, --range-size) are passed on to the kuzu_build_graph_csv.py steps.
+    """
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--node-infile', dest='node_infile', type=str, help='Node part file prefix (e.g. rk-nodes-pt) or single file (e.g. rk-nodes.csv)')
+    parser.add_argument('--edge-infile', dest='edge_infile', type=str, help='Edge part file prefix (e.g. rk-edges-pt) or single file (e.g. rk-edges.csv)')
+    parser.add_argument('--data-dir', dest='data_dir', type=str, help='Data directory')
+    parser.add_argument('--outfile', dest='outfile', type=str, help='Output DB name')
+    parser.add_argument('--steps', dest='steps', type=str, default=None,
+                        help=f'Comma separated steps to run ({",".join(step_types)}), {",".join(default_steps)} if not specified')
+    parser.add_argument('--force', dest='force', type=str, default=None, help='Comma separated steps to run even if they are current, or all')
+    parser.add_argument('--dry-run', dest='dry_run', action='store_true', help='Only report the steps that would be run')
+
+    args, build_arguments = parser.parse_known_args()
+
+    # get the steps to run and the steps to force
+    steps: list = args.steps.split(',') if args.steps else default_steps
+    force: list = steps if args.force == 'all' else args.force.split(',') if args.force else []
+
+    # make sure the steps are known
+    unknown: list = [step for step in steps + force if step not in step_types]
+
+    if unknown:
+        parser.error(f'Unknown step(s): {", ".join(unknown)}')
+
+    # get the pipeline and run it
+    pipeline: PipelineRunner = get_pipeline(args.data_dir, args.outfile, args.node_infile, args.edge_infile, build_arguments, steps)
+
+    stages: list = pipeline.run(force, args.dry_run)
+
+    pipeline.log_summary('Build steps')
+
+    logger.debug('Processing complete.')
+
+    # set the failure exit code if any of the steps did not complete
+    sys.exit(1 if any(stage.status in ('failed', 'skipped') for stage in stages) else 0)
@@ -0,0 +1,93 @@
+import argparse
+import random
+import time
+import pandas as pd
+from common.convert_utils import ConvertUtils
+
+"""
+compares the original per-cell apply() list/int column conversion with the vectorized ConvertUtils version.
+
+the output of both methods is compared to make sure they produce the same CSV data.
+
+command line (from the repo root):
+    python -m benchmarks.convert_benchmark --rows=1000000
+"""
+
+
+def legacy_convert(df: pd.DataFrame, list_cols: list, int_cols: list) -> pd.DataFrame:
+    """
+    the original Kuzu convert_data() column conversions
+
+    :param df:
+    :param list_cols:
+    :param int_cols:
+    :return:
+    """
+    for col in list_cols:
+        df[col] = df[col].apply(lambda x: [] if pd.isna(x) else '[' + ','.join(map(str, str(x).replace('\'', '`').split(';'))) + ']')
+
+    for col in int_cols:
+        df[col] = df[col].apply(lambda x: x if pd.isna(x) else str(int(x)))
+
+    return df
+
+
+def vectorized_convert(df: pd.DataFrame, list_cols: list, int_cols: list) -> pd.DataFrame:
+    """
+    the vectorized column conversions
+
+    :param df:
+    :param list_cols:
+    :param int_cols:
+    :return:
+    """
+    for col in list_cols:
+        df[col] = ConvertUtils.format_list_column(df[col])
+
+    for col in int_cols:
+        df[col] = ConvertUtils.format_int_column(df[col])
+
+    return df
+
+
+def make_data(rows: int) -> pd.DataFrame:
+    """
+    creates a data frame that looks like the RK edge data
+
+    :param rows:
+    :return:
+    """
+    rnd = random.Random(0)
+
+    return pd.DataFrame({'publications': [rnd.choice([None, 'PMID:1;PMID:2', 'PMID:3', "PMC:'4'"]) for _ in range(rows)],
+                         'provided_by': [rnd.choice(['infores:a;infores:b', 'infores:c']) for _ in range(rows)],
+                         'p_value': [rnd.choice([None, 0.05, 1e-05, 1.0]) for _ in range(rows)],
+                         'distance_to_feature': [rnd.choice([None, 10.0, 250.0]) for _ in range(rows)]})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--rows', dest='rows', type=int, default=1000000, help='Number of rows to convert')
+
+    args = parser.parse_args()
+
+    list_columns: list = ['publications', 'provided_by', 'p_value']
+    int_columns: list = ['distance_to_feature']
+
+    data: pd.DataFrame = make_data(args.rows)
+
+    results: dict = {}
+
+    for name, method in [('legacy', legacy_convert), ('vectorized', vectorized_convert)]:
+        start = time.perf_counter()
+
+        converted = method(data.copy(), list_columns, int_columns)
+
+        duration = time.perf_counter() - start
+
+        results[name] = converted.to_csv(index=False)
+
+        print(f'{name:>10}: {args.rows} rows in {duration:.2f}s, {args.rows / duration:,.0f} rows/s')
+
+    print('output identical:', results['legacy'] == results['vectorized'])
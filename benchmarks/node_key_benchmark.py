@@ -0,0 +1,221 @@
+import os
+import argparse
+import random
+import shutil
+import tempfile
+import time
+import kuzu
+from common.node_class_index import NodeClassIndex
+
+"""
+compares Kuzu node tables keyed by the node id (CURIE) string with node tables keyed by the dense integer node keys of the
+node class index (kuzu_build_graph_csv.py --surrogate-keys).
+
+the edge COPY, a traversal query and the DB size are measured for each. the traversal query results are compared to make sure
+both DBs hold the same graph.
+
+command line (from the repo root):
+    python -m benchmarks.node_key_benchmark --nodes=1000000 --edges=5000000
+"""
+
+# the node classes of the generated data
+node_classes: list = ['Gene', 'Protein', 'SmallMolecule', 'Disease']
+
+# the traversal query, the number of 2 hop paths from a sample of genes
+traversal_query: str = ("MATCH (a:`biolink:Gene`)-[:`biolink:related_to`]->(b)-[:`biolink:related_to`]->(c) WHERE a.id IN $ids "
+                        "RETURN count(*)")
+
+
+def make_data(work_dir: str, nodes: int, edges: int) -> (dict, dict):
+    """
+    creates node CSV files for each node class and edge CSV files for each subject/object class pair that look like the RK
+    bin files. the files are written keyed by the node ids and by the node keys.
+
+    :param work_dir:
+    :param nodes:
+    :param edges:
+    :return: the node and edge files of each mode. mode: {node class or class pair: file path}
+    """
+    rnd = random.Random(0)
+
+    # get the node ids and classes
+    node_ids: list = [f'CURIE:{i}' for i in range(nodes)]
+    classes: list = [node_classes[i % len(node_classes)] for i in range(nodes)]
+
+    # get the node keys the same way the bin step does
+    index: NodeClassIndex = NodeClassIndex()
+
+    index.update(node_ids, classes)
+
+    keys: list = index.get_keys(node_ids).tolist()
+
+    # init the files of each mode
+    node_files: dict = {'id': {}, 'key': {}}
+    edge_files: dict = {'id': {}, 'key': {}}
+
+    for mode in ('id', 'key'):
+        os.mkdir(os.path.join(work_dir, mode))
+
+    # write the node files
+    out_fhs: dict = {}
+
+    try:
+        for node_class in node_classes:
+            for mode, header in (('id', 'id,name\n'), ('key', 'node_key,id,name\n')):
+                node_files[mode][node_class] = os.path.join(work_dir, mode, f'rk-nodes-bin-{node_class}.csv')
+
+                out_fhs[mode, node_class] = open(node_files[mode][node_class], 'w', encoding='utf-8')
+                out_fhs[mode, node_class].write(header)
+
+        for node_id, node_class, key in zip(node_ids, classes, keys):
+            out_fhs['id', node_class].write(f'{node_id},name {node_id}\n')
+            out_fhs['key', node_class].write(f'{key},{node_id},name {node_id}\n')
+    finally:
+        for out_fh in out_fhs.values():
+            out_fh.close()
+
+    # write the edge files
+    out_fhs = {}
+
+    try:
+        for _ in range(edges):
+            subject, obj = rnd.randrange(nodes), rnd.randrange(nodes)
+
+            pair: tuple = (classes[subject], classes[obj])
+
+            if pair not in out_fhs:
+                for mode in ('id', 'key'):
+                    edge_files[mode][pair] = os.path.join(work_dir, mode, f'rk-edges-bin-related_to_{pair[0]}_{pair[1]}.csv')
+
+                    out_fhs[mode, pair] = open(edge_files[mode][pair], 'w', encoding='utf-8')
+                    out_fhs[mode, pair].write('from,to,subject,object,label\n')
+
+            out_fhs['id', pair].write(f'{node_ids[subject]},{node_ids[obj]},{node_ids[subject]},{node_ids[obj]},biolink:related_to\n')
+            out_fhs['key', pair].write(f'{keys[subject]},{keys[obj]},{node_ids[subject]},{node_ids[obj]},biolink:related_to\n')
+    finally:
+        for out_fh in out_fhs.values():
+            out_fh.close()
+
+    # return to the caller
+    return node_files, edge_files
+
+
+def get_size(path: str) -> int:
+    """
+    gets the size of a DB file or directory
+
+    :param path:
+    :return:
+    """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def build_db(db_dir: str, mode: str, node_files: dict, edge_files: dict) -> (float, float):
+    """
+    creates the tables and loads the files the way kuzu_build_graph_csv.py does
+
+    :param db_dir:
+    :param mode: id or key
+    :param node_files:
+    :param edge_files:
+    :return: the node and edge COPY times
+    """
+    db = kuzu.Database(db_dir)
+    conn = kuzu.Connection(db)
+
+    # the node key is the primary key in key mode, the node id is then an ordinary property
+    key_col, primary_key = ('node_key INT64, ', 'node_key') if mode == 'key' else ('', 'id')
+
+    for node_class in node_classes:
+        conn.execute(f'CREATE NODE TABLE `biolink:{node_class}`({key_col}id STRING, name STRING, PRIMARY KEY ({primary_key}))')
+
+    from_to_clause: str = ','.join(f'FROM `biolink:{pair[0]}` TO `biolink:{pair[1]}`' for pair in sorted(edge_files))
+
+    conn.execute(f'CREATE REL TABLE `biolink:related_to`({from_to_clause}, subject STRING, object STRING, label STRING)')
+
+    start = time.perf_counter()
+
+    for node_class, node_file in node_files.items():
+        conn.execute(f'COPY `biolink:{node_class}` FROM "{node_file}" (HEADER=true, DELIMITER=",")')
+
+    node_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+
+    for pair, edge_file in sorted(edge_files.items()):
+        conn.execute(f"COPY `biolink:related_to` FROM \"{edge_file}\" (from='biolink:{pair[0]}', to='biolink:{pair[1]}', HEADER=true, "
+                     f"DELIMITER=\",\")")
+
+    edge_duration = time.perf_counter() - start
+
+    conn.close()
+    db.close()
+
+    # return to the caller
+    return node_duration, edge_duration
+
+
+def run_traversal(db_dir: str, ids: list, repeat: int) -> (float, int):
+    """
+    runs the traversal query on a DB
+
+    :param db_dir:
+    :param ids: the ids of the genes the paths start from
+    :param repeat: the number of times the query is run
+    :return: the average query time and the query result
+    """
+    db = kuzu.Database(db_dir, read_only=True)
+    conn = kuzu.Connection(db)
+
+    ret_val: int = 0
+
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        ret_val = conn.execute(traversal_query, {'ids': ids}).get_next()[0]
+
+    duration = (time.perf_counter() - start) / repeat
+
+    conn.close()
+    db.close()
+
+    # return to the caller
+    return duration, ret_val
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--nodes', dest='nodes', type=int, default=1000000, help='Number of nodes')
+    parser.add_argument('--edges', dest='edges', type=int, default=5000000, help='Number of edges')
+    parser.add_argument('--start-nodes', dest='start_nodes', type=int, default=1000, help='Number of genes the traversal query starts from')
+    parser.add_argument('--repeat', dest='repeat', type=int, default=5, help='Number of times the traversal query is run')
+
+    args = parser.parse_args()
+
+    work_dir: str = tempfile.mkdtemp()
+
+    try:
+        nodes_by_mode, edges_by_mode = make_data(work_dir, args.nodes, args.edges)
+
+        # the genes are every len(node_classes)th node
+        start_ids: list = [f'CURIE:{i}' for i in range(0, args.nodes, len(node_classes))][:args.start_nodes]
+
+        results: dict = {}
+
+        for key_mode in ('id', 'key'):
+            db_path: str = os.path.join(work_dir, key_mode, 'rk-kuzu-db')
+
+            node_time, edge_time = build_db(db_path, key_mode, nodes_by_mode[key_mode], edges_by_mode[key_mode])
+
+            query_time, results[key_mode] = run_traversal(db_path, start_ids, args.repeat)
+
+            print(f'{key_mode:>4}: nodes loaded in {node_time:.2f}s, {args.edges} edges loaded in {edge_time:.2f}s '
+                  f'({args.edges / edge_time:,.0f} edges/s), traversal {query_time:.3f}s, DB size {get_size(db_path) / 1024 / 1024:,.1f}MB')
+
+        print('traversal results identical:', results['id'] == results['key'])
+    finally:
+        shutil.rmtree(work_dir)
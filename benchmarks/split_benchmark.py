@@ -0,0 +1,115 @@
+import os
+import argparse
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from common.csv_splitter import CSVSplitter
+
+"""
+compares the create_split_*_csv_files.sh approach (a sed pass over the whole source file for every part file) with the single
+pass CSVSplitter.
+
+the part files of both methods are compared to make sure they hold the same data.
+
+command line (from the repo root):
+    python -m benchmarks.split_benchmark --rows=2000000 --parts=20
+"""
+
+
+def make_data(out_file: str, rows: int) -> None:
+    """
+    creates a CSV file that looks like the RK edge data
+
+    :param out_file:
+    :param rows:
+    :return:
+    """
+    rnd = random.Random(0)
+
+    with open(out_file, 'w', encoding='utf-8') as out_fh:
+        out_fh.write('subject,predicate,object,publications,provided_by,p_value\n')
+
+        for i in range(rows):
+            out_fh.write(f'CURIE:{rnd.randint(1, 1000000)},biolink:{rnd.choice(["affects", "treats", "related_to"])},CURIE:{rnd.randint(1, 1000000)},'
+                         f'{rnd.choice(["", "PMID:1;PMID:2", "PMID:3"])},{rnd.choice(["infores:a;infores:b", "infores:c"])},{rnd.choice(["", "0.05", "1e-05"])}\n')
+
+
+def sed_split(in_file: str, out_prefix: str, rows: int, parts: int) -> None:
+    """
+    the create_split_*_csv_files.sh method. each part file is the header file followed by a sed range of the source
+
+    :param in_file:
+    :param out_prefix:
+    :param rows:
+    :param parts:
+    :return:
+    """
+    header_file: str = out_prefix + '-header-cols.csv'
+
+    subprocess.run(f'head -1 {in_file} > {header_file}', shell=True, check=True)
+
+    for i in range(parts):
+        subprocess.run(f"sed -n -e '{i * rows + 2},{(i + 1) * rows + 1}p' {in_file} > tmp.out && cat {header_file} tmp.out > {out_prefix}{i + 1}.csv && "
+                       f"rm tmp.out", shell=True, check=True, cwd=os.path.dirname(out_prefix))
+
+    os.remove(header_file)
+
+
+def python_split(in_file: str, out_prefix: str, rows: int, _parts: int) -> None:
+    """
+    the single pass splitter
+
+    :param in_file:
+    :param out_prefix:
+    :param rows:
+    :param _parts:
+    :return:
+    """
+    CSVSplitter(in_file, out_prefix, rows).split()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--rows', dest='rows', type=int, default=2000000, help='Number of rows in the source file')
+    parser.add_argument('--parts', dest='parts', type=int, default=20, help='Number of part files')
+
+    args = parser.parse_args()
+
+    # get the number of rows in each part, rounded up so the last part holds the remainder
+    part_rows: int = -(-args.rows // args.parts)
+
+    work_dir: str = tempfile.mkdtemp()
+
+    try:
+        source: str = os.path.join(work_dir, 'rk-edges.csv')
+
+        make_data(source, args.rows)
+
+        results: dict = {}
+
+        for name, method in [('sed', sed_split), ('python', python_split)]:
+            out_dir: str = os.path.join(work_dir, name)
+
+            os.mkdir(out_dir)
+
+            start = time.perf_counter()
+
+            method(source, os.path.join(out_dir, 'rk-edges-pt'), part_rows, args.parts)
+
+            duration = time.perf_counter() - start
+
+            # read back the part files
+            results[name] = []
+
+            for i in range(1, args.parts + 1):
+                with open(os.path.join(out_dir, f'rk-edges-pt{i}.csv'), 'rb') as in_fh:
+                    results[name].append(in_fh.read())
+
+            print(f'{name:>10}: {args.rows} rows into {args.parts} parts in {duration:.2f}s, {args.rows / duration:,.0f} rows/s')
+
+        print('output identical:', results['sed'] == results['python'])
+    finally:
+        shutil.rmtree(work_dir)
@@ -0,0 +1,204 @@
+"""
+    Bin columns.
+
+    tracks the columns that hold data in each bin and projects the bin files onto the columns used by their table. most of
+    the node and edge columns are empty for any one node class or predicate, leaving them out of a table makes the DB smaller
+    and the COPY faster.
+
+    a field holds no data if it is empty or holds an empty quoted string or list. the columns kept for each table are saved
+    in a JSON file so that the table definitions match the projected bin files.
+"""
+
+import os
+import json
+from common.bin_writer import BinWriter
+
+
+class BinColumns:
+    """
+        Tracks the columns that hold data in each bin.
+    """
+    # the field values that hold no data
+    empty_values: frozenset = frozenset([b'', b'""', b'[]', b'"[]"'])
+
+    # the number of bytes buffered for the projected files
+    buffer_size: int = 8 * 1024 * 1024
+
+    def __init__(self, required: list = None):
+        """
+        init the tracker
+
+        :param required: the names of the columns kept in every bin even if they are empty, e.g. the primary key
+        """
+        self.required: list = list(required or [])
+
+        # the column names of the header line
+        self.header: list = []
+
+        # the columns not yet seen holding data in each bin. bin key: set of column indexes
+        self.empty: dict = {}
+
+    def set_header(self, header: bytes) -> None:
+        """
+        sets the header line of the records added. all the records must have the same header.
+
+        :param header:
+        :return:
+        """
+        names: list = [name.strip(b'"').decode('utf-8') for name in self.get_fields(header)]
+
+        if self.header and names != self.header:
+            raise ValueError('The CSV files being binned do not have the same header.')
+
+        self.header = names
+
+    def add(self, bin_key: str, record: bytes) -> None:
+        """
+        notes the columns of a record that hold data.
+
+        :param bin_key:
+        :param record: the raw CSV record
+        :return:
+        """
+        # get the columns of the bin that have not held data yet
+        empty: set = self.empty.get(bin_key, None)
+
+        if empty is None:
+            empty = self.empty[bin_key] = {index for index, name in enumerate(self.header) if name not in self.required}
+
+        # there is nothing more to find once all the columns have held data
+        if not empty:
+            return
+
+        fields: list = self.get_fields(record)
+
+        for index in [index for index in empty if index < len(fields) and fields[index] not in self.empty_values]:
+            empty.discard(index)
+
+    def update(self, other: 'BinColumns') -> None:
+        """
+        adds the columns tracked for another set of records, e.g. a shard of the bins. a column is only empty in a bin if it is
+        empty in both.
+
+        :param other:
+        :return:
+        """
+        if other.header:
+            self.set_header(b','.join(name.encode('utf-8') for name in other.header))
+
+        for bin_key, empty in other.empty.items():
+            self.empty[bin_key] = self.empty[bin_key] & empty if bin_key in self.empty else set(empty)
+
+    def get_columns(self, bin_keys: list) -> list:
+        """
+        gets the columns that hold data in any of a set of bins.
+
+        :param bin_keys:
+        :return: the column indexes in header order
+        """
+        # a column is only left out if it is empty in all the bins
+        empty: set = set.intersection(*[self.empty[bin_key] for bin_key in bin_keys]) if bin_keys else set()
+
+        return [index for index in range(len(self.header)) if index not in empty]
+
+    @staticmethod
+    def get_fields(record: bytes) -> list:
+        """
+        splits a CSV record into its raw fields. quoted fields keep their quotes, so the fields can be joined back into a record.
+
+        :param record:
+        :return:
+        """
+        # split the fields, this is all that is needed when none of them are quoted
+        parts: list = record.rstrip(b'\r\n').split(b',')
+
+        if b'"' not in record:
+            return parts
+
+        # init the return value
+        ret_val: list = []
+
+        # init the field being joined
+        field: bytes | None = None
+
+        # a quoted field may hold commas, the parts are joined back until its quotes are balanced
+        for part in parts:
+            field = part if field is None else field + b',' + part
+
+            if field.count(b'"') % 2 == 0:
+                ret_val.append(field)
+
+                field = None
+
+        # return any unterminated field at the end of the record
+        if field is not None:
+            ret_val.append(field)
+
+        # return to the caller
+        return ret_val
+
+    @staticmethod
+    def project_file(file_path: str, columns: list) -> None:
+        """
+        rewrites a CSV file with only the specified columns.
+
+        :param file_path:
+        :param columns: the column indexes to keep, in the order they are written
+        :return:
+        """
+        # write a temporary file and replace the file with it
+        temp_file: str = file_path + '.tmp'
+
+        with open(file_path, 'rb', buffering=BinColumns.buffer_size) as in_fh, open(temp_file, 'wb', buffering=BinColumns.buffer_size) as out_fh:
+            for record in BinWriter.read_records(in_fh):
+                fields: list = BinColumns.get_fields(record)
+
+                # keep the line terminator of the record
+                out_fh.write(b','.join(fields[index] if index < len(fields) else b'' for index in columns) + record[len(record.rstrip(b'\r\n')):])
+
+        os.replace(temp_file, file_path)
+
+    @staticmethod
+    def load(file_path: str) -> dict:
+        """
+        loads the columns kept for each table.
+
+        :param file_path:
+        :return: file type: {header: [column names], tables: {table: [column indexes]}}, empty if there is no file
+        """
+        if not os.path.exists(file_path):
+            return {}
+
+        with open(file_path, 'r', encoding='utf-8') as in_fh:
+            return json.load(in_fh)
+
+    @staticmethod
+    def save(file_path: str, file_type: str, header: list = None, tables: dict = None) -> None:
+        """
+        saves the columns kept for the tables of a file type.
+
+        :param file_path:
+        :param file_type: NODE or EDGE
+        :param header: the column names of the bin files before they were projected
+        :param tables: the column indexes kept for each table. the entry for the file type is removed if this is not specified
+        :return:
+        """
+        # get the entries of the other file type
+        ret_val: dict = BinColumns.load(file_path)
+
+        # leave the file alone if there is nothing to change
+        if tables is None and file_type not in ret_val:
+            return
+
+        if tables is None:
+            ret_val.pop(file_type)
+        else:
+            ret_val[file_type] = {'header': header, 'tables': tables}
+
+        # write a temporary file and replace the file with it
+        temp_file: str = file_path + '.tmp'
+
+        with open(temp_file, 'w', encoding='utf-8') as out_fh:
+            json.dump(ret_val, out_fh, indent=1)
+
+        os.replace(temp_file, file_path)
@@ -0,0 +1,122 @@
+"""
+    Bin file pool.
+
+    keeps a bounded number of the binned output files open. when the limit is reached the least recently used file is
+    closed, and it is reopened in append mode the next time it is written to, so its header is not written again.
+"""
+
+from collections import OrderedDict
+
+
+class BinFilePool:
+    """
+        A least recently used pool of open output file handles.
+    """
+    # the default maximum number of files kept open
+    default_max_open_files: int = 512
+
+    def __init__(self, max_open_files: int = None, writer_factory=None, encoding: str = 'utf-8', binary: bool = False):
+        """
+        init the pool
+
+        :param max_open_files: the maximum number of files kept open at one time
+        :param writer_factory: an optional method (e.g. csv.writer) that creates a writer for each file handle
+        :param encoding:
+        :param binary: open the files in binary mode so that bytes are written unchanged
+        """
+        self.max_open_files: int = max(1, max_open_files or self.default_max_open_files)
+        self.writer_factory = writer_factory
+        self.encoding: str = encoding
+        self.binary: bool = binary
+
+        # the open files in least to most recently used order. file path: [file handle, writer]
+        self._open_files: OrderedDict = OrderedDict()
+
+        # the files created by this pool
+        self._created_files: set = set()
+
+        # the usage counters
+        self.opens: int = 0
+        self.evictions: int = 0
+        self.reopens: int = 0
+
+    def get(self, file_path: str) -> (object, bool):
+        """
+        gets the writer (or file handle if there is no writer factory) for a file, opening it if needed.
+
+        :param file_path:
+        :return: the writer and whether the file was just created, in which case the caller should write the header
+        """
+        # get the open file
+        entry: list = self._open_files.get(file_path, None)
+
+        # if it is open make it the most recently used file
+        if entry is not None:
+            self._open_files.move_to_end(file_path)
+
+            return entry[1], False
+
+        # make room for the file
+        while len(self._open_files) >= self.max_open_files:
+            # close the least recently used file
+            self._open_files.popitem(last=False)[1][0].close()
+
+            self.evictions += 1
+
+        # files created earlier are appended to, new ones are created
+        is_new: bool = file_path not in self._created_files
+
+        # open the file
+        if self.binary:
+            file_handle = open(file_path, mode='wb' if is_new else 'ab')
+        else:
+            file_handle = open(file_path, mode='w' if is_new else 'a', newline='', encoding=self.encoding)
+
+        self.opens += 1
+
+        if is_new:
+            self._created_files.add(file_path)
+        else:
+            self.reopens += 1
+
+        # save the file
+        entry = [file_handle, self.writer_factory(file_handle) if self.writer_factory else file_handle]
+
+        self._open_files[file_path] = entry
+
+        # return the writer
+        return entry[1], is_new
+
+    @property
+    def created_files(self) -> list:
+        """
+        gets the paths of the files created by the pool.
+
+        :return:
+        """
+        return sorted(self._created_files)
+
+    def get_stats(self) -> dict:
+        """
+        gets the usage counters.
+
+        :return:
+        """
+        return {'files': len(self._created_files), 'opens': self.opens, 'evictions': self.evictions, 'reopens': self.reopens}
+
+    def close(self) -> None:
+        """
+        closes all the open files.
+
+        :return:
+        """
+        for entry in self._open_files.values():
+            entry[0].close()
+
+        self._open_files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
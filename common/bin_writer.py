@@ -0,0 +1,335 @@
+"""
+    Bin writer.
+
+    copies the raw lines of a CSV file into binned output files. only the fields needed to pick the bin are parsed,
+    the lines themselves are written through unchanged. the lines are collected in a buffer for each bin and written
+    out in large blocks through a bounded pool of file handles.
+"""
+
+import os
+import shutil
+from common.bin_file_pool import BinFilePool
+
+
+class BinWriter:
+    """
+        Buffers raw CSV lines by bin and writes them to the bin files.
+    """
+    # the default number of bytes buffered for a single bin before it is written out
+    default_bin_buffer_size: int = 1024 * 1024
+
+    # the default number of bytes buffered for all the bins before they are all written out
+    default_max_buffered: int = 256 * 1024 * 1024
+
+    def __init__(self, path_method, max_open_files: int = None, bin_buffer_size: int = None, max_buffered: int = None):
+        """
+        init the writer
+
+        :param path_method: a method that gets the output file path for a bin key
+        :param max_open_files: the maximum number of files kept open at one time
+        :param bin_buffer_size: the number of bytes buffered for a bin before it is written out
+        :param max_buffered: the number of bytes buffered for all bins before they are written out
+        """
+        self.path_method = path_method
+        self.bin_buffer_size: int = bin_buffer_size or self.default_bin_buffer_size
+        self.max_buffered: int = max_buffered or self.default_max_buffered
+
+        # the pool of output file handles. the lines are written as bytes
+        self.files: BinFilePool = BinFilePool(max_open_files, binary=True)
+
+        # the header line written at the top of each new file
+        self.header: bytes = b''
+
+        # the output file path for each bin key
+        self._paths: dict = {}
+
+        # the buffered lines and their size for each bin key. bin key: [lines, bytes]
+        self._buffers: dict = {}
+
+        # the number of bytes buffered for all bins
+        self._buffered: int = 0
+
+        # the usage counters
+        self.rows: int = 0
+        self.writes: int = 0
+
+    def set_header(self, header: bytes) -> None:
+        """
+        sets the header line written to new files. any lines buffered under a different header are written out first.
+
+        :param header:
+        :return:
+        """
+        if header != self.header:
+            self.flush()
+
+            self.header = header
+
+    def write(self, bin_key: str, line: bytes) -> None:
+        """
+        adds a line to a bin.
+
+        :param bin_key:
+        :param line: the raw line, including the line terminator
+        :return:
+        """
+        # get the bin's buffer
+        buffer: list = self._buffers.get(bin_key, None)
+
+        if buffer is None:
+            buffer = self._buffers[bin_key] = [[], 0]
+
+        # save the line
+        buffer[0].append(line)
+        buffer[1] += len(line)
+
+        self._buffered += len(line)
+        self.rows += 1
+
+        # write out the bin if its buffer is full, or all of them if too much is buffered
+        if buffer[1] >= self.bin_buffer_size:
+            self._flush_bin(bin_key)
+        elif self._buffered >= self.max_buffered:
+            self.flush()
+
+    def get_path(self, bin_key: str) -> str:
+        """
+        gets the output file path for a bin key, resolving it once for each key.
+
+        :param bin_key:
+        :return:
+        """
+        # get the path
+        ret_val: str = self._paths.get(bin_key, None)
+
+        # resolve the path if this is a new key
+        if ret_val is None:
+            ret_val = self._paths[bin_key] = self.path_method(bin_key)
+
+        # return to the caller
+        return ret_val
+
+    @property
+    def paths(self) -> dict:
+        """
+        gets the output file path of each bin key written to.
+
+        :return:
+        """
+        return dict(self._paths)
+
+    def _flush_bin(self, bin_key: str) -> None:
+        """
+        writes the lines buffered for a bin to its file.
+
+        :param bin_key:
+        :return:
+        """
+        # remove the bin's buffer
+        lines, size = self._buffers.pop(bin_key)
+
+        self._buffered -= size
+
+        # get the file handle, the file is created or reopened if needed
+        file_handle, is_new = self.files.get(self.get_path(bin_key))
+
+        # write the lines, the header is written when the file is created
+        file_handle.write((self.header if is_new else b'') + b''.join(lines))
+
+        self.writes += 1
+
+    def flush(self) -> None:
+        """
+        writes the lines buffered for all bins to their files.
+
+        :return:
+        """
+        for bin_key in list(self._buffers):
+            self._flush_bin(bin_key)
+
+    def get_stats(self) -> dict:
+        """
+        gets the usage counters.
+
+        :return:
+        """
+        return {'rows': self.rows, 'writes': self.writes} | self.files.get_stats()
+
+    def close(self) -> None:
+        """
+        writes out any buffered lines and closes all the files.
+
+        :return:
+        """
+        try:
+            self.flush()
+        finally:
+            self.files.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def merge_files(out_file: str, in_files: list, remove: bool = True) -> None:
+        """
+        concatenates CSV files that have the same header into a single file. the header is kept from the first file only.
+
+        :param out_file:
+        :param in_files:
+        :param remove: remove the input files once they are merged
+        :return:
+        """
+        with open(out_file, 'wb') as out_fh:
+            for index, in_file in enumerate(in_files):
+                with open(in_file, 'rb') as in_fh:
+                    # skip the header of all but the first file
+                    if index > 0:
+                        in_fh.readline()
+
+                    # copy the data
+                    shutil.copyfileobj(in_fh, out_fh, 1024 * 1024)
+
+        # remove the merged files
+        if remove:
+            for in_file in in_files:
+                os.remove(in_file)
+
+    @staticmethod
+    def read_records(file):
+        """
+        reads the CSV records in a file opened in binary mode.
+
+        a record whose quoted field holds a line break spans several lines, these are joined back into a single record.
+
+        :param file:
+        :return:
+        """
+        # init the record being joined
+        record: bytes = b''
+
+        for line in file:
+            record += line
+
+            # the record is complete when its quotes are balanced. escaped quotes ("") do not change the balance
+            if record.count(b'"') % 2 == 0:
+                yield record
+
+                record = b''
+
+        # return any unterminated record at the end of the file
+        if record:
+            yield record
+
+    @staticmethod
+    def get_leading_fields(record: bytes, count: int) -> list:
+        """
+        gets the first fields of a CSV record without parsing the rest of it.
+
+        :param record:
+        :param count: the number of fields to get
+        :return: the field values as text
+        """
+        # split off the fields, this is all that is needed when none of them are quoted
+        parts: list = record.split(b',', count)[:count]
+
+        if b'"' not in b''.join(parts):
+            # remove the line terminator from the last field and pad out a short record
+            parts[-1] = parts[-1].rstrip(b'\r\n')
+            parts += [b''] * (count - len(parts))
+
+            return [part.decode('utf-8') for part in parts]
+
+        # init the return value
+        ret_val: list = []
+
+        # the position of the next field
+        pos: int = 0
+
+        while len(ret_val) < count:
+            if record.startswith(b'"', pos):
+                # init the parts of the quoted value
+                parts: list = []
+
+                # the start of the text after the opening quote
+                start: int = pos + 1
+
+                while True:
+                    # find the next quote
+                    end: int = record.find(b'"', start)
+
+                    if end == -1:
+                        raise ValueError('Unterminated quoted field in CSV record.')
+
+                    parts.append(record[start:end])
+
+                    # a doubled quote is an escaped quote in the value, anything else ends the value
+                    if record.startswith(b'"', end + 1):
+                        parts.append(b'"')
+                        start = end + 2
+                    else:
+                        break
+
+                ret_val.append(b''.join(parts).decode('utf-8'))
+
+                # skip the closing quote and the delimiter
+                pos = end + 2
+            else:
+                # find the end of the field
+                end: int = record.find(b',', pos)
+
+                if end == -1:
+                    end = len(record)
+
+                ret_val.append(record[pos:end].rstrip(b'\r\n').decode('utf-8'))
+
+                # skip the delimiter
+                pos = end + 1
+
+        # return to the caller
+        return ret_val
+
+    @staticmethod
+    def get_field_offset(record: bytes, count: int) -> int:
+        """
+        gets the offset of a field in a CSV record without parsing the rest of it. e.g. to replace the leading fields.
+
+        :param record:
+        :param count: the number of fields before the field
+        :return: the offset of the first byte of the field, the record length if the record has fewer fields
+        """
+        # init the return value
+        ret_val: int = 0
+
+        for _ in range(count):
+            if record.startswith(b'"', ret_val):
+                # find the closing quote, a doubled quote is an escaped quote in the value
+                end: int = ret_val + 1
+
+                while True:
+                    end = record.find(b'"', end)
+
+                    if end == -1:
+                        raise ValueError('Unterminated quoted field in CSV record.')
+
+                    if record.startswith(b'"', end + 1):
+                        end += 2
+                    else:
+                        break
+
+                # skip the closing quote and the delimiter
+                ret_val = end + 2
+            else:
+                # find the end of the field
+                end: int = record.find(b',', ret_val)
+
+                if end == -1:
+                    return len(record)
+
+                # skip the delimiter
+                ret_val = end + 1
+
+        # return to the caller
+        return min(ret_val, len(record))
@@ -0,0 +1,312 @@
+"""
+    Data conversion utilities.
+
+    these methods operate on whole pandas columns at once so that the
+    per-cell python calls of the original apply() lambdas are avoided.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from contextlib import nullcontext, contextmanager
+from pandas.api.types import is_bool_dtype, is_integer_dtype, is_numeric_dtype
+from common.csv_ranges import CSVRange, CSVRanges
+
+# the arrow backed string type is used for the string operations
+string_dtype: str = 'string[pyarrow]'
+
+
+class ConvertUtils:
+    """
+        Methods to reformat RK data columns into their Kuzu compatible equivalent.
+    """
+    # the estimated ratio of in-memory data frame size to CSV text size. this accounts for
+    # the python string objects and the copies made while a chunk is being converted.
+    memory_expansion_factor: int = 10
+
+    # the number of lines used to estimate the size of a row
+    sample_line_count: int = 1000
+
+    # the supported output file formats
+    output_formats: list = ['csv', 'parquet']
+
+    @staticmethod
+    def convert_csv_file(inf: str | CSVRange, out_file: str, convert_method, file_type: str, chunk_size: int = None, dtypes: dict = None,
+                         output_format: str = 'csv') -> int:
+        """
+        reads a CSV file, converts the data with the method passed and writes the result to the output file.
+
+        if a chunk size is passed the file is streamed in chunks of that many rows and each converted chunk
+        is appended to the output file. in that case the list columns should be given a text data type so that
+        the data type inferred for one chunk does not differ from another.
+
+        :param inf: the file path or a byte range of a file
+        :param out_file:
+        :param convert_method: a method that takes a data frame and the file type and returns the converted data frame
+        :param file_type:
+        :param chunk_size:
+        :param dtypes: the column data types to read the data with. columns not specified are inferred
+        :param output_format: csv or parquet
+        :return: the number of rows converted
+        """
+        # init the row counter
+        ret_val: int = 0
+
+        # init the parquet file writer
+        parquet_writer = None
+
+        def write_frame(df: pd.DataFrame, header: bool):
+            """
+            writes a converted data frame to the output file. the header flag only applies to CSV files.
+            """
+            nonlocal parquet_writer
+
+            if output_format == 'parquet':
+                # get the data in an arrow table
+                table: pa.Table = ConvertUtils.to_arrow_table(df)
+
+                # create the file on the first write, make any others match its schema
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(out_file, table.schema)
+                else:
+                    table = table.cast(parquet_writer.schema)
+
+                parquet_writer.write_table(table)
+            else:
+                df.to_csv(out_fh, index=False, header=header)
+
+        try:
+            with ConvertUtils.read_csv_chunks(inf, chunk_size, dtypes) as chunks, open(out_file, 'w', newline='', encoding='utf-8') if output_format == 'csv' else nullcontext() as out_fh:
+                # init the flag that indicates the header was written
+                header_written: bool = False
+
+                # for each chunk of data
+                for chunk in chunks:
+                    # convert the chunk and append it to the output file. the header is written with the first chunk only
+                    write_frame(convert_method(chunk, file_type), not header_written)
+
+                    # add to the number of rows converted
+                    ret_val += len(chunk)
+
+                    header_written = True
+
+                # if the file had no data write out the header
+                if not header_written:
+                    with CSVRanges.open(inf) as in_fh:
+                        write_frame(convert_method(pd.read_csv(in_fh, dtype=dtypes, nrows=0), file_type), True)
+        finally:
+            # close the parquet file
+            if parquet_writer is not None:
+                parquet_writer.close()
+
+        # return the number of rows converted
+        return ret_val
+
+    @staticmethod
+    @contextmanager
+    def read_csv_chunks(inf: str | CSVRange, chunk_size: int = None, dtypes: dict = None):
+        """
+        gets a CSV file reader that is used as a context manager and iterated for the data frames in the file.
+
+        if a chunk size is passed the file is streamed in chunks of that many rows, otherwise the whole file is a single chunk.
+
+        :param inf: the file path or a byte range of a file
+        :param chunk_size:
+        :param dtypes: the column data types to read the data with. columns not specified are inferred
+        :return:
+        """
+        # a range is read through its own file handle
+        with inf.open() if isinstance(inf, CSVRange) else nullcontext(inf) as source:
+            if chunk_size:
+                with pd.read_csv(source, dtype=dtypes, chunksize=chunk_size) as reader:
+                    yield reader
+            else:
+                yield [pd.read_csv(source, low_memory=False, dtype=dtypes)]
+
+    @staticmethod
+    def to_arrow_table(df: pd.DataFrame) -> pa.Table:
+        """
+        gets a converted data frame as an arrow table.
+
+        columns without any data are made text so that the schema is the same from chunk to chunk.
+
+        :param df:
+        :return:
+        """
+        # get the table
+        table: pa.Table = pa.Table.from_pandas(df, preserve_index=False)
+
+        # init the list of output fields
+        fields: list = []
+
+        for field in table.schema:
+            # make the untyped columns text
+            if pa.types.is_null(field.type):
+                field = pa.field(field.name, pa.string())
+            # categorical columns are decoded as their dictionary may change from chunk to chunk
+            elif pa.types.is_dictionary(field.type):
+                field = pa.field(field.name, field.type.value_type)
+
+            fields.append(field)
+
+        # return the table with the new schema
+        return table.cast(pa.schema(fields))
+
+    @staticmethod
+    def to_list_array_column(col: pd.Series, array_split_char: str = ';', numeric: bool = False) -> pd.Series:
+        """
+        turns a character separated string column into a native list column. e.g: "a;b;c" -> ['a', 'b', 'c'].
+
+        this is the parquet equivalent of format_list_column(). empty cells become empty lists and
+        single quotes are replaced with back ticks.
+
+        :param col:
+        :param array_split_char:
+        :param numeric: make the list items floats
+        :return:
+        """
+        # get the text of each cell, empty cells are null
+        values: pa.Array = pa.array(col.astype(str).where(col.notna(), None).to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+
+        # replace the quotes and split the values into lists
+        lists: pa.Array = pc.split_pattern(pc.replace_substring(values, '\'', '`'), array_split_char)
+
+        # the empty cells become empty lists
+        lists = pc.fill_null(lists, pa.scalar([], type=pa.list_(pa.string())))
+
+        # convert the list items to numbers if requested
+        if numeric:
+            try:
+                lists = pc.cast(lists, pa.list_(pa.float64()))
+            except pa.ArrowInvalid:
+                # leave the items as text if any are not numbers
+                pass
+
+        # return the lists in a column
+        return pd.Series(pd.arrays.ArrowExtensionArray(lists), index=col.index)
+
+    @staticmethod
+    def to_int_column(col: pd.Series) -> pd.Series:
+        """
+        turns a column of numbers into a native nullable integer column. e.g: 3.0 -> 3.
+
+        this is the parquet equivalent of format_int_column().
+
+        :param col:
+        :return:
+        """
+        # integer and boolean data can be used as is
+        if is_integer_dtype(col) or is_bool_dtype(col):
+            return col.astype('Int64')
+
+        # truncate the numbers like int() does
+        return np.trunc(pd.to_numeric(col)).astype('Int64')
+
+    @staticmethod
+    def get_chunk_size(inf: str | CSVRange, memory_budget: int = None) -> int | None:
+        """
+        estimates the number of rows that can be converted at one time within a memory budget.
+
+        :param inf:
+        :param memory_budget: the memory budget in MB
+        :return: the number of rows or None if there is no memory budget
+        """
+        # nothing to do if there is no budget
+        if not memory_budget:
+            return None
+
+        # init the byte and line counters
+        byte_count: int = 0
+        line_count: int = 0
+
+        # get the size of the first set of data lines in the file
+        with CSVRanges.open(inf) as in_file:
+            # skip the header
+            in_file.readline()
+
+            for line in in_file:
+                byte_count += len(line)
+                line_count += 1
+
+                # stop when there are enough samples
+                if line_count >= ConvertUtils.sample_line_count:
+                    break
+
+        # if there were no data lines any chunk size will do
+        if line_count == 0:
+            return ConvertUtils.sample_line_count
+
+        # get the average size of a row
+        row_size: float = byte_count / line_count
+
+        # return the number of rows that fit in the budget. keep it sensible in case of a tiny budget
+        return max(ConvertUtils.sample_line_count, int(memory_budget * 1024 * 1024 / (row_size * ConvertUtils.memory_expansion_factor)))
+
+    @staticmethod
+    def format_list_column(col: pd.Series, array_split_char: str = ';') -> pd.Series:
+        """
+        turns a character separated string column into Kuzu list strings. e.g: "a;b;c" -> "[a,b,c]".
+
+        empty cells become "[]" and single quotes are replaced with back ticks.
+        the output matches what the original per-cell lambda produced.
+
+        :param col:
+        :param array_split_char:
+        :return:
+        """
+        # init the return value with the empty list value
+        ret_val: pd.Series = pd.Series('[]', index=col.index, dtype=object)
+
+        # get the cells that have data
+        mask = col.notna()
+
+        # nothing else to do if the column is empty
+        if not mask.any():
+            return ret_val
+
+        # get the string representation of the data. this also handles numeric and boolean columns
+        values = col[mask].astype(str).astype(string_dtype)
+
+        # replace the quotes and the array separators
+        values = values.str.replace('\'', '`', regex=False).str.replace(array_split_char, ',', regex=False)
+
+        # wrap the values in brackets and save them
+        ret_val[mask] = ('[' + values + ']').astype(object)
+
+        # return to the caller
+        return ret_val
+
+    @staticmethod
+    def format_int_column(col: pd.Series) -> pd.Series:
+        """
+        turns a column of numbers into integer strings. e.g: 3.0 -> "3".
+
+        empty cells are left untouched.
+
+        :param col:
+        :return:
+        """
+        # get the cells that have data
+        mask = col.notna()
+
+        # nothing to do if the column is empty
+        if not mask.any():
+            return col
+
+        # get the values that need converting
+        values = col[mask]
+
+        # init the return value
+        ret_val: pd.Series = col.astype(object)
+
+        # use the vectorized cast when the numbers are sure to fit into an int64
+        if is_numeric_dtype(values) and not is_bool_dtype(values) and values.abs().max() < 2 ** 63:
+            ret_val[mask] = values.astype('int64').astype(str)
+        else:
+            # fall back to the python conversion
+            ret_val[mask] = values.map(lambda x: str(int(x)))
+
+        # return to the caller
+        return ret_val
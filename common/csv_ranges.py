@@ -0,0 +1,229 @@
+"""
+    CSV byte ranges.
+
+    divides a single large CSV file (e.g. rk-nodes.csv, rk-edges.csv) into byte ranges that end on record boundaries, so that
+    the ranges can be parsed independently by worker processes without splitting the file first. each range is read as a
+    CSV file of its own: the header line of the file followed by the records in the range.
+
+    a quoted field may hold a line break, so a line end is only a record end when the quotes before it are balanced. the
+    quotes are counted in a single sequential pass over the file to find the boundaries.
+"""
+
+import io
+import os
+
+
+class CSVRange:
+    """
+        A record aligned byte range of a CSV file.
+    """
+    def __init__(self, file_path: str, number: int, start: int, end: int, header: bytes):
+        """
+        init the range
+
+        :param file_path: the CSV file
+        :param number: the range number, starting at 1
+        :param start: the offset of the first byte of the range
+        :param end: the offset after the last byte of the range
+        :param header: the header line of the file
+        """
+        self.file_path: str = file_path
+        self.number: int = number
+        self.start: int = start
+        self.end: int = end
+        self.header: bytes = header
+
+    @property
+    def size(self) -> int:
+        """
+        gets the number of data bytes in the range.
+
+        :return:
+        """
+        return self.end - self.start
+
+    def open(self) -> io.BufferedReader:
+        """
+        opens the range for reading in binary mode. the header line is read first.
+
+        :return:
+        """
+        return io.BufferedReader(CSVRangeReader(self), CSVRanges.read_size)
+
+    def __str__(self) -> str:
+        return f'{self.file_path} range {self.number} (bytes {self.start:,}-{self.end:,})'
+
+
+class CSVRangeReader(io.RawIOBase):
+    """
+        Reads the header line and the bytes of a range as a single stream.
+    """
+    def __init__(self, csv_range: CSVRange):
+        """
+        init the reader
+
+        :param csv_range:
+        """
+        super().__init__()
+
+        # the header bytes still to be read
+        self._header: bytes = csv_range.header
+
+        # the number of range bytes still to be read
+        self._remaining: int = csv_range.size
+
+        self._file_handle = open(csv_range.file_path, 'rb', buffering=0)
+        self._file_handle.seek(csv_range.start)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        """
+        reads the next bytes of the header and then the range into the buffer.
+
+        :param buffer:
+        :return: the number of bytes read, 0 at the end of the range
+        """
+        # read the header first
+        if self._header:
+            ret_val: int = min(len(buffer), len(self._header))
+
+            buffer[:ret_val] = self._header[:ret_val]
+
+            self._header = self._header[ret_val:]
+
+            return ret_val
+
+        # stop at the end of the range
+        if self._remaining <= 0:
+            return 0
+
+        # read from the file, no further than the end of the range
+        with memoryview(buffer) as view:
+            ret_val: int = self._file_handle.readinto(view[:min(len(buffer), self._remaining)]) or 0
+
+        self._remaining -= ret_val
+
+        # return to the caller
+        return ret_val
+
+    def close(self) -> None:
+        if not self.closed:
+            self._file_handle.close()
+
+        super().close()
+
+
+class CSVRanges:
+    """
+        Methods to divide a CSV file into record aligned byte ranges and read them.
+    """
+    # the default size of a range in bytes
+    default_range_size: int = 512 * 1024 * 1024
+
+    # the number of bytes read at a time
+    read_size: int = 8 * 1024 * 1024
+
+    @staticmethod
+    def get_ranges(file_path: str, count: int = None, range_size: int = None) -> list:
+        """
+        divides a CSV file into ranges that end on record boundaries.
+
+        :param file_path:
+        :param count: the minimum number of ranges, e.g. the number of workers
+        :param range_size: the largest range size in bytes wanted. the actual ranges end on the first record end after this
+        :return: the ranges in file order. a file with no data has no ranges
+        """
+        # get the size of the file
+        file_size: int = os.path.getsize(file_path)
+
+        # init the range boundaries
+        boundaries: list = []
+
+        with open(file_path, 'rb') as in_fh:
+            # get the header line, the first range starts after it
+            header: bytes = in_fh.readline()
+
+            position: int = in_fh.tell()
+
+            boundaries.append(position)
+
+            # get the number of ranges, enough to keep the ranges within the range size and occupy the requested number of workers
+            data_size: int = file_size - position
+
+            range_count: int = max(count or 1, -(-data_size // (range_size or CSVRanges.default_range_size)), 1)
+
+            # init the number of quotes since the last boundary
+            quotes: int = 0
+
+            for number in range(1, range_count):
+                # get the offset the range would end at if records did not matter
+                target: int = boundaries[0] + data_size * number // range_count
+
+                # count the quotes up to the target
+                while position < target:
+                    block: bytes = in_fh.read(min(CSVRanges.read_size, target - position))
+
+                    if not block:
+                        break
+
+                    quotes += block.count(b'"')
+                    position += len(block)
+
+                # move on to the first line end where the quotes are balanced, that is the end of a record
+                while True:
+                    line: bytes = in_fh.readline()
+
+                    if not line:
+                        break
+
+                    quotes += line.count(b'"')
+                    position += len(line)
+
+                    if quotes % 2 == 0:
+                        break
+
+                # the rest of the file is in the last range
+                if position >= file_size:
+                    break
+
+                # save the boundary, the quotes are balanced here
+                if position > boundaries[-1]:
+                    boundaries.append(position)
+
+                quotes = 0
+
+        # the last range ends at the end of the file
+        if file_size > boundaries[-1]:
+            boundaries.append(file_size)
+
+        # return the ranges
+        return [CSVRange(file_path, number, start, end, header) for number, (start, end) in enumerate(zip(boundaries, boundaries[1:]), start=1)]
+
+    @staticmethod
+    def open(inf, mode: str = 'rb'):
+        """
+        opens a CSV file or range for reading.
+
+        :param inf: a file path or a range
+        :param mode: rb or r
+        :return:
+        """
+        if isinstance(inf, CSVRange):
+            return inf.open() if mode == 'rb' else io.TextIOWrapper(inf.open(), encoding='utf-8', newline='')
+
+        return open(inf, mode)
+
+    @staticmethod
+    def get_size(inf) -> int:
+        """
+        gets the size of a CSV file or range, 0 if the file does not exist.
+
+        :param inf: a file path or a range
+        :return:
+        """
+        if isinstance(inf, CSVRange):
+            return inf.size
+
+        return os.path.getsize(inf) if os.path.exists(inf) else 0
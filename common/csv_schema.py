@@ -0,0 +1,102 @@
+"""
+    CSV header schema.
+
+    parses the ORION tab delimited header line (e.g. rk-nodes.tab-hdr.temp_csv) whose columns are in
+    the format <data name>:<data type> and provides the pandas data types used to read the CSV data.
+"""
+
+import re
+
+
+class CSVHeaderSchema:
+    """
+        The column names and data types declared in an ORION CSV header.
+    """
+    # the pandas data type to use when reading each ORION data type.
+    # list types are read as text as they are reformatted during conversion.
+    read_dtypes: dict = {'ID': str, 'START_ID': str, 'END_ID': str, 'string': str, 'TYPE': 'category', 'LABEL': str, 'string[]': str,
+                         'float[]': str, 'int': 'Int64', 'float': 'float64', 'boolean': 'boolean'}
+
+    def __init__(self, columns: list):
+        """
+        init the schema
+
+        :param columns: the list of (column name, data type) tuples in header order
+        """
+        self.columns: list = columns
+
+    @classmethod
+    def from_file(cls, header_file: str):
+        """
+        creates the schema from the first line of a tab delimited header file.
+
+        :param header_file:
+        :return:
+        """
+        with open(header_file, 'r', encoding='utf-8') as in_file:
+            # get the header line
+            line: str = in_file.readline()
+
+        # init the list of columns
+        columns: list = []
+
+        # split the column header by the tab delimiter
+        for col in line.split('\t'):
+            # get the column name and data type
+            col_items = col.strip().split(':')
+
+            # skip anything that is not a typed column
+            if len(col_items) < 2:
+                continue
+
+            # save the column. note the column name itself may contain a colon
+            columns.append((':'.join(col_items[0: -1]), col_items[-1]))
+
+        # return the new schema
+        return cls(columns)
+
+    @staticmethod
+    def clean_column_name(column_name: str) -> str:
+        """
+        gets the column name with the characters that are not allowed in the DB replaced with underscores.
+
+        :param column_name:
+        :return:
+        """
+        return re.sub(r'[^A-Za-z0-9_]', '_', column_name)
+
+    def get_columns_by_type(self, *data_types) -> list:
+        """
+        gets the names of the columns that have any of the data types passed.
+
+        :param data_types:
+        :return:
+        """
+        return [name for name, data_type in self.columns if data_type in data_types]
+
+    def get_read_dtypes(self, category_cols: list = None) -> dict:
+        """
+        gets the dict of column name to pandas data type for use with pd.read_csv(dtype=...).
+
+        the CSV data may use either the original or the cleaned up column names, so both are included.
+
+        :param category_cols: low cardinality string columns to read as categoricals
+        :return:
+        """
+        # init the return value
+        ret_val: dict = {}
+
+        for name, data_type in self.columns:
+            # get the pandas data type, default to text for anything not recognised
+            dtype = self.read_dtypes.get(data_type, str)
+
+            # use a categorical for low cardinality string columns
+            if category_cols and name in category_cols and data_type == 'string':
+                dtype = 'category'
+
+            # save the type for both versions of the column name
+            ret_val[name] = dtype
+            ret_val[self.clean_column_name(name)] = dtype
+
+        # return to the caller
+        return ret_val
@@ -0,0 +1,220 @@
+"""
+    CSV splitter.
+
+    splits a large CSV file (e.g. rk-nodes.csv, rk-edges.csv) into numbered part files (rk-nodes-pt1.csv, rk-nodes-pt2.csv, ...)
+    in a single pass over the source. each part file starts with the header line, and a part never ends inside a quoted field
+    that holds a line break.
+
+    this replaces the create_split_*_csv_files.sh scripts, which read the whole source file again for every part file.
+
+    command line (from the repo root):
+        python -m common.csv_splitter --infile=rk-edges.csv --data-dir=/database/graph-eval --outfile=rk-edges-pt --rows=6000000
+"""
+
+import os
+import gzip
+import time
+import argparse
+from itertools import islice
+from common.logger import LoggingUtil
+from common.part_files import PartFiles
+
+
+class CSVSplitter:
+    """
+        Splits a CSV file into numbered part files by row count or size.
+    """
+    # the supported output compression types
+    compression_types: list = ['none', 'gzip']
+
+    # the gzip compression level. a low level keeps the compression from slowing the split down
+    compress_level: int = 1
+
+    # the number of lines read and written at a time
+    batch_lines: int = 100000
+
+    # the number of bytes buffered for the source and part files
+    buffer_size: int = 8 * 1024 * 1024
+
+    def __init__(self, in_file: str, out_prefix: str, rows: int = None, size: int = None, compression: str = 'none', header_file: str = None):
+        """
+        init the splitter
+
+        :param in_file: the CSV file to split. its first line is the header
+        :param out_prefix: the part file path up to the file number. e.g. /data/rk-edges-pt
+        :param rows: the number of lines in each part file, not counting the header
+        :param size: the number of bytes in each part file. a part ends on the first record end at or after this size
+        :param compression: the compression of the part files, none or gzip
+        :param header_file: a file holding the header line written to the part files, instead of the header of the source file
+        """
+        if bool(rows) == bool(size):
+            raise ValueError('Specify either the number of rows or the size of the part files.')
+
+        if compression not in self.compression_types:
+            raise ValueError(f'Unsupported compression type {compression}.')
+
+        self.in_file: str = in_file
+        self.out_prefix: str = out_prefix
+        self.rows: int = rows
+        self.size: int = size
+        self.compression: str = compression
+        self.header_file: str = header_file
+
+        # the extension of the part files
+        self.extension: str = 'csv.gz' if compression == 'gzip' else 'csv'
+
+    def get_path(self, number: int) -> str:
+        """
+        gets the path of a part file.
+
+        :param number:
+        :return:
+        """
+        # done so this works in both a windows and linux environment
+        return str(self.out_prefix + str(number) + '.' + self.extension).replace('\\', '/')
+
+    def open_part(self, number: int):
+        """
+        opens a part file for writing.
+
+        :param number:
+        :return:
+        """
+        if self.compression == 'gzip':
+            return gzip.open(self.get_path(number), 'wb', compresslevel=self.compress_level)
+
+        return open(self.get_path(number), 'wb', buffering=self.buffer_size)
+
+    def split(self) -> list:
+        """
+        splits the source file into the part files. the part files with higher numbers left by an earlier split are removed.
+
+        :return: the (file path, lines, bytes) of each part file written
+        """
+        # init the return value
+        ret_val: list = []
+
+        with open(self.in_file, 'rb', buffering=self.buffer_size) as in_fh:
+            # get the header line of the source
+            header: bytes = in_fh.readline()
+
+            # use the header from the header file if there is one
+            if self.header_file:
+                with open(self.header_file, 'rb') as header_fh:
+                    header = header_fh.readline()
+
+            # make sure the header ends the line
+            if header and not header.endswith(b'\n'):
+                header += b'\n'
+
+            # write the part files until the source runs out
+            while True:
+                lines, size = self.split_part(in_fh, len(ret_val) + 1, header)
+
+                if not lines:
+                    break
+
+                ret_val.append((self.get_path(len(ret_val) + 1), lines, size))
+
+        # remove the part files from an earlier split into more parts, they would otherwise be loaded with the new parts
+        for number, file_path in PartFiles.find(os.path.dirname(self.out_prefix) or '.', os.path.basename(self.out_prefix), self.extension):
+            if number > len(ret_val):
+                os.remove(file_path)
+
+        # return to the caller
+        return ret_val
+
+    def split_part(self, in_fh, number: int, header: bytes) -> (int, int):
+        """
+        writes the next part file from the source.
+
+        :param in_fh: the source file, positioned at the start of the next part
+        :param number: the part file number
+        :param header: the header line
+        :return: the number of lines and bytes written, nothing is written if the source is at its end
+        """
+        # init the lines and bytes written and the number of quotes in them
+        lines: int = 0
+        size: int = 0
+        quotes: int = 0
+
+        out_fh = None
+
+        try:
+            # write batches of lines until the part is full
+            while (lines < self.rows) if self.rows else (size < self.size):
+                # get the next batch of lines. readlines() stops on the first line end at or after the size hint
+                if self.rows:
+                    batch: list = list(islice(in_fh, min(self.batch_lines, self.rows - lines)))
+                else:
+                    batch: list = in_fh.readlines(self.size - size)
+
+                if not batch:
+                    break
+
+                data: bytes = b''.join(batch)
+
+                # open the part file on its first data
+                if out_fh is None:
+                    out_fh = self.open_part(number)
+                    out_fh.write(header)
+
+                out_fh.write(data)
+
+                lines += len(batch)
+                size += len(data)
+                quotes += data.count(b'"')
+
+            # a part never ends inside a quoted field, the quotes are only balanced when the last record is complete
+            while quotes % 2:
+                line: bytes = in_fh.readline()
+
+                if not line:
+                    break
+
+                out_fh.write(line)
+
+                lines += 1
+                size += len(line)
+                quotes += line.count(b'"')
+        finally:
+            if out_fh is not None:
+                out_fh.close()
+
+        # return to the caller
+        return lines, size
+
+
+if __name__ == "__main__":
+    # get the log level and directory from the environment.
+    log_level, log_path = LoggingUtil.prep_for_logging()
+
+    # create a logger
+    logger = LoggingUtil.init_logging("csv_splitter", level=log_level, line_format='medium', log_file_path=log_path)
+
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('--infile', dest='infile', type=str, help='CSV file to split, e.g. rk-edges.csv')
+    parser.add_argument('--data-dir', dest='data_dir', type=str, help='Data directory')
+    parser.add_argument('--outfile', dest='outfile', type=str, help='Part file name up to the file number, e.g. rk-edges-pt')
+    parser.add_argument('--rows', dest='rows', type=int, default=None, help='Number of rows in each part file')
+    parser.add_argument('--size', dest='size', type=int, default=None, help='Size of each part file in MB')
+    parser.add_argument('--compress', dest='compress', type=str, default='none', choices=CSVSplitter.compression_types,
+                        help='Compression of the part files')
+    parser.add_argument('--header-file', dest='header_file', type=str, default=None,
+                        help='File in the data directory holding the header line of the part files, e.g. rk-edge-header-cols.csv')
+
+    args = parser.parse_args()
+
+    splitter: CSVSplitter = CSVSplitter(os.path.join(args.data_dir, args.infile), os.path.join(args.data_dir, args.outfile), args.rows,
+                                        args.size * 1024 * 1024 if args.size else None, args.compress,
+                                        os.path.join(args.data_dir, args.header_file) if args.header_file else None)
+
+    start_time: float = time.perf_counter()
+
+    parts: list = splitter.split()
+
+    for part_file, part_lines, part_size in parts:
+        logger.debug('%s: %s lines, %s bytes', part_file, f'{part_lines:,}', f'{part_size:,}')
+
+    logger.debug('Split %s into %s part files in %.2fs.', args.infile, len(parts), time.perf_counter() - start_time)
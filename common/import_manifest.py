@@ -0,0 +1,174 @@
+"""
+    Import manifest.
+
+    records each completed load statement (the files loaded with their size, modification time and checksum, the rows
+    loaded and the duration) in a JSON lines file next to the DB. an entry is appended as soon as a statement completes,
+    so a restarted import can skip the statements that already completed and continue from the first unfinished one.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import Counter
+
+
+class ImportManifest:
+    """
+        Records the completed load statements of an import.
+    """
+    # the number of bytes read at a time when computing a checksum
+    read_size: int = 8 * 1024 * 1024
+
+    def __init__(self, manifest_file: str):
+        """
+        init the manifest, loading any entries already recorded
+
+        :param manifest_file:
+        """
+        self.manifest_file: str = manifest_file
+
+        # the recorded entries by job name. a later entry for a name replaces an earlier one
+        self.entries: dict = {}
+
+        # appends from the worker threads are serialized
+        self._lock = threading.Lock()
+
+        if os.path.exists(manifest_file):
+            with open(manifest_file, 'r', encoding='utf-8') as in_fh:
+                for line in in_fh:
+                    # skip blank lines and a line cut short by a crash
+                    try:
+                        entry: dict = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    self.entries[entry['name']] = entry
+
+    @staticmethod
+    def get_checksum(in_file: str) -> str:
+        """
+        gets the checksum of a file.
+
+        :param in_file:
+        :return:
+        """
+        # init the hash
+        ret_val = hashlib.blake2b(digest_size=16)
+
+        with open(in_file, 'rb') as in_fh:
+            for block in iter(lambda: in_fh.read(ImportManifest.read_size), b''):
+                ret_val.update(block)
+
+        # return to the caller
+        return ret_val.hexdigest()
+
+    @staticmethod
+    def get_file_info(in_file: str, checksum: bool = True) -> dict:
+        """
+        gets the details of a loaded file.
+
+        :param in_file:
+        :param checksum: include the checksum of the file
+        :return:
+        """
+        # get the file details
+        stat = os.stat(in_file)
+
+        ret_val: dict = {'name': in_file, 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+        if checksum:
+            ret_val['checksum'] = ImportManifest.get_checksum(in_file)
+
+        # return to the caller
+        return ret_val
+
+    def is_loaded(self, name: str, in_files: list) -> (bool, str):
+        """
+        checks to see if a job already loaded the same files.
+
+        the size and modification time of each file are compared first, the checksum is only computed if the modification
+        time differs.
+
+        :param name: the job name
+        :param in_files: the files the job loads
+        :return: whether the job is complete and, if not, why
+        """
+        # get the entry for the job
+        entry: dict = self.entries.get(name, None)
+
+        if entry is None:
+            return False, 'not loaded'
+
+        # the job must be loading the same files
+        if [file_info['name'] for file_info in entry['files']] != list(in_files):
+            return False, 'the files to load have changed'
+
+        for file_info in entry['files']:
+            # the file may have been removed
+            if not os.path.exists(file_info['name']):
+                return False, f'{file_info["name"]} no longer exists'
+
+            # get the current details without the checksum
+            current: dict = self.get_file_info(file_info['name'], False)
+
+            if current['size'] != file_info['size']:
+                return False, f'{file_info["name"]} has changed size'
+
+            if current['mtime'] != file_info['mtime'] and self.get_checksum(file_info['name']) != file_info.get('checksum'):
+                return False, f'{file_info["name"]} has changed'
+
+        # return to the caller
+        return True, ''
+
+    def add(self, name: str, table: str, stage: str, in_files: list, rows: int, duration: float) -> None:
+        """
+        records a completed job. the entry is written to the file right away.
+
+        :param name: the job name
+        :param table: the table the data was loaded into
+        :param stage: the kind of job (e.g. nodes or edges)
+        :param in_files: the files loaded
+        :param rows: the number of rows loaded
+        :param duration: the number of seconds the load took
+        :return:
+        """
+        # get the entry, this computes the file checksums
+        entry: dict = {'name': name, 'table': table, 'stage': stage, 'files': [self.get_file_info(in_file) for in_file in in_files], 'rows': rows,
+                       'duration': round(duration, 3), 'completed': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+        with self._lock:
+            self.entries[name] = entry
+
+            # append the entry and make sure it is on disk before the next job starts
+            with open(self.manifest_file, 'a', encoding='utf-8') as out_fh:
+                out_fh.write(json.dumps(entry) + '\n')
+                out_fh.flush()
+                os.fsync(out_fh.fileno())
+
+    def get_table_rows(self) -> Counter:
+        """
+        gets the number of rows loaded into each table.
+
+        :return: the rows for each (stage, table)
+        """
+        # init the return value
+        ret_val: Counter = Counter()
+
+        for entry in self.entries.values():
+            ret_val[(entry['stage'], entry['table'])] += entry['rows']
+
+        # return to the caller
+        return ret_val
+
+    def remove(self) -> None:
+        """
+        removes the manifest file and its entries, e.g. when the DB is recreated.
+
+        :return:
+        """
+        self.entries = {}
+
+        if os.path.exists(self.manifest_file):
+            os.remove(self.manifest_file)
@@ -0,0 +1,308 @@
+"""
+    Import scheduler.
+
+    runs a set of DB load statements (e.g. Kuzu COPY) over a number of connections. a statement is started once the
+    statements it depends on have completed, so the edge data is only loaded after the node tables it connects are loaded.
+
+    the DB may only allow one write transaction at a time. a statement rejected for that reason is retried once the
+    running statements leave room for it, so the scheduler runs as many statements at once as the DB allows.
+
+    a COPY run with IGNORE_ERRORS=true skips the rows it cannot load and reports them as warnings. the warnings are counted
+    and logged as errors, they are rows that are not in the DB.
+"""
+
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class ImportJob:
+    """
+        A load statement and the results of running it.
+    """
+    def __init__(self, name: str, statement: str, depends_on: list = None, size: int = 0, in_files: list = None, stage: str = '',
+                 table: str = ''):
+        """
+        init the job
+
+        :param name: the name of the job, this is used to refer to it in the dependencies of other jobs
+        :param statement: the statement that loads the data
+        :param depends_on: the names of the jobs that must complete first
+        :param size: the size of the data, larger jobs are started first
+        :param in_files: the files the data is loaded from
+        :param stage: a label for the kind of job (e.g. nodes or edges)
+        :param table: the table the data is loaded into
+        """
+        self.name: str = name
+        self.statement: str = statement
+        self.depends_on: list = list(depends_on or [])
+        self.size: int = size
+        self.in_files: list = list(in_files or [])
+        self.stage: str = stage
+        self.table: str = table
+
+        # the results. the status is one of pending, done, failed or skipped
+        self.status: str = 'pending'
+        self.rows: int = 0
+        self.warnings: int = 0
+        self.duration: float = 0.0
+        self.retries: int = 0
+        self.error: str = ''
+
+        # set if the job was completed by an earlier run
+        self.resumed: bool = False
+
+
+class ImportScheduler:
+    """
+        Runs the load statements in dependency order over a pool of connections.
+    """
+    # the text of the error raised when the DB cannot start another write transaction
+    conflict_pattern: re.Pattern = re.compile(r'write transaction', re.IGNORECASE)
+
+    # the text of the COPY results. e.g. "100 tuples have been copied to the X table." and "6 warnings encountered during copy."
+    rows_pattern: re.Pattern = re.compile(r'(\d+) tuples? ha(?:ve|s) been copied', re.IGNORECASE)
+    warnings_pattern: re.Pattern = re.compile(r'(\d+) warnings? encountered', re.IGNORECASE)
+
+    # the number of seconds to wait before retrying a statement rejected because of a write conflict
+    retry_wait: float = 0.5
+
+    def __init__(self, connection_factory, concurrency: int = 1, logger=None, on_done=None):
+        """
+        init the scheduler
+
+        :param connection_factory: a method that returns a new DB connection. each worker thread gets its own
+        :param concurrency: the maximum number of statements run at one time
+        :param logger:
+        :param on_done: an optional method called with each job that completes, in the worker thread that ran it
+        """
+        self.connection_factory = connection_factory
+        self.concurrency: int = max(1, concurrency or 1)
+        self.logger = logger
+        self.on_done = on_done
+
+        # the jobs by name, in the order they were added
+        self.jobs: dict = {}
+
+        # the connection for each worker thread
+        self._local = threading.local()
+
+        # the connections that have been opened
+        self._connections: list = []
+        self._lock = threading.Lock()
+
+    def add(self, job: ImportJob) -> None:
+        """
+        adds a job to the schedule.
+
+        :param job:
+        :return:
+        """
+        self.jobs[job.name] = job
+
+    def run(self) -> list:
+        """
+        runs all the jobs.
+
+        a job whose dependencies failed is skipped. the jobs that are ready to run are started largest first.
+
+        :return: the jobs in the order they were added
+        """
+        # get the jobs waiting to run
+        pending: list = [job for job in self.jobs.values() if job.status == 'pending']
+
+        # init the running jobs. future: job
+        running: dict = {}
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                while pending or running:
+                    # skip the jobs whose dependencies did not complete
+                    for job in [job for job in pending if any(self._get_status(name) in ('failed', 'skipped') for name in job.depends_on)]:
+                        job.status = 'skipped'
+                        job.error = 'a job it depends on did not complete'
+
+                        pending.remove(job)
+
+                        self._log('debug', 'Skipping %s, a job it depends on did not complete.', job.name)
+
+                    # get the jobs whose dependencies are done, largest first
+                    ready: list = sorted([job for job in pending if all(self._get_status(name) == 'done' for name in job.depends_on)],
+                                         key=lambda x: x.size, reverse=True)
+
+                    # start as many as there is room for
+                    for job in ready[:self.concurrency - len(running)]:
+                        pending.remove(job)
+
+                        running[executor.submit(self._run_job, job)] = job
+
+                    # nothing can be started or is running, the remaining jobs depend on jobs that do not exist
+                    if not running:
+                        for job in pending:
+                            job.status = 'skipped'
+                            job.error = 'a job it depends on does not exist'
+
+                            self._log('warning', 'Skipping %s, a job it depends on does not exist.', job.name)
+
+                        break
+
+                    # wait for a job to complete
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        running.pop(future)
+        finally:
+            # close the connections
+            for connection in self._connections:
+                connection.close()
+
+            self._connections = []
+
+        # return the jobs
+        return list(self.jobs.values())
+
+    def _get_status(self, name: str) -> str:
+        """
+        gets the status of a job, or skipped if there is no such job.
+
+        :param name:
+        :return:
+        """
+        job: ImportJob = self.jobs.get(name, None)
+
+        return job.status if job is not None else 'skipped'
+
+    def _get_connection(self):
+        """
+        gets the connection of the current worker thread, opening it if needed.
+
+        :return:
+        """
+        connection = getattr(self._local, 'connection', None)
+
+        if connection is None:
+            connection = self._local.connection = self.connection_factory()
+
+            with self._lock:
+                self._connections.append(connection)
+
+        return connection
+
+    def _run_job(self, job: ImportJob) -> None:
+        """
+        runs a job and saves its results. this is run in the worker threads.
+
+        :param job:
+        :return:
+        """
+        self._log('debug', 'Loading %s from %s file(s) into the database...', job.name, len(job.in_files))
+
+        while True:
+            # get the start time of the attempt
+            start_time: float = time.perf_counter()
+
+            try:
+                # run the statement
+                result = self._get_connection().execute(job.statement)
+
+                # get the number of rows loaded and skipped
+                job.rows, job.warnings = self.get_copy_counts(result)
+                job.status = 'done'
+
+                # the rows skipped by the DB are not loaded
+                if job.warnings:
+                    self._log('error', '%s loaded %s rows, %s rows were skipped with warnings. see CALL show_warnings() RETURN *.', job.name,
+                              job.rows, job.warnings)
+
+                break
+            except Exception as e:
+                # retry the statement if the DB is busy with another write
+                if self.conflict_pattern.search(str(e)):
+                    job.retries += 1
+
+                    time.sleep(self.retry_wait)
+
+                    continue
+
+                job.status = 'failed'
+                job.error = str(e)
+
+                self._log('error', 'Failed to load %s: %s', job.name, e)
+
+                break
+
+        # save the duration of the last attempt
+        job.duration = time.perf_counter() - start_time
+
+        # pass on the completed job
+        if job.status == 'done' and self.on_done is not None:
+            try:
+                self.on_done(job)
+            except Exception as e:
+                self._log('error', 'Failed to record the completion of %s: %s', job.name, e)
+
+    @staticmethod
+    def get_copy_counts(result) -> (int, int):
+        """
+        gets the number of rows loaded and the number of warnings from the result of a COPY statement.
+
+        e.g. "100 tuples have been copied to the X table." and, if rows were skipped, "6 warnings encountered during copy..."
+
+        :param result:
+        :return: the rows loaded and the rows skipped with warnings
+        """
+        # init the return values
+        rows: int = 0
+        warnings: int = 0
+
+        # check each result row for the counts
+        while result is not None and result.has_next():
+            text: str = str(result.get_next()[0])
+
+            for found in ImportScheduler.rows_pattern.finditer(text):
+                rows += int(found.group(1))
+
+            for found in ImportScheduler.warnings_pattern.finditer(text):
+                warnings += int(found.group(1))
+
+        # return to the caller
+        return rows, warnings
+
+    def log_summary(self, title: str) -> None:
+        """
+        logs the results of each job and the totals for each stage.
+
+        :param title:
+        :return:
+        """
+        # get the width of the name column
+        width: int = max([len('job')] + [len(job.name) for job in self.jobs.values()] + [len('total ' + job.stage) for job in self.jobs.values()])
+
+        # build the table
+        lines: list = [f'{"job":<{width}}  {"status":<8}  {"rows":>12}  {"warnings":>9}  {"seconds":>9}  {"retries":>7}']
+
+        for job in self.jobs.values():
+            lines.append(f'{job.name:<{width}}  {"resumed" if job.resumed else job.status:<8}  {job.rows:>12,}  {job.warnings:>9,}  {job.duration:>9.2f}  '
+                         f'{job.retries:>7}')
+
+        # add the totals for each stage
+        for stage in dict.fromkeys(job.stage for job in self.jobs.values()):
+            jobs: list = [job for job in self.jobs.values() if job.stage == stage]
+
+            lines.append(f'{"total " + stage:<{width}}  {sum(job.status == "done" for job in jobs):<8}  {sum(job.rows for job in jobs):>12,}  '
+                         f'{sum(job.warnings for job in jobs):>9,}  {sum(job.duration for job in jobs):>9.2f}  {sum(job.retries for job in jobs):>7}')
+
+        self._log('debug', '%s:\n%s', title, '\n'.join(lines))
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        """
+        logs a message if there is a logger.
+
+        :param level:
+        :param msg:
+        :param args:
+        :return:
+        """
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
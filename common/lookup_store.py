@@ -0,0 +1,211 @@
+"""
+    Lookup store.
+
+    saves the node class index and the edge predicate lookups in a single file whose node arrays are memory mapped when
+    it is loaded, so the stages that use the lookups start without reading or unpickling the whole file.
+
+    file layout:
+        magic (4 bytes), format version (uint32), header length (uint32), JSON header, padding to 8 bytes,
+        node id hashes (uint64[node count]), node class codes (uint8 or uint16[node count])
+
+    the JSON header holds the input files the lookups were built from, the node class names, the array offsets/types,
+    the edge predicate lookups and the edge counts for each predicate/class pair, which are small enough to be read whole.
+    it also records whether the later steps use the dense node keys of the node class index in place of the node ids.
+"""
+
+import os
+import json
+import struct
+import time
+import numpy as np
+from collections import Counter, defaultdict
+from common.node_class_index import NodeClassIndex
+
+
+class LookupStore:
+    """
+        Saves and loads memory mapped node class and edge predicate lookups.
+    """
+    # the first bytes of every lookup store file
+    magic: bytes = b'RKLU'
+
+    # the current file format version. this is incremented whenever the layout changes
+    version: int = 1
+
+    # the packing of the magic, version and header length
+    prefix_format: str = '<4sII'
+
+    @staticmethod
+    def get_file_info(input_files: list) -> list:
+        """
+        gets the name, size and modification time of the input files the lookups were built from.
+
+        :param input_files:
+        :return:
+        """
+        # init the return value
+        ret_val: list = []
+
+        for input_file in input_files:
+            # skip any files that do not exist
+            if not os.path.exists(input_file):
+                continue
+
+            # get the file details
+            stat = os.stat(input_file)
+
+            # save the details
+            ret_val.append({'name': os.path.basename(input_file), 'size': stat.st_size, 'mtime': int(stat.st_mtime)})
+
+        # return to the caller
+        return ret_val
+
+    @staticmethod
+    def save(out_file: str, node_class_lookup: NodeClassIndex, edge_predicate_lookup: dict, input_files: list = None,
+             edge_bin_counts: Counter = None, surrogate_keys: bool = False) -> None:
+        """
+        saves the lookups to a lookup store file.
+
+        :param out_file:
+        :param node_class_lookup:
+        :param edge_predicate_lookup:
+        :param input_files: the paths of the files the lookups were built from
+        :param edge_bin_counts: the number of edges for each (predicate, subject class, object class)
+        :param surrogate_keys: the nodes are keyed by their dense integer keys rather than their ids
+        :return:
+        """
+        # get the node index arrays
+        hashes, codes, classes = node_class_lookup.get_arrays()
+
+        # init the header
+        header: dict = {'version': LookupStore.version, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                        'input_files': LookupStore.get_file_info(input_files or []), 'node_count': len(hashes),
+                        'node_classes': classes, 'code_dtype': codes.dtype.str,
+                        'edge_predicates': {predicate: sorted(class_pairs) for predicate, class_pairs in edge_predicate_lookup.items()},
+                        'edge_bin_counts': [[*key, count] for key, count in sorted((edge_bin_counts or {}).items())],
+                        'surrogate_keys': surrogate_keys}
+
+        # get the size of the header with the offsets of the arrays
+        header_size: int = 0
+
+        # the offsets depend on the header size, so keep going until the size does not change
+        while True:
+            # the arrays start at the next 8 byte boundary after the header
+            header['hashes_offset'] = (struct.calcsize(LookupStore.prefix_format) + header_size + 7) // 8 * 8
+            header['codes_offset'] = header['hashes_offset'] + hashes.nbytes
+
+            # get the header text
+            header_text: bytes = json.dumps(header).encode('utf-8')
+
+            if len(header_text) == header_size:
+                break
+
+            header_size = len(header_text)
+
+        # write the file to a temp name first so that a failure does not leave a partial store
+        temp_file: str = out_file + '.tmp'
+
+        with open(temp_file, 'wb') as out_fh:
+            # write the file prefix and header
+            out_fh.write(struct.pack(LookupStore.prefix_format, LookupStore.magic, LookupStore.version, header_size))
+            out_fh.write(header_text)
+
+            # pad to the start of the arrays
+            out_fh.write(b'\0' * (header['hashes_offset'] - out_fh.tell()))
+
+            # write the arrays
+            out_fh.write(np.ascontiguousarray(hashes, dtype='<u8').tobytes())
+            out_fh.write(np.ascontiguousarray(codes).tobytes())
+
+        # put the file in place
+        os.replace(temp_file, out_file)
+
+    @staticmethod
+    def read_header(in_file: str) -> dict:
+        """
+        reads the header of a lookup store file.
+
+        :param in_file:
+        :return:
+        """
+        with open(in_file, 'rb') as in_fh:
+            # get the file prefix
+            magic, version, header_size = struct.unpack(LookupStore.prefix_format, in_fh.read(struct.calcsize(LookupStore.prefix_format)))
+
+            # make sure this is a file we can read
+            if magic != LookupStore.magic:
+                raise ValueError(f'{in_file} is not a lookup store file.')
+
+            if version != LookupStore.version:
+                raise ValueError(f'{in_file} is lookup store version {version}, version {LookupStore.version} is required.')
+
+            # return the header
+            return json.loads(in_fh.read(header_size).decode('utf-8'))
+
+    @staticmethod
+    def load(in_file: str) -> (NodeClassIndex, defaultdict):
+        """
+        loads the lookups from a lookup store file. the node arrays are memory mapped and paged in as they are used.
+
+        :param in_file:
+        :return: the node class index and the edge predicate lookups
+        """
+        # get the header
+        header: dict = LookupStore.read_header(in_file)
+
+        # get the node count
+        node_count: int = header['node_count']
+
+        # memory map the arrays. a zero length map is not allowed so empty arrays are created in memory
+        if node_count:
+            hashes = np.memmap(in_file, dtype='<u8', mode='r', offset=header['hashes_offset'], shape=(node_count,))
+            codes = np.memmap(in_file, dtype=header['code_dtype'], mode='r', offset=header['codes_offset'], shape=(node_count,))
+        else:
+            hashes = np.empty(0, dtype='<u8')
+            codes = np.empty(0, dtype=header['code_dtype'])
+
+        # get the edge predicate lookups in their original form
+        edge_predicate_lookup: defaultdict = defaultdict(set)
+
+        for predicate, class_pairs in header['edge_predicates'].items():
+            edge_predicate_lookup[predicate] = {tuple(class_pair) for class_pair in class_pairs}
+
+        # return the lookups
+        return NodeClassIndex.from_arrays(hashes, codes, header['node_classes']), edge_predicate_lookup
+
+    @staticmethod
+    def read_edge_bin_counts(in_file: str) -> Counter:
+        """
+        reads the number of edges for each (predicate, subject class, object class) from a lookup store file.
+
+        :param in_file:
+        :return:
+        """
+        return Counter({(predicate, subject_class, object_class): count
+                        for predicate, subject_class, object_class, count in LookupStore.read_header(in_file).get('edge_bin_counts', [])})
+
+    @staticmethod
+    def uses_surrogate_keys(in_file: str) -> bool:
+        """
+        checks to see if the nodes are keyed by their dense integer keys rather than their ids. stores saved before the keys
+        were added use the ids.
+
+        :param in_file:
+        :return:
+        """
+        return LookupStore.read_header(in_file).get('surrogate_keys', False)
+
+    @staticmethod
+    def is_current(in_file: str, input_files: list) -> bool:
+        """
+        checks to see if a lookup store was built from the input files as they are now.
+
+        :param in_file:
+        :param input_files:
+        :return:
+        """
+        try:
+            # compare the recorded input files with the current ones
+            return LookupStore.read_header(in_file)['input_files'] == LookupStore.get_file_info(input_files)
+        except (OSError, ValueError):
+            return False
@@ -0,0 +1,280 @@
+"""
+    Node class index.
+
+    a compact replacement for the node id -> node class dict used to bin the edge data. the node ids are stored as
+    8 byte hashes in a sorted numpy array and the class names are interned to small integer codes, so each node takes
+    9 or 10 bytes rather than the few hundred bytes of a python dict entry with its key and value strings.
+
+    the position of a node id in the sorted array is also a dense integer key for the node (0 to the number of nodes - 1),
+    which can be used in place of the node id string as a DB primary key.
+"""
+
+import hashlib
+import numpy as np
+
+
+class NodeClassIndex:
+    """
+        A node id to node class lookup backed by sorted arrays of node id hashes and class codes.
+
+        the ids themselves are not stored so the index cannot list them. lookups of ids that were never added may
+        match another id if their 64-bit hashes collide, the chance of that is negligible for the sizes used here.
+    """
+    # the size of the node id hashes in bytes
+    hash_size: int = 8
+
+    def __init__(self):
+        """
+        init the index
+        """
+        # the sorted node id hashes and the class code for each
+        self._hashes: np.ndarray = np.empty(0, dtype=np.uint64)
+        self._codes: np.ndarray = np.empty(0, dtype=np.uint8)
+
+        # the interned class names, the code of a class is its position in the list
+        self._classes: list = []
+        self._class_codes: dict = {}
+
+        # the batches of hashes/codes added since the arrays were last sorted
+        self._pending: list = []
+
+    @classmethod
+    def from_dict(cls, node_classes: dict):
+        """
+        creates an index from a dict of node id to node class.
+
+        :param node_classes:
+        :return:
+        """
+        # create the index
+        ret_val = cls()
+
+        # add the data
+        ret_val.update(node_classes.keys(), node_classes.values())
+
+        # return to the caller
+        return ret_val
+
+    @classmethod
+    def from_arrays(cls, hashes: np.ndarray, codes: np.ndarray, classes: list):
+        """
+        creates an index from the arrays of an index that was saved. the arrays may be memory mapped.
+
+        :param hashes: the sorted node id hashes
+        :param codes: the class code for each hash
+        :param classes: the class names in code order
+        :return:
+        """
+        # create the index
+        ret_val = cls()
+
+        # save the data
+        ret_val._hashes = hashes
+        ret_val._codes = codes
+        ret_val._classes = list(classes)
+        ret_val._class_codes = {node_class: code for code, node_class in enumerate(ret_val._classes)}
+
+        # return to the caller
+        return ret_val
+
+    @classmethod
+    def hash_ids(cls, node_ids) -> np.ndarray:
+        """
+        gets the hashes of a list of node ids.
+
+        :param node_ids:
+        :return:
+        """
+        return np.frombuffer(b''.join([hashlib.blake2b(str(node_id).encode('utf-8'), digest_size=cls.hash_size).digest() for node_id in node_ids]),
+                             dtype='<u8').astype(np.uint64)
+
+    @property
+    def classes(self) -> list:
+        """
+        gets the node class names in the index.
+
+        :return:
+        """
+        return list(self._classes)
+
+    def update(self, node_ids, node_classes) -> None:
+        """
+        adds a batch of node ids and their classes to the index. ids already in the index get the new class.
+
+        :param node_ids:
+        :param node_classes:
+        :return:
+        """
+        # get the node classes as a list so they can be indexed
+        node_classes = list(node_classes)
+
+        # nothing to do if there is no data
+        if not node_classes:
+            return
+
+        # intern any new class names
+        for node_class in set(node_classes) - self._class_codes.keys():
+            self._class_codes[node_class] = len(self._classes)
+            self._classes.append(node_class)
+
+        # get the code of each class
+        codes: np.ndarray = np.array([self._class_codes[node_class] for node_class in node_classes], dtype=np.uint16)
+
+        # save the batch, it is sorted into the index when the index is next used
+        self._pending.append((self.hash_ids(node_ids), codes))
+
+    def _sort(self) -> None:
+        """
+        sorts the pending batches of ids into the index.
+
+        :return:
+        """
+        # nothing to do if nothing was added
+        if not self._pending:
+            return
+
+        # put the new data after the current data so that it replaces any earlier class for the same id
+        hashes: np.ndarray = np.concatenate([self._hashes] + [batch[0] for batch in self._pending])
+        codes: np.ndarray = np.concatenate([self._codes.astype(np.uint16)] + [batch[1] for batch in self._pending])
+
+        # sort by the hashes, keeping the order in which duplicates were added
+        order: np.ndarray = np.argsort(hashes, kind='stable')
+
+        hashes = hashes[order]
+        codes = codes[order]
+
+        # keep the last entry for each id
+        keep: np.ndarray = np.append(hashes[1:] != hashes[:-1], True)
+
+        # save the data, using the smallest code type that holds all the classes
+        self._hashes = hashes[keep]
+        self._codes = codes[keep].astype(np.uint8 if len(self._classes) <= 256 else np.uint16)
+
+        self._pending = []
+
+    def _find(self, hashes: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        finds the positions of a set of hashes in the index.
+
+        :param hashes:
+        :return: the positions and whether each hash was found
+        """
+        # sort in any pending data
+        self._sort()
+
+        # nothing can be found in an empty index
+        if len(self._hashes) == 0:
+            return np.zeros(len(hashes), dtype=np.intp), np.zeros(len(hashes), dtype=bool)
+
+        # get where each hash would be in the index, keeping the positions in range
+        positions: np.ndarray = np.minimum(self._hashes.searchsorted(hashes), len(self._hashes) - 1)
+
+        # return the positions and whether the hash is there
+        return positions, self._hashes[positions] == hashes
+
+    def get(self, node_id, default=None):
+        """
+        gets the class of a node id.
+
+        :param node_id:
+        :param default: the value returned if the id is not in the index
+        :return:
+        """
+        # find the id
+        positions, found = self._find(self.hash_ids([node_id]))
+
+        # return the class name if it was found
+        return self._classes[self._codes[positions[0]]] if found[0] else default
+
+    def get_classes(self, node_ids) -> np.ndarray:
+        """
+        gets the classes of a list of node ids. this is much faster than calling get() for each id.
+
+        :param node_ids:
+        :return: an array of the class names, None for ids that are not in the index
+        """
+        # find the ids
+        positions, found = self._find(self.hash_ids(node_ids))
+
+        # return the class names
+        return self._get_class_names(positions, found)
+
+    def get_keys(self, node_ids) -> np.ndarray:
+        """
+        gets the dense integer keys of a list of node ids. the key of an id is its position in the index, the keys stay the same
+        for as long as the index does.
+
+        :param node_ids:
+        :return: an array of the keys, -1 for ids that are not in the index
+        """
+        # find the ids
+        positions, found = self._find(self.hash_ids(node_ids))
+
+        # return the keys
+        return np.where(found, positions, -1).astype(np.int64)
+
+    def get_classes_and_keys(self, node_ids) -> (np.ndarray, np.ndarray):
+        """
+        gets the classes and dense integer keys of a list of node ids, hashing the ids once for both.
+
+        :param node_ids:
+        :return: an array of the class names (None for ids that are not in the index) and an array of the keys (-1 for them)
+        """
+        # find the ids
+        positions, found = self._find(self.hash_ids(node_ids))
+
+        # return the class names and keys
+        return self._get_class_names(positions, found), np.where(found, positions, -1).astype(np.int64)
+
+    def _get_class_names(self, positions: np.ndarray, found: np.ndarray) -> np.ndarray:
+        """
+        gets the class names at a set of positions in the index.
+
+        :param positions:
+        :param found: whether each id was found
+        :return: an array of the class names, None for ids that were not found
+        """
+        # get a lookup of class codes to names with an extra entry for the ids not found
+        class_names: np.ndarray = np.array(self._classes + [None], dtype=object)
+
+        # nothing was found if the index is empty
+        if len(self._codes) == 0:
+            return class_names[np.full(len(found), len(self._classes))]
+
+        # return the class names
+        return class_names[np.where(found, self._codes[positions], len(self._classes))]
+
+    def __getitem__(self, node_id):
+        # get the class
+        ret_val = self.get(node_id)
+
+        if ret_val is None:
+            raise KeyError(node_id)
+
+        return ret_val
+
+    def __contains__(self, node_id) -> bool:
+        return self.get(node_id) is not None
+
+    def __len__(self) -> int:
+        # sort in any pending data
+        self._sort()
+
+        return len(self._hashes)
+
+    def __getstate__(self) -> dict:
+        # sort in any pending data so that only the arrays are saved
+        self._sort()
+
+        return self.__dict__
+
+    def get_arrays(self) -> (np.ndarray, np.ndarray, list):
+        """
+        gets the arrays that make up the index so that they can be saved.
+
+        :return: the sorted node id hashes, the class code for each and the class names in code order
+        """
+        # sort in any pending data
+        self._sort()
+
+        return self._hashes, self._codes, self.classes
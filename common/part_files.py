@@ -0,0 +1,54 @@
+"""
+    Part file discovery.
+
+    finds the numbered part files of a data set (e.g. rk-nodes-pt1.csv, rk-nodes-pt2.csv, ...) in a data directory so that
+    data split into any number of files is processed without a code change.
+"""
+
+import os
+import re
+import glob
+from common.csv_ranges import CSVRanges
+
+
+class PartFiles:
+    """
+        Methods to find and order the numbered part files of a data set.
+    """
+    @staticmethod
+    def find(data_dir: str, prefix: str, extension: str = 'csv') -> list:
+        """
+        finds the part files named <prefix><file number>.<extension> in the data directory.
+
+        :param data_dir:
+        :param prefix: the file name up to the file number. e.g. rk-nodes-pt
+        :param extension:
+        :return: the (file number, file path) of each file in file number order
+        """
+        # get the pattern the whole file name must match
+        name_pattern: re.Pattern = re.compile(re.escape(os.path.basename(prefix)) + r'(\d+)\.' + re.escape(extension))
+
+        # init the return value
+        ret_val: list = []
+
+        for file_path in glob.glob(glob.escape(os.path.join(data_dir, prefix)) + '[0-9]*.' + glob.escape(extension)):
+            # make sure it is only the file number between the prefix and the extension
+            found = name_pattern.fullmatch(os.path.basename(file_path))
+
+            if found:
+                # done so this works in both a windows and linux environment
+                ret_val.append((int(found.group(1)), str(file_path).replace('\\', '/')))
+
+        # return the files in file number order
+        return sorted(ret_val)
+
+    @staticmethod
+    def largest_first(file_paths: list) -> list:
+        """
+        orders files largest first. when they are handed to a pool of workers in this order a large file is not left to the
+        end to hold up the whole stage on its own.
+
+        :param file_paths: the file paths or CSV file ranges
+        :return:
+        """
+        return sorted(file_paths, key=CSVRanges.get_size, reverse=True)
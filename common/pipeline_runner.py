@@ -0,0 +1,307 @@
+"""
+    Pipeline runner.
+
+    runs a set of build stages in dependency order and skips the stages whose outputs are already current. a stage is
+    current when the fingerprint of its inputs (the input files with their size and modification time, the stage
+    parameters, the code version and the runs of the stages it depends on) matches the one recorded when it last
+    completed and its outputs still exist.
+
+    the fingerprint of a completed stage is written to a JSON state file right away, so after a failure or a change to
+    the inputs only the stages affected are run again.
+"""
+
+import os
+import json
+import time
+import hashlib
+
+
+class PipelineStage:
+    """
+        A build stage and the results of running it.
+    """
+    def __init__(self, name: str, run, get_inputs=None, get_outputs=None, depends_on: list = None, params: dict = None):
+        """
+        init the stage
+
+        :param name: the name of the stage, this is used to refer to it in the dependencies of other stages
+        :param run: a method that runs the stage and returns True if it succeeded
+        :param get_inputs: a method that returns the paths of the input files. it is called once the stages it depends on are done
+        :param get_outputs: a method that returns the paths of the output files and directories
+        :param depends_on: the names of the stages that must complete first
+        :param params: the parameters that change the outputs of the stage
+        """
+        self.name: str = name
+        self.run = run
+        self.get_inputs = get_inputs or list
+        self.get_outputs = get_outputs or list
+        self.depends_on: list = list(depends_on or [])
+        self.params: dict = dict(params or {})
+
+        # the results. the status is one of pending, current, done, failed or skipped, or stale in a dry run
+        self.status: str = 'pending'
+        self.reason: str = ''
+        self.duration: float = 0.0
+
+
+class PipelineRunner:
+    """
+        Runs the stages whose outputs are not current in dependency order.
+    """
+    # the number of bytes read at a time when computing the code version
+    read_size: int = 8 * 1024 * 1024
+
+    def __init__(self, state_file: str, code_version: str = '', logger=None):
+        """
+        init the runner, loading the state recorded by earlier runs
+
+        :param state_file: the JSON file the completed stages are recorded in
+        :param code_version: the version of the code the stages run, a change re-runs all the stages
+        :param logger:
+        """
+        self.state_file: str = state_file
+        self.code_version: str = code_version
+        self.logger = logger
+
+        # the stages by name, in the order they were added
+        self.stages: dict = {}
+
+        # the recorded state of each completed stage. name: {fingerprint, outputs, run_id, completed}
+        self.state: dict = {}
+
+        if os.path.exists(state_file):
+            try:
+                with open(state_file, 'r', encoding='utf-8') as in_fh:
+                    self.state = json.load(in_fh)
+            except ValueError:
+                self._log('warning', 'The pipeline state file %s could not be read, all the stages will be run.', state_file)
+
+    def add(self, stage: PipelineStage) -> None:
+        """
+        adds a stage to the pipeline.
+
+        :param stage:
+        :return:
+        """
+        self.stages[stage.name] = stage
+
+    @staticmethod
+    def get_code_version(code_files: list) -> str:
+        """
+        gets a hash of the content of the code files.
+
+        :param code_files:
+        :return:
+        """
+        # init the hash
+        ret_val = hashlib.blake2b(digest_size=16)
+
+        for code_file in sorted(code_files):
+            with open(code_file, 'rb') as in_fh:
+                for block in iter(lambda: in_fh.read(PipelineRunner.read_size), b''):
+                    ret_val.update(block)
+
+        # return to the caller
+        return ret_val.hexdigest()
+
+    @staticmethod
+    def get_file_info(in_files: list) -> list:
+        """
+        gets the name, size and modification time of each input file. a missing file is recorded without them.
+
+        :param in_files:
+        :return:
+        """
+        # init the return value
+        ret_val: list = []
+
+        for in_file in sorted(in_files):
+            if os.path.exists(in_file):
+                stat = os.stat(in_file)
+
+                ret_val.append({'name': in_file, 'size': stat.st_size, 'mtime': int(stat.st_mtime)})
+            else:
+                ret_val.append({'name': in_file})
+
+        # return to the caller
+        return ret_val
+
+    def get_fingerprint(self, stage: PipelineStage) -> str:
+        """
+        gets the fingerprint of the inputs of a stage. this includes the last runs of the stages it depends on, so a stage is
+        re-run whenever a stage it depends on is.
+
+        :param stage:
+        :return:
+        """
+        # get everything that changes the outputs of the stage
+        inputs: dict = {'files': self.get_file_info(stage.get_inputs()), 'params': stage.params, 'code_version': self.code_version,
+                        'depends_on': {name: self.state.get(name, {}).get('run_id') for name in stage.depends_on}}
+
+        # return the hash of the inputs
+        return hashlib.blake2b(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8'), digest_size=16).hexdigest()
+
+    def is_current(self, stage: PipelineStage, fingerprint: str) -> (bool, str):
+        """
+        checks to see if the outputs of a stage are current.
+
+        :param stage:
+        :param fingerprint: the fingerprint of the inputs of the stage
+        :return: whether the stage is current and, if not, why
+        """
+        # get the state recorded when the stage last completed
+        entry: dict = self.state.get(stage.name, None)
+
+        if entry is None:
+            return False, 'not run'
+
+        if entry['fingerprint'] != fingerprint:
+            return False, 'the inputs have changed'
+
+        # the outputs may have been removed
+        for out_file in entry['outputs']:
+            if not os.path.exists(out_file):
+                return False, f'{out_file} no longer exists'
+
+        # return to the caller
+        return True, ''
+
+    def run(self, force: list = None, dry_run: bool = False) -> list:
+        """
+        runs the stages that are not current in the order they were added. a stage whose dependencies failed is skipped.
+
+        the stages must be added after the stages they depend on.
+
+        :param force: the names of the stages to run even if they are current
+        :param dry_run: only report the stages that would be run
+        :return: the stages in the order they were added
+        """
+        force = set(force or [])
+
+        for stage in self.stages.values():
+            # skip the stage if a stage it depends on did not complete
+            if any(self._get_status(name) in ('failed', 'skipped') for name in stage.depends_on):
+                stage.status = 'skipped'
+                stage.reason = 'a stage it depends on did not complete'
+
+                self._log('debug', 'Skipping stage %s, a stage it depends on did not complete.', stage.name)
+
+                continue
+
+            # a stage run in a dry run changes the inputs of the stages that depend on it
+            if dry_run and any(self._get_status(name) == 'stale' for name in stage.depends_on):
+                stage.status, stage.reason = 'stale', 'a stage it depends on would be run'
+
+                self._log('debug', 'Stage %s would be run: %s.', stage.name, stage.reason)
+
+                continue
+
+            # get the fingerprint of the inputs of the stage
+            fingerprint: str = self.get_fingerprint(stage)
+
+            current, reason = self.is_current(stage, fingerprint)
+
+            if current and stage.name not in force:
+                stage.status = 'current'
+
+                self._log('debug', 'Stage %s is current.', stage.name)
+
+                continue
+
+            stage.reason = reason if not current else 'forced'
+
+            if dry_run:
+                stage.status = 'stale'
+
+                self._log('debug', 'Stage %s would be run: %s.', stage.name, stage.reason)
+
+                continue
+
+            self._log('debug', 'Running stage %s: %s.', stage.name, stage.reason)
+
+            # get the start time
+            start_time: float = time.perf_counter()
+
+            try:
+                succeeded: bool = stage.run()
+            except Exception as e:
+                self._log('error', 'Stage %s failed: %s', stage.name, e)
+
+                succeeded = False
+
+            stage.duration = time.perf_counter() - start_time
+
+            if not succeeded:
+                stage.status = 'failed'
+
+                # the outputs are incomplete, the stage is run again next time
+                self.state.pop(stage.name, None)
+                self.save()
+
+                continue
+
+            stage.status = 'done'
+
+            # record the completed stage
+            self.state[stage.name] = {'fingerprint': fingerprint, 'outputs': sorted(stage.get_outputs()), 'run_id': os.urandom(8).hex(),
+                                      'completed': time.strftime('%Y-%m-%dT%H:%M:%S')}
+
+            self.save()
+
+        # return the stages
+        return list(self.stages.values())
+
+    def save(self) -> None:
+        """
+        writes the state of the completed stages to the state file.
+
+        :return:
+        """
+        # write a temporary file and replace the state file with it, so that the state file is never left half written
+        temp_file: str = self.state_file + '.tmp'
+
+        with open(temp_file, 'w', encoding='utf-8') as out_fh:
+            json.dump(self.state, out_fh, indent=1)
+
+        os.replace(temp_file, self.state_file)
+
+    def _get_status(self, name: str) -> str:
+        """
+        gets the status of a stage, or skipped if there is no such stage.
+
+        :param name:
+        :return:
+        """
+        stage: PipelineStage = self.stages.get(name, None)
+
+        return stage.status if stage is not None else 'skipped'
+
+    def log_summary(self, title: str) -> None:
+        """
+        logs the results of each stage.
+
+        :param title:
+        :return:
+        """
+        # get the width of the name column
+        width: int = max([len('stage')] + [len(stage.name) for stage in self.stages.values()])
+
+        # build the table
+        lines: list = [f'{"stage":<{width}}  {"status":<8}  {"seconds":>9}  reason']
+
+        for stage in self.stages.values():
+            lines.append(f'{stage.name:<{width}}  {stage.status:<8}  {stage.duration:>9.2f}  {stage.reason}')
+
+        self._log('debug', '%s:\n%s', title, '\n'.join(lines))
+
+    def _log(self, level: str, msg: str, *args) -> None:
+        """
+        logs a message if there is a logger.
+
+        :param level:
+        :param msg:
+        :param args:
+        :return:
+        """
+        if self.logger:
+            getattr(self.logger, level)(msg, *args)
@@ -0,0 +1,144 @@
+"""
+    Reject log.
+
+    counts the rows that could not be processed by reason and writes them to a rejects file in bulk. only the first few
+    rejects of each reason are logged, the totals are logged as a summary table at the end of the stage.
+"""
+
+from collections import Counter
+
+
+class RejectLog:
+    """
+        Aggregated accounting of rejected rows.
+    """
+    # the default number of rejects logged for each reason
+    default_max_warnings: int = 10
+
+    # the number of bytes buffered before the rejected rows are written out
+    buffer_size: int = 4 * 1024 * 1024
+
+    def __init__(self, logger, out_file: str = None, max_warnings: int = None):
+        """
+        init the reject log
+
+        :param logger:
+        :param out_file: the file the rejected rows are written to, if any
+        :param max_warnings: the number of rejects logged for each reason
+        """
+        self.logger = logger
+        self.out_file: str = out_file
+        self.max_warnings: int = self.default_max_warnings if max_warnings is None else max_warnings
+
+        # the number of rejects for each reason
+        self.counts: Counter = Counter()
+
+        # the header line written at the top of the rejects file
+        self.header: bytes = b''
+
+        # the rejected rows waiting to be written and their size
+        self._buffer: list = []
+        self._buffered: int = 0
+
+        # the rejects file handle, this is opened on the first write
+        self._file_handle = None
+
+    def set_header(self, header: bytes) -> None:
+        """
+        sets the header of the rejected rows. a reason column is put in front of it.
+
+        :param header:
+        :return:
+        """
+        self.header = b'reason,' + header
+
+    def add(self, reason: str, record: bytes = None, message: str = '', *args) -> None:
+        """
+        records a rejected row.
+
+        :param reason: a short name for the reason, this is the first column of the rejects file
+        :param record: the raw row, including the line terminator
+        :param message: the message logged for the first rejects of this reason
+        :param args: the message arguments
+        :return:
+        """
+        self.counts[reason] += 1
+
+        # log the first few rejects of the reason
+        if self.counts[reason] <= self.max_warnings:
+            self.logger.warning('Rejected row (%s): ' + message, reason, *args)
+
+            if self.counts[reason] == self.max_warnings:
+                self.logger.warning('Further %s rejects are not logged, see the rejects summary.', reason)
+
+        # save the row
+        if self.out_file and record is not None:
+            line: bytes = reason.encode('utf-8') + b',' + record
+
+            self._buffer.append(line)
+            self._buffered += len(line)
+
+            if self._buffered >= self.buffer_size:
+                self.flush()
+
+    def update(self, counts: Counter) -> None:
+        """
+        adds the reject counts from another reject log, e.g. one kept by a worker process.
+
+        :param counts:
+        :return:
+        """
+        self.counts.update(counts)
+
+    def flush(self) -> None:
+        """
+        writes the buffered rows to the rejects file.
+
+        :return:
+        """
+        if not self._buffer:
+            return
+
+        # create the file and write the header on the first write
+        if self._file_handle is None:
+            self._file_handle = open(self.out_file, 'wb')
+            self._file_handle.write(self.header)
+
+        self._file_handle.write(b''.join(self._buffer))
+
+        self._buffer = []
+        self._buffered = 0
+
+    def close(self) -> None:
+        """
+        writes out any buffered rows and closes the rejects file.
+
+        :return:
+        """
+        try:
+            self.flush()
+        finally:
+            if self._file_handle is not None:
+                self._file_handle.close()
+                self._file_handle = None
+
+    def log_summary(self, title: str) -> None:
+        """
+        logs a table of the number of rejects for each reason.
+
+        :param title:
+        :return:
+        """
+        if not self.counts:
+            self.logger.debug('%s: no rows rejected.', title)
+            return
+
+        # get the width of the reason column
+        width: int = max(len('reason'), *[len(reason) for reason in self.counts])
+
+        # build the table
+        lines: list = [f'{"reason":<{width}}  {"rows":>12}'] + [f'{reason:<{width}}  {count:>12,}' for reason, count in self.counts.most_common()]
+        lines.append(f'{"total":<{width}}  {self.counts.total():>12,}')
+
+        self.logger.warning('%s: %s rows rejected%s\n%s', title, f'{self.counts.total():,}',
+                            f', written to {self.out_file}' if self.out_file else '', '\n'.join(lines))